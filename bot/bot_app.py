@@ -117,7 +117,13 @@ async def main() -> None:
         )
     )
 
-    runtime_config = RuntimeConfig(logger=logger, store=state_store, escalation_store_key="bot:escalation")
+    runtime_config = RuntimeConfig(
+        logger=logger,
+        store=state_store,
+        escalation_store_key="bot:escalation",
+        config_store_key="bot:config",
+    )
+    runtime_config.try_load_from_store()
     config_sync = ConfigSyncService(config_client, runtime_config, logger)
 
     bot = Bot(token=settings.token)
@@ -272,6 +278,9 @@ async def main() -> None:
             await getlink_task
         except asyncio.CancelledError:
             pass
+        sd_api_client.close()
+        await sd_web_client.aclose()
+        await web_client.aclose()
 
 
 if __name__ == "__main__":
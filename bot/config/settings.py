@@ -12,6 +12,8 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 
+from bot.utils.env_helpers import TRUTHY_VALUES
+
 
 def get_env(name: str, default: str | None = None, required: bool = False) -> str:
     """
@@ -166,7 +168,7 @@ class BotSettings:
         eventlog_poll_interval_s = get_env_int("EVENTLOG_POLL_INTERVAL_S", "600")
         eventlog_keepalive_every = get_env_int("EVENTLOG_KEEPALIVE_EVERY", "48")
         eventlog_start_id = get_env_int("EVENTLOG_START_ID", "0")
-        eventlog_enabled = get_env("EVENTLOG_ENABLED", "1").strip().lower() in ("1", "true", "yes")
+        eventlog_enabled = get_env("EVENTLOG_ENABLED", "1").strip().lower() in TRUTHY_VALUES
         getlink_poll_interval_s = get_env_int("GETLINK_POLL_INTERVAL_S", "60")
         getlink_lookback_s = get_env_int("GETLINK_LOOKBACK_S", "120")
 
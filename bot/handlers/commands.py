@@ -300,7 +300,12 @@ def _config_summary_text(runtime_config: RuntimeConfig) -> str:
         f"- routing.rules: {len(routing.rules)} (default_dest={'yes' if routing.default_dest else 'no'})",
         f"- eventlog.rules: {len(eventlog.rules)} (default_dest={'yes' if eventlog.default_dest else 'no'})",
         f"- escalation.enabled: {'yes' if esc.enabled else 'no'}",
-        f"- escalation.rules: {len(esc.rules)} (after_s={esc.after_s})",
+        # Выключенная эскалация правила не разбирает (см. _disabled_escalation) — 0 там не значит «нет правил».
+        (
+            f"- escalation.rules: {len(esc.rules)} (after_s={esc.after_s})"
+            if esc.enabled
+            else f"- escalation.rules: не разбираются, эскалация выключена (after_s={esc.after_s})"
+        ),
         f"- escalation.mention: {esc.mention}",
     ]
     return "\n".join(lines)
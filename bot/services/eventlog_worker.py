@@ -285,7 +285,7 @@ async def _is_filtered(
 def _load_last_event_id(store: Optional[StateStore]) -> Optional[int]:
     if store is None:
         return None
-    data = store.get_json(EVENTLOG_STATE_KEY)
+    data = store.get_json(EVENTLOG_STATE_KEY, copy=False)
     if not data:
         return None
     raw = data.get("last_event_id")
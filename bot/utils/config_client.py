@@ -69,6 +69,8 @@ class ConfigClient:
 
         # cache: (ts, data)
         self._cache: Optional[Tuple[float, dict[str, Any]]] = None
+        # ETag последнего успешного ответа: web отвечает 304, если версия не менялась.
+        self._etag: Optional[str] = None
         self._lock = asyncio.Lock()
 
     async def _fetch(self, request_id: str) -> ConfigFetchResult:
@@ -78,11 +80,24 @@ class ConfigClient:
         headers = {"X-Request-ID": request_id}
         if self.token:
             headers["X-Config-Token"] = self.token
+        cached = self._cache
+        if self._etag and cached is not None:
+            headers["If-None-Match"] = self._etag
 
         try:
             async with aiohttp.ClientSession(timeout=timeout) as session:
                 async with session.get(self.url, headers=headers) as r:
                     status = r.status
+                    if status == 304 and cached is not None:
+                        # Не изменился: отдаём тот же объект — RuntimeConfig пропустит его без разбора.
+                        return ConfigFetchResult(
+                            ok=True,
+                            status=status,
+                            error=None,
+                            duration_ms=int((time.perf_counter() - t0) * 1000),
+                            request_id=request_id,
+                            data=cached[1],
+                        )
                     # читаем JSON; если там не JSON, получим исключение
                     data = await r.json(content_type=None)
                     dt = int((time.perf_counter() - t0) * 1000)
@@ -96,6 +111,7 @@ class ConfigClient:
                             request_id=request_id,
                             data=None,
                         )
+                    self._etag = r.headers.get("ETag")
                     return ConfigFetchResult(
                         ok=True,
                         status=status,
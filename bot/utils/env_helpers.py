@@ -20,6 +20,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+# Значения env, которые считаем "включено" (сравнивать после .strip().lower()).
+TRUTHY_VALUES = frozenset(("1", "true", "yes", "on", "y", "t"))
+
 
 @dataclass(frozen=True)
 class EnvDestination:
@@ -156,14 +156,53 @@ class EscalationManager:
         self._creator_id_field = creator_id_field
         self._creator_company_id_field = creator_company_id_field
         self._rules = tuple(rules)
+        self._build_prefilter()
 
         self._state = EscalationState(seen_at={}, escalated_at={})
         self._load()
 
+    def _build_prefilter(self) -> None:
+        """Объединение критериев всех правил для быстрого отсева тикетов.
+
+        Фильтр правила — это OR по критериям, поэтому тикет может совпасть хоть с
+        одним правилом, только если совпадает с объединением их критериев.
+        Если у какого-то правила фильтр пустой ("эскалируем всё") — отсев невозможен.
+        """
+        flts = [r.flt for r in self._rules]
+        self._prefilter_enabled = bool(flts) and all(
+            f.keywords or f.service_ids or f.customer_ids or f.creator_ids or f.creator_company_ids
+            for f in flts
+        )
+        self._pre_keywords: tuple[str, ...] = tuple(dict.fromkeys(k for f in flts for k in f.keywords))
+        self._pre_service_ids = frozenset(x for f in flts for x in f.service_ids)
+        self._pre_customer_ids = frozenset(x for f in flts for x in f.customer_ids)
+        self._pre_creator_ids = frozenset(x for f in flts for x in f.creator_ids)
+        self._pre_creator_company_ids = frozenset(x for f in flts for x in f.creator_company_ids)
+
+    def _may_match(self, item: dict[str, Any]) -> bool:
+        """False — тикет гарантированно не совпадёт ни с одним правилом."""
+        if not self._prefilter_enabled:
+            return True
+        if self._pre_keywords:
+            name = item.get("Name")
+            if isinstance(name, str):
+                n = _norm(name)
+                if any(k in n for k in self._pre_keywords):
+                    return True
+        for ids, field in (
+            (self._pre_service_ids, self._service_id_field),
+            (self._pre_customer_ids, self._customer_id_field),
+            (self._pre_creator_ids, self._creator_id_field),
+            (self._pre_creator_company_ids, self._creator_company_id_field),
+        ):
+            if ids and field and _to_int(item.get(field)) in ids:
+                return True
+        return False
+
     def _load(self) -> None:
         if self._store is None:
             return
-        data = self._store.get_json(self._store_key) or {}
+        data = self._store.get_json(self._store_key, copy=False) or {}
         seen = data.get("seen_at", {})
         esc = data.get("escalated_at", {})
         if isinstance(seen, dict):
@@ -211,6 +250,8 @@ class EscalationManager:
         Обновляет state и возвращает список совпавших правил эскалации.
         """
         now = time.time()
+        # пишем state в store только если он реально изменился (экономим RTT до Redis)
+        changed = False
 
         current_ids: set[str] = set()
         id_to_item: dict[str, dict[str, Any]] = {}
@@ -226,21 +267,26 @@ class EscalationManager:
 
             if k not in self._state.seen_at:
                 self._state.seen_at[k] = now
+                changed = True
 
         # если тикет пропал из open — считаем, что его взяли/перевели/закрыли -> чистим state
         for k in list(self._state.seen_at.keys()):
             if k not in current_ids:
                 self._state.seen_at.pop(k, None)
                 self._state.escalated_at.pop(k, None)
+                changed = True
 
         to_escalate: list[EscalationMatch] = []
         legacy = self._state.escalated_at.get("legacy", {})
 
+        # отсеиваем тикеты, которые не подходят ни под одно правило, один раз на тикет
+        candidates = [k for k in current_ids if self._may_match(id_to_item[k])]
+
         # выбираем те, кто "старше порога" и еще не эскалировались по правилу
         for idx, rule in enumerate(self._rules, start=1):
             rule_key = self._rule_key(rule, idx)
             rule_escalated = self._state.escalated_at.get(rule_key, {})
-            for k in current_ids:
+            for k in candidates:
                 if k in rule_escalated or k in legacy:
                     continue
                 it = id_to_item.get(k)
@@ -265,6 +311,8 @@ class EscalationManager:
                     self._state.escalated_at[rule_key] = {}
                 self._state.escalated_at[rule_key][k] = now
                 to_escalate.append(EscalationMatch(rule=rule, item=it))
+                changed = True
 
-        self._save()
+        if changed:
+            self._save()
         return to_escalate
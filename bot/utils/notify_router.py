@@ -72,6 +72,26 @@ def _to_int(x: Any) -> Optional[int]:
         return None
 
 
+def _parse_keywords(raw: Any) -> tuple[str, ...]:
+    """Ключевые слова фильтра: непустые строки в нижнем регистре (strip/lower — один раз)."""
+    out: list[str] = []
+    for k in raw or ():
+        if isinstance(k, str):
+            k = k.strip()
+            if k:
+                out.append(k.lower())
+    return tuple(out)
+
+
+def _parse_ids(raw: Any) -> tuple[int, ...]:
+    out: list[int] = []
+    for i in raw or ():
+        v = _to_int(i)
+        if v is not None:
+            out.append(v)
+    return tuple(out)
+
+
 def parse_destination(raw: Any) -> Optional[Destination]:
     """
     raw ожидается dict: {"chat_id": ..., "thread_id": ...?}
@@ -118,22 +138,11 @@ def parse_rules(raw: Any) -> list[RouteRule]:
         else:
             name = None
 
-        keywords_raw = x.get("keywords", [])
-        keywords: tuple[str, ...] = tuple(_norm(k) for k in keywords_raw if isinstance(k, str) and _norm(k))
-
-        service_ids_raw = x.get("service_ids", [])
-        service_ids: tuple[int, ...] = tuple(v for v in (_to_int(i) for i in service_ids_raw) if v is not None)
-
-        customer_ids_raw = x.get("customer_ids", [])
-        customer_ids: tuple[int, ...] = tuple(v for v in (_to_int(i) for i in customer_ids_raw) if v is not None)
-
-        creator_ids_raw = x.get("creator_ids", [])
-        creator_ids: tuple[int, ...] = tuple(v for v in (_to_int(i) for i in creator_ids_raw) if v is not None)
-
-        creator_company_ids_raw = x.get("creator_company_ids", [])
-        creator_company_ids: tuple[int, ...] = tuple(
-            v for v in (_to_int(i) for i in creator_company_ids_raw) if v is not None
-        )
+        keywords = _parse_keywords(x.get("keywords"))
+        service_ids = _parse_ids(x.get("service_ids"))
+        customer_ids = _parse_ids(x.get("customer_ids"))
+        creator_ids = _parse_ids(x.get("creator_ids"))
+        creator_company_ids = _parse_ids(x.get("creator_company_ids"))
 
         # Правило без критериев не разрешаем — иначе оно "матчит всё" и ломает смысл default.
         if not keywords and not service_ids and not customer_ids and not creator_ids and not creator_company_ids:
@@ -10,7 +10,7 @@ from typing import Awaitable, Callable, Optional
 
 from bot.services.service_icon_store import ServiceIconStore
 from bot.utils.escalation import EscalationAction
-from bot.utils.sd_state import make_ids_snapshot_hash, normalize_tasks_for_message
+from bot.utils.sd_state import normalize_and_snapshot
 from bot.utils.sd_web_client import SdOpenResult, SdWebClient
 from bot.utils.state_store import StateStore
 
@@ -128,7 +128,7 @@ def format_open_tasks_message(
 
 
 def load_polling_state_from_store(state: PollingState, store: StateStore, key: str) -> None:
-    data = store.get_json(key)
+    data = store.get_json(key, copy=False)
     if not data:
         return
 
@@ -241,7 +241,7 @@ async def polling_open_queue_loop(
                         await notify_escalation(escalations, "ESCALATION")
 
                 # --- 2) Основной список (как раньше — только при изменении) ---
-                snapshot_hash, ids = make_ids_snapshot_hash(res.items)
+                normalized, snapshot_hash, ids = normalize_and_snapshot(res.items)
 
                 state.last_calculated_count = len(ids)
                 state.last_calculated_at = time.time()
@@ -249,7 +249,6 @@ async def polling_open_queue_loop(
                 changed = (state.last_sent_snapshot is None) or (snapshot_hash != state.last_sent_snapshot)
 
                 if changed:
-                    normalized = normalize_tasks_for_message(res.items)
                     service_icons: dict[int, str] = {}
                     if service_icon_store is not None:
                         try:
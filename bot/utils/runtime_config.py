@@ -23,12 +23,21 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
+import sys
 from dataclasses import dataclass
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Mapping, Optional
 
+try:  # orjson заметно быстрее stdlib json; если не установлен — работаем на stdlib
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as _json_loads
+
+from bot.utils.env_helpers import TRUTHY_VALUES
 from bot.utils.escalation import (
     EscalationAction,
     EscalationFilter,
@@ -36,11 +45,17 @@ from bot.utils.escalation import (
     EscalationMatch,
     EscalationRule,
 )
-from bot.utils.notify_router import Destination, parse_destination, parse_rules
+from bot.utils.notify_router import (
+    Destination,
+    RouteRule,
+    _parse_keywords,
+    parse_destination,
+    parse_rules,
+)
 from bot.utils.state_store import StateStore
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RoutingConfig:
     rules: list
     default_dest: Optional[Destination]
@@ -50,7 +65,7 @@ class RoutingConfig:
     creator_company_id_field: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EscalationConfig:
     enabled: bool
     after_s: int
@@ -63,7 +78,7 @@ class EscalationConfig:
     creator_company_id_field: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EventlogConfig:
     rules: list
     default_dest: Optional[Destination]
@@ -73,278 +88,522 @@ class EventlogConfig:
     creator_company_id_field: str
 
 
-class RuntimeConfig:
-    """Текущая активная конфигурация бота.
+@lru_cache(maxsize=32)
+def _parse_rules_json(raw: str) -> tuple[RouteRule, ...]:
+    """parse_rules с мемоизацией по JSON-строке (правила между poll'ами почти не меняются)."""
+    return tuple(parse_rules(_json_loads(raw)))
+
+
+@lru_cache(maxsize=32)
+def _parse_destination_json(raw: str) -> Optional[Destination]:
+    return parse_destination(_json_loads(raw))
+
+
+def _cached_parse_rules(raw: Any) -> list:
+    # Возвращаем новый list: RouteRule frozen, а сам список вызывающий код может менять.
+    return list(_parse_rules_json(json.dumps(raw, sort_keys=True, default=str)))
+
+
+def _cached_parse_destination(raw: Any) -> Optional[Destination]:
+    if not isinstance(raw, dict):
+        return None
+    return _parse_destination_json(json.dumps(raw, sort_keys=True, default=str))
+
+
+# Все переменные окружения, которые читают env-загрузчики ниже.
+# По ним строится снэпшот: если значения не менялись, повторно env не парсим.
+_ENV_KEYS = frozenset(
+    {
+        "ROUTES_SERVICE_ID_FIELD",
+        "ROUTES_CUSTOMER_ID_FIELD",
+        "ROUTES_CREATOR_ID_FIELD",
+        "ROUTES_CREATOR_COMPANY_ID_FIELD",
+        "ROUTES_DEFAULT_CHAT_ID",
+        "ROUTES_DEFAULT_THREAD_ID",
+        "ALERT_CHAT_ID",
+        "ALERT_THREAD_ID",
+        "ROUTES_RULES",
+        "ESCALATION_ENABLED",
+        "ESCALATION_AFTER_S",
+        "ESCALATION_DEST_CHAT_ID",
+        "ESCALATION_DEST_THREAD_ID",
+        "ESCALATION_MENTION",
+        "ESCALATION_SERVICE_ID_FIELD",
+        "ESCALATION_CUSTOMER_ID_FIELD",
+        "ESCALATION_CREATOR_ID_FIELD",
+        "ESCALATION_CREATOR_COMPANY_ID_FIELD",
+        "ESCALATION_RULES",
+        "ESCALATION_FILTER",
+        "EVENTLOG_DEFAULT_CHAT_ID",
+        "EVENTLOG_DEFAULT_THREAD_ID",
+        "EVENTLOG_RULES",
+        "EVENTLOG_SERVICE_ID_FIELD",
+        "EVENTLOG_CUSTOMER_ID_FIELD",
+        "EVENTLOG_CREATOR_ID_FIELD",
+        "EVENTLOG_CREATOR_COMPANY_ID_FIELD",
+    }
+)
+_ENV_KEYS_SORTED = tuple(sorted(_ENV_KEYS))
 
-    Экземпляр живёт весь runtime процесса.
+
+def _env_snapshot() -> tuple[tuple[str, Optional[str]], ...]:
+    """Снэпшот релевантной части os.environ (hashable, годится как ключ кэша).
+
+    Это единственное место, где env-загрузчики обращаются к os.environ:
+    дальше все значения читаются из снэпшота обычным dict.get.
     """
+    get = os.environ.get
+    return tuple((k, get(k)) for k in _ENV_KEYS_SORTED)
 
-    def __init__(
-        self,
-        *,
-        logger: logging.Logger,
-        store: Optional[StateStore],
-        escalation_store_key: str = "bot:escalation",
-    ) -> None:
-        self._log = logger
-        self._store = store
-        self._esc_store_key = escalation_store_key
 
-        # метаданные источника
-        self.version: int = 0
-        self.source: str = "env"
+@lru_cache(maxsize=4)
+def _load_env_configs(
+    snap: tuple[tuple[str, Optional[str]], ...],
+    log: logging.Logger,
+) -> tuple[RoutingConfig, EscalationConfig, EventlogConfig]:
+    """Парсит env-конфиг один раз на каждый уникальный снэпшот env.
 
-        # активные настройки
-        self.routing = self._load_routing_from_env()
-        self.escalation = self._load_escalation_from_env(self.routing)
-        self.eventlog = self._load_eventlog_from_env(self.routing)
+    Ошибки парсинга логируются только при первом разборе снэпшота.
+    """
+    env = {k: v for k, v in snap if v is not None}
+    routing = _load_routing_from_env(env, log)
+    escalation = _load_escalation_from_env(env, routing, log)
+    eventlog = _load_eventlog_from_env(env, routing, log)
+    return routing, escalation, eventlog
 
-        # менеджер эскалации (создаём только если enabled)
-        self._esc_manager: Optional[EscalationManager] = None
-        self._rebuild_escalation_manager()
 
-    # -----------------------------
-    # Env fallback
-    # -----------------------------
+# -----------------------------
+# Env fallback
+# -----------------------------
 
-    def _load_routing_from_env(self) -> RoutingConfig:
-        service_id_field = os.getenv("ROUTES_SERVICE_ID_FIELD", "ServiceId").strip() or "ServiceId"
-        customer_id_field = os.getenv("ROUTES_CUSTOMER_ID_FIELD", "CustomerId").strip() or "CustomerId"
-        creator_id_field = os.getenv("ROUTES_CREATOR_ID_FIELD", "CreatorId").strip() or "CreatorId"
-        creator_company_id_field = (
-            os.getenv("ROUTES_CREATOR_COMPANY_ID_FIELD", "CreatorCompanyId").strip() or "CreatorCompanyId"
-        )
 
-        def _to_int(x: str) -> Optional[int]:
-            try:
-                x = (x or "").strip()
-                if not x:
-                    return None
-                return int(x)
-            except Exception:
-                return None
-
-        def _dest(prefix: str) -> Optional[Destination]:
-            chat_id = _to_int(os.getenv(f"{prefix}_CHAT_ID", ""))
-            if chat_id is None:
-                return None
-            thread_id = _to_int(os.getenv(f"{prefix}_THREAD_ID", ""))
-            if thread_id == 0:
-                thread_id = None
-            return Destination(chat_id=chat_id, thread_id=thread_id)
-
-        default_dest = _dest("ROUTES_DEFAULT") or _dest("ALERT")
-
-        rules_raw = os.getenv("ROUTES_RULES", "").strip()
-        rules = []
-        if rules_raw:
-            try:
-                rules = parse_rules(json.loads(rules_raw))
-            except Exception as e:
-                self._log.error("ROUTES_RULES parse error: %s", e)
-                rules = []
-
-        return RoutingConfig(
-            rules=rules,
-            default_dest=default_dest,
-            service_id_field=service_id_field,
-            customer_id_field=customer_id_field,
-            creator_id_field=creator_id_field,
-            creator_company_id_field=creator_company_id_field,
-        )
+def _to_int(x: Optional[str]) -> Optional[int]:
+    # Без try/except: пустые/кривые значения в env — обычное дело, а исключение дорогое.
+    # isdecimal (не isdigit): "²".isdigit() == True, но int("²") падает.
+    x = (x or "").strip()
+    if not x:
+        return None
+    digits = x[1:] if x[0] in "+-" else x
+    return int(x) if digits.isdecimal() else None
 
-    def _parse_escalation_filter(self, raw: Any) -> EscalationFilter:
-        if not isinstance(raw, dict):
-            return EscalationFilter()
-
-        def _ids(values: Any) -> tuple[int, ...]:
-            out: list[int] = []
-            for v in values or []:
-                if str(v).strip().isdigit():
-                    out.append(int(v))
-            return tuple(out)
-
-        keywords = tuple(
-            k.strip().lower()
-            for k in raw.get("keywords", [])
-            if isinstance(k, str) and k.strip()
-        )
-        return EscalationFilter(
-            keywords=keywords,
-            service_ids=_ids(raw.get("service_ids")),
-            customer_ids=_ids(raw.get("customer_ids")),
-            creator_ids=_ids(raw.get("creator_ids")),
-            creator_company_ids=_ids(raw.get("creator_company_ids")),
-        )
 
-    def _parse_escalation_rules(
-        self,
-        raw: Any,
-        *,
-        base_dest: Optional[Destination],
-        base_after_s: int,
-    ) -> list[EscalationRule]:
-        if not isinstance(raw, list):
-            return []
+def _field(block: Mapping[str, Any], key: str, default: str) -> str:
+    """Строковое поле (env или блок web-конфига): пустое/отсутствующее/не-строка -> default."""
+    v = block.get(key)
+    if isinstance(v, str):
+        v = v.strip()
+        if v:
+            return v
+    return default
 
-        rules: list[EscalationRule] = []
-        for idx, item in enumerate(raw, start=1):
-            if not isinstance(item, dict):
-                continue
-            if item.get("enabled") is False:
-                continue
 
-            dest = parse_destination(item.get("dest")) or base_dest
-            if dest is None:
-                self._log.error("config: escalation.rules[%s] dest is required", idx)
-                continue
+def _id_field(block: Mapping[str, Any], key: str, default: str) -> str:
+    """Имя поля тикета (ServiceId, ...): интернируем — по нему идут lookup'ы в каждом item."""
+    return sys.intern(_field(block, key, default))
 
-            mention = item.get("mention")
-            if isinstance(mention, str):
-                mention = mention.strip() or None
-            else:
-                mention = None
-
-            after_s = base_after_s
-            if "after_s" in item:
-                try:
-                    after_s = int(item.get("after_s"))
-                except Exception:
-                    self._log.error("config: escalation.rules[%s].after_s must be int", idx)
-                    after_s = base_after_s
-
-            flt_raw = item.get("filter") if isinstance(item.get("filter"), dict) else item
-            flt = self._parse_escalation_filter(flt_raw)
-
-            name = item.get("name")
-            if isinstance(name, str):
-                name = name.strip() or None
-            else:
-                name = None
 
-            rules.append(EscalationRule(dest=dest, name=name, after_s=after_s, mention=mention, flt=flt))
+def _env_dest(prefix: str, env: Mapping[str, str] = os.environ) -> Optional[Destination]:
+    """Destination из PREFIX_CHAT_ID / PREFIX_THREAD_ID (thread_id=0 -> None)."""
+    chat_id = _to_int(env.get(f"{prefix}_CHAT_ID", ""))
+    if chat_id is None:
+        return None
+    thread_id = _to_int(env.get(f"{prefix}_THREAD_ID", ""))
+    if thread_id == 0:
+        thread_id = None
+    return Destination(chat_id=chat_id, thread_id=thread_id)
 
-        return rules
 
-    def _load_escalation_from_env(self, routing: RoutingConfig) -> EscalationConfig:
-        enabled = os.getenv("ESCALATION_ENABLED", "0").strip().lower() in ("1", "true", "yes")
-        def _get_int_env(name: str, default: int) -> int:
-            raw = os.getenv(name, str(default)).strip()
-            try:
-                return int(raw)
-            except Exception:
-                self._log.error("ENV %s must be int, got %r; using default %s", name, raw, default)
-                return default
+def _load_routing_from_env(env: Mapping[str, str], log: logging.Logger) -> RoutingConfig:
+    service_id_field = _id_field(env, "ROUTES_SERVICE_ID_FIELD", "ServiceId")
+    customer_id_field = _id_field(env, "ROUTES_CUSTOMER_ID_FIELD", "CustomerId")
+    creator_id_field = _id_field(env, "ROUTES_CREATOR_ID_FIELD", "CreatorId")
+    creator_company_id_field = _id_field(env, "ROUTES_CREATOR_COMPANY_ID_FIELD", "CreatorCompanyId")
 
-        after_s = _get_int_env("ESCALATION_AFTER_S", 600)
+    default_dest = _env_dest("ROUTES_DEFAULT", env) or _env_dest("ALERT", env)
 
-        # destination
-        dest = None
+    rules_raw = env.get("ROUTES_RULES", "").strip()
+    rules = []
+    if rules_raw:
         try:
-            raw_dest = {
-                "chat_id": os.getenv("ESCALATION_DEST_CHAT_ID", "").strip() or None,
-                "thread_id": os.getenv("ESCALATION_DEST_THREAD_ID", "").strip() or None,
-            }
-            dest = parse_destination(raw_dest)
-        except Exception:
-            dest = None
-
-        mention = os.getenv("ESCALATION_MENTION", "@duty_engineer").strip() or "@duty_engineer"
-
-        service_id_field = os.getenv("ESCALATION_SERVICE_ID_FIELD", routing.service_id_field).strip() or routing.service_id_field
-        customer_id_field = os.getenv("ESCALATION_CUSTOMER_ID_FIELD", routing.customer_id_field).strip() or routing.customer_id_field
-        creator_id_field = os.getenv("ESCALATION_CREATOR_ID_FIELD", "CreatorId").strip() or "CreatorId"
-        creator_company_id_field = (
-            os.getenv("ESCALATION_CREATOR_COMPANY_ID_FIELD", "CreatorCompanyId").strip() or "CreatorCompanyId"
-        )
-
-        rules: list[EscalationRule] = []
-        rules_env = os.getenv("ESCALATION_RULES")
-        if rules_env is not None:
-            try:
-                raw = rules_env.strip()
-                payload = json.loads(raw) if raw else []
-                rules = self._parse_escalation_rules(payload, base_dest=dest, base_after_s=after_s)
-            except Exception as e:
-                self._log.error("ESCALATION_RULES parse error: %s", e)
+            rules = list(_parse_rules_json(rules_raw))
+        except Exception as e:
+            log.error("ROUTES_RULES parse error: %s", e)
+            rules = []
+
+    return RoutingConfig(
+        rules=rules,
+        default_dest=default_dest,
+        service_id_field=service_id_field,
+        customer_id_field=customer_id_field,
+        creator_id_field=creator_id_field,
+        creator_company_id_field=creator_company_id_field,
+    )
+
+
+def _escalation_ids(values: Any) -> tuple[int, ...]:
+    out: list[int] = []
+    for v in values or ():
+        # JSON обычно уже отдаёт int — строки разбираем только как fallback.
+        # bool и отрицательные id, как и раньше, не принимаем.
+        if type(v) is int:
+            if v >= 0:
+                out.append(v)
+        elif isinstance(v, str):
+            s = v.strip()
+            if s.isdecimal():
+                out.append(int(s))
+    return tuple(out)
+
+
+def _parse_escalation_filter(raw: Any) -> EscalationFilter:
+    if not isinstance(raw, dict):
+        return EscalationFilter()
+
+    return EscalationFilter(
+        keywords=_parse_keywords(raw.get("keywords")),
+        service_ids=_escalation_ids(raw.get("service_ids")),
+        customer_ids=_escalation_ids(raw.get("customer_ids")),
+        creator_ids=_escalation_ids(raw.get("creator_ids")),
+        creator_company_ids=_escalation_ids(raw.get("creator_company_ids")),
+    )
+
+
+@lru_cache(maxsize=256)
+def _rule(
+    dest: Destination,
+    name: Optional[str],
+    after_s: int,
+    mention: Optional[str],
+    flt: EscalationFilter,
+) -> EscalationRule:
+    """Канонический EscalationRule: одинаковые правила между перезагрузками — один объект."""
+    return EscalationRule(dest=dest, name=name, after_s=after_s, mention=mention, flt=flt)
+
+
+def _parse_escalation_rules(
+    raw: Any,
+    *,
+    base_dest: Optional[Destination],
+    base_after_s: int,
+    log: logging.Logger,
+) -> list[EscalationRule]:
+    if not isinstance(raw, list):
+        return []
+
+    rules: list[EscalationRule] = []
+    for idx, item in enumerate(raw, start=1):
+        if not isinstance(item, dict):
+            continue
+        if item.get("enabled") is False:
+            continue
+
+        dest = parse_destination(item.get("dest")) or base_dest
+        if dest is None:
+            log.error("config: escalation.rules[%s] dest is required", idx)
+            continue
+
+        mention = item.get("mention")
+        if isinstance(mention, str):
+            mention = mention.strip() or None
         else:
-            raw = os.getenv("ESCALATION_FILTER", "").strip()
-            flt = EscalationFilter()
-            if raw:
-                try:
-                    flt = self._parse_escalation_filter(json.loads(raw))
-                except Exception as e:
-                    self._log.error("ESCALATION_FILTER parse error: %s", e)
-            if dest is not None:
-                rules = [EscalationRule(dest=dest, name=None, after_s=after_s, mention=None, flt=flt)]
-
-        return EscalationConfig(
-            enabled=enabled,
-            after_s=after_s,
-            dest=dest,
-            mention=mention,
-            rules=rules,
-            service_id_field=service_id_field,
-            customer_id_field=customer_id_field,
-            creator_id_field=creator_id_field,
-            creator_company_id_field=creator_company_id_field,
-        )
+            mention = None
 
-    def _load_eventlog_from_env(self, routing: RoutingConfig) -> EventlogConfig:
-        def _to_int(x: str) -> Optional[int]:
+        after_s = base_after_s
+        if "after_s" in item:
             try:
-                x = (x or "").strip()
-                if not x:
-                    return None
-                return int(x)
+                after_s = int(item.get("after_s"))
             except Exception:
-                return None
-
-        def _dest(prefix: str) -> Optional[Destination]:
-            chat_id = _to_int(os.getenv(f"{prefix}_CHAT_ID", ""))
-            if chat_id is None:
-                return None
-            thread_id = _to_int(os.getenv(f"{prefix}_THREAD_ID", ""))
-            if thread_id == 0:
-                thread_id = None
-            return Destination(chat_id=chat_id, thread_id=thread_id)
-
-        default_dest = _dest("EVENTLOG_DEFAULT") or routing.default_dest
-
-        rules_raw = os.getenv("EVENTLOG_RULES", "").strip()
-        rules = []
-        if rules_raw:
+                log.error("config: escalation.rules[%s].after_s must be int", idx)
+                after_s = base_after_s
+
+        flt_raw = item.get("filter") if isinstance(item.get("filter"), dict) else item
+        flt = _parse_escalation_filter(flt_raw)
+
+        name = item.get("name")
+        if isinstance(name, str):
+            name = name.strip() or None
+        else:
+            name = None
+
+        rules.append(_rule(dest, name, after_s, mention, flt))
+
+    return rules
+
+
+def _disabled_escalation(*, after_s: int, mention: str, id_fields: dict[str, str]) -> EscalationConfig:
+    """Конфиг выключенной эскалации: правила, фильтр и dest не разбираем вовсе.
+
+    after_s/mention и *_id_field (с теми же override, что у включённой) оставляем —
+    их показывает сводка /config. rules всегда пустой: сводка пишет, что правила
+    выключенной эскалации не разбираются, а не их число.
+    """
+    return EscalationConfig(enabled=False, after_s=after_s, dest=None, mention=mention, rules=[], **id_fields)
+
+
+def _load_escalation_from_env(
+    env: Mapping[str, str],
+    routing: RoutingConfig,
+    log: logging.Logger,
+) -> EscalationConfig:
+    enabled = env.get("ESCALATION_ENABLED", "0").strip().lower() in TRUTHY_VALUES
+    def _get_int_env(name: str, default: int) -> int:
+        raw = env.get(name, str(default)).strip()
+        value = _to_int(raw)
+        if value is None:
+            log.error("ENV %s must be int, got %r; using default %s", name, raw, default)
+            return default
+        return value
+
+    after_s = _get_int_env("ESCALATION_AFTER_S", 600)
+    mention = _field(env, "ESCALATION_MENTION", "@duty_engineer")
+    id_fields = {
+        "service_id_field": _id_field(env, "ESCALATION_SERVICE_ID_FIELD", routing.service_id_field),
+        "customer_id_field": _id_field(env, "ESCALATION_CUSTOMER_ID_FIELD", routing.customer_id_field),
+        "creator_id_field": _id_field(env, "ESCALATION_CREATOR_ID_FIELD", "CreatorId"),
+        "creator_company_id_field": _id_field(env, "ESCALATION_CREATOR_COMPANY_ID_FIELD", "CreatorCompanyId"),
+    }
+    if not enabled:
+        return _disabled_escalation(after_s=after_s, mention=mention, id_fields=id_fields)
+
+    # destination
+    dest = None
+    try:
+        raw_dest = {
+            "chat_id": env.get("ESCALATION_DEST_CHAT_ID", "").strip() or None,
+            "thread_id": env.get("ESCALATION_DEST_THREAD_ID", "").strip() or None,
+        }
+        dest = parse_destination(raw_dest)
+    except Exception:
+        dest = None
+
+    rules: list[EscalationRule] = []
+    rules_env = env.get("ESCALATION_RULES")
+    if rules_env is not None:
+        try:
+            raw = rules_env.strip()
+            payload = _json_loads(raw) if raw else []
+            rules = _parse_escalation_rules(payload, base_dest=dest, base_after_s=after_s, log=log)
+        except Exception as e:
+            log.error("ESCALATION_RULES parse error: %s", e)
+    else:
+        raw = env.get("ESCALATION_FILTER", "").strip()
+        flt = EscalationFilter()
+        if raw:
             try:
-                rules = parse_rules(json.loads(rules_raw))
+                flt = _parse_escalation_filter(_json_loads(raw))
             except Exception as e:
-                self._log.error("EVENTLOG_RULES parse error: %s", e)
-                rules = []
-
-        service_id_field = os.getenv("EVENTLOG_SERVICE_ID_FIELD", routing.service_id_field).strip() or routing.service_id_field
-        customer_id_field = os.getenv("EVENTLOG_CUSTOMER_ID_FIELD", routing.customer_id_field).strip() or routing.customer_id_field
-        creator_id_field = os.getenv("EVENTLOG_CREATOR_ID_FIELD", routing.creator_id_field).strip() or routing.creator_id_field
-        creator_company_id_field = (
-            os.getenv("EVENTLOG_CREATOR_COMPANY_ID_FIELD", routing.creator_company_id_field).strip()
-            or routing.creator_company_id_field
-        )
+                log.error("ESCALATION_FILTER parse error: %s", e)
+        if dest is not None:
+            rules = [_rule(dest, None, after_s, None, flt)]
+
+    return EscalationConfig(
+        enabled=enabled,
+        after_s=after_s,
+        dest=dest,
+        mention=mention,
+        rules=rules,
+        **id_fields,
+    )
+
+
+def _load_eventlog_from_env(
+    env: Mapping[str, str],
+    routing: RoutingConfig,
+    log: logging.Logger,
+) -> EventlogConfig:
+    default_dest = _env_dest("EVENTLOG_DEFAULT", env) or routing.default_dest
+
+    rules_raw = env.get("EVENTLOG_RULES", "").strip()
+    rules = []
+    if rules_raw:
+        try:
+            rules = list(_parse_rules_json(rules_raw))
+        except Exception as e:
+            log.error("EVENTLOG_RULES parse error: %s", e)
+            rules = []
+
+    service_id_field = _id_field(env, "EVENTLOG_SERVICE_ID_FIELD", routing.service_id_field)
+    customer_id_field = _id_field(env, "EVENTLOG_CUSTOMER_ID_FIELD", routing.customer_id_field)
+    creator_id_field = _id_field(env, "EVENTLOG_CREATOR_ID_FIELD", routing.creator_id_field)
+    creator_company_id_field = _id_field(env, "EVENTLOG_CREATOR_COMPANY_ID_FIELD", routing.creator_company_id_field)
+
+    return EventlogConfig(
+        rules=rules,
+        default_dest=default_dest,
+        service_id_field=service_id_field,
+        customer_id_field=customer_id_field,
+        creator_id_field=creator_id_field,
+        creator_company_id_field=creator_company_id_field,
+    )
+
+
+def _blocks_digest(*blocks: Optional[dict[str, Any]]) -> Optional[bytes]:
+    """Digest содержимого блоков web-конфига (только для сравнения, не для безопасности).
 
-        return EventlogConfig(
-            rules=rules,
-            default_dest=default_dest,
-            service_id_field=service_id_field,
-            customer_id_field=customer_id_field,
-            creator_id_field=creator_id_field,
-            creator_company_id_field=creator_company_id_field,
+    None — если блоки не сериализуются (тогда просто разбираем их как обычно).
+    """
+    try:
+        raw = json.dumps(blocks, sort_keys=True, separators=(",", ":")).encode()
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _parse_web_config(
+    routing_raw: Optional[dict[str, Any]],
+    escalation_raw: Optional[dict[str, Any]],
+    eventlog_raw: Optional[dict[str, Any]],
+    log: logging.Logger,
+) -> Optional[tuple[RoutingConfig, EscalationConfig, EventlogConfig]]:
+    """Разбирает блоки routing/escalation/eventlog из web /config.
+
+    Возвращает None, если какой-то блок кривой (ошибка уже залогирована).
+    """
+    # --- routing ---
+    try:
+        rr = routing_raw or {}
+        routing = RoutingConfig(
+            rules=_cached_parse_rules(rr.get("rules", [])),
+            default_dest=_cached_parse_destination(rr.get("default_dest")),
+            service_id_field=_id_field(rr, "service_id_field", "ServiceId"),
+            customer_id_field=_id_field(rr, "customer_id_field", "CustomerId"),
+            creator_id_field=_id_field(rr, "creator_id_field", "CreatorId"),
+            creator_company_id_field=_id_field(rr, "creator_company_id_field", "CreatorCompanyId"),
         )
+    except Exception as e:
+        log.error("config: routing parse error: %s", e)
+        return None
+
+    # --- escalation ---
+    try:
+        er = escalation_raw or {}
+        after_s = int(er.get("after_s", 600))
+        mention = _field(er, "mention", "@duty_engineer")
+        id_fields = {
+            "service_id_field": _id_field(er, "service_id_field", routing.service_id_field),
+            "customer_id_field": _id_field(er, "customer_id_field", routing.customer_id_field),
+            "creator_id_field": _id_field(er, "creator_id_field", routing.creator_id_field),
+            "creator_company_id_field": _id_field(er, "creator_company_id_field", routing.creator_company_id_field),
+        }
+        if not er.get("enabled", False):
+            escalation = _disabled_escalation(after_s=after_s, mention=mention, id_fields=id_fields)
+        else:
+            dest = _cached_parse_destination(er.get("dest"))
+
+            rules_raw = er.get("rules")
+            if rules_raw is not None:
+                rules = _parse_escalation_rules(rules_raw, base_dest=dest, base_after_s=after_s, log=log)
+            else:
+                flt = EscalationFilter()
+                jf = er.get("filter")
+                if isinstance(jf, dict):
+                    flt = _parse_escalation_filter(jf)
+                rules = [_rule(dest, None, after_s, None, flt)] if dest is not None else []
+
+            escalation = EscalationConfig(
+                enabled=True,
+                after_s=after_s,
+                dest=dest,
+                mention=mention,
+                rules=rules,
+                **id_fields,
+            )
+    except Exception as e:
+        log.error("config: escalation parse error: %s", e)
+        return None
+
+    # --- eventlog ---
+    # Без отдельного блока eventlog наследует routing целиком.
+    try:
+        if eventlog_raw is None:
+            eventlog = EventlogConfig(
+                rules=routing.rules,
+                default_dest=routing.default_dest,
+                service_id_field=routing.service_id_field,
+                customer_id_field=routing.customer_id_field,
+                creator_id_field=routing.creator_id_field,
+                creator_company_id_field=routing.creator_company_id_field,
+            )
+        else:
+            vr = eventlog_raw
+            eventlog = EventlogConfig(
+                rules=_cached_parse_rules(vr.get("rules", [])),
+                default_dest=_cached_parse_destination(vr.get("default_dest")),
+                service_id_field=_id_field(vr, "service_id_field", routing.service_id_field),
+                customer_id_field=_id_field(vr, "customer_id_field", routing.customer_id_field),
+                creator_id_field=_id_field(vr, "creator_id_field", routing.creator_id_field),
+                creator_company_id_field=_id_field(vr, "creator_company_id_field", routing.creator_company_id_field),
+            )
+    except Exception as e:
+        log.error("config: eventlog parse error: %s", e)
+        return None
+
+    return routing, escalation, eventlog
+
+
+class RuntimeConfig:
+    """Текущая активная конфигурация бота.
+
+    Экземпляр живёт весь runtime процесса.
+    """
+
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        store: Optional[StateStore],
+        escalation_store_key: str = "bot:escalation",
+        config_store_key: str = "bot:config",
+    ) -> None:
+        self._log = logger
+        self._store = store
+        self._esc_store_key = escalation_store_key
+        self._config_store_key = config_store_key
+
+        # метаданные источника
+        self.version: int = 0
+        self.source: str = "env"
+        # последний уже обработанный payload из web (тот же объект ConfigClient
+        # отдаёт из своего TTL-кэша на каждом poll)
+        self._last_raw: Optional[dict[str, Any]] = None
+        # digest блоков последнего применённого web-конфига: web часто поднимает
+        # version без изменения содержимого — тогда блоки заново не разбираем.
+        self._last_digest: Optional[bytes] = None
+
+        # активные настройки
+        self.routing, self.escalation, self.eventlog = _load_env_configs(_env_snapshot(), self._log)
+
+        # менеджер эскалации (создаём лениво и только если enabled)
+        self._esc_manager: Optional[EscalationManager] = None
+        self._esc_manager_dirty = True
 
     # -----------------------------
     # Apply dynamic config
     # -----------------------------
 
-    def apply_from_web_config(self, data: dict[str, Any]) -> bool:
+    def try_load_from_store(self) -> bool:
+        """Применяет последний успешно применённый web-конфиг из state store.
+
+        Нужен на старте процесса: бот сразу работает с последним рабочим
+        конфигом, не дожидаясь web (и не откатываясь на env).
+        """
+        if self._store is None:
+            return False
+        try:
+            data = self._store.get_json(self._config_store_key)
+        except Exception as e:
+            self._log.error("config: store read error: %s", e)
+            return False
+        if not isinstance(data, dict):
+            return False
+        return self.apply_from_web_config(data, persist=False)
+
+    def apply_from_web_config(self, data: dict[str, Any], *, persist: bool = True) -> bool:
         """Применяет конфиг, пришедший из web (/config).
 
         Возвращает True, если конфиг был обновлён (версия изменилась).
+        При persist=True применённый payload сохраняется в state store
+        (см. try_load_from_store).
 
         Требования к data:
         - data["version"] должен быть int
@@ -352,18 +611,27 @@ class RuntimeConfig:
 
         Если конфиг кривой — НЕ применяем, возвращаем False.
         """
-        try:
-            new_version = int(data.get("version") or 0)
-        except Exception:
-            self._log.error("config: invalid version field")
+        # Быстрый путь: этот же объект мы уже разбирали — ничего не изменилось.
+        if data is self._last_raw:
             return False
 
+        get = data.get
+        new_version = get("version")
+        # web отдаёт version как int — int() и try/except только для строк/None.
+        if type(new_version) is not int:
+            try:
+                new_version = int(new_version or 0)
+            except (TypeError, ValueError):
+                self._log.error("config: invalid version field")
+                return False
+
         if new_version <= self.version:
+            self._last_raw = data
             return False
 
-        routing_raw = data.get("routing")
-        escalation_raw = data.get("escalation")
-        eventlog_raw = data.get("eventlog")
+        routing_raw = get("routing")
+        escalation_raw = get("escalation")
+        eventlog_raw = get("eventlog")
         if routing_raw is not None and not isinstance(routing_raw, dict):
             self._log.error("config: routing must be dict")
             return False
@@ -374,179 +642,107 @@ class RuntimeConfig:
             self._log.error("config: eventlog must be dict")
             return False
 
-        # --- routing ---
-        try:
-            rr = routing_raw or {}
-            rules = parse_rules(rr.get("rules", []))
-            default_dest = parse_destination(rr.get("default_dest"))
-            service_id_field = (rr.get("service_id_field") or "ServiceId").strip() or "ServiceId"
-            customer_id_field = (rr.get("customer_id_field") or "CustomerId").strip() or "CustomerId"
-            creator_id_field = (rr.get("creator_id_field") or "CreatorId").strip() or "CreatorId"
-            creator_company_id_field = (
-                (rr.get("creator_company_id_field") or "CreatorCompanyId").strip() or "CreatorCompanyId"
-            )
-
-            new_routing = RoutingConfig(
-                rules=rules,
-                default_dest=default_dest,
-                service_id_field=service_id_field,
-                customer_id_field=customer_id_field,
-                creator_id_field=creator_id_field,
-                creator_company_id_field=creator_company_id_field,
-            )
-        except Exception as e:
-            self._log.error("config: routing parse error: %s", e)
-            return False
-
-        # --- escalation ---
-        try:
-            er = escalation_raw or {}
-            enabled = bool(er.get("enabled", False))
-            after_s = int(er.get("after_s", 600))
-            dest = parse_destination(er.get("dest"))
-            mention = (er.get("mention") or "@duty_engineer").strip() or "@duty_engineer"
-            service_id_field = (er.get("service_id_field") or new_routing.service_id_field).strip() or new_routing.service_id_field
-            customer_id_field = (er.get("customer_id_field") or new_routing.customer_id_field).strip() or new_routing.customer_id_field
-            creator_id_field = (
-                (er.get("creator_id_field") or new_routing.creator_id_field).strip()
-                or new_routing.creator_id_field
-            )
-            creator_company_id_field = (
-                (er.get("creator_company_id_field") or new_routing.creator_company_id_field).strip()
-                or new_routing.creator_company_id_field
-            )
-
-            rules_raw = er.get("rules")
-            if rules_raw is not None:
-                rules = self._parse_escalation_rules(rules_raw, base_dest=dest, base_after_s=after_s)
-            else:
-                flt = EscalationFilter()
-                jf = er.get("filter")
-                if isinstance(jf, dict):
-                    flt = self._parse_escalation_filter(jf)
-                rules = (
-                    [EscalationRule(dest=dest, name=None, after_s=after_s, mention=None, flt=flt)]
-                    if dest is not None
-                    else []
-                )
+        # Блоки те же, что у прошлой версии: не разбираем их заново, но версию всё равно
+        # принимаем (True, persist) — иначе бот отставал бы от web по version.
+        digest = _blocks_digest(routing_raw, escalation_raw, eventlog_raw)
+        if digest is None or digest != self._last_digest:
+            parsed = _parse_web_config(routing_raw, escalation_raw, eventlog_raw, self._log)
+            if parsed is None:
+                return False
+            new_routing, new_escalation, new_eventlog = parsed
+
+            # Менеджер эскалации пересоздаём только если её настройки реально изменились:
+            # иначе теряем его in-memory state без всякой причины.
+            escalation_changed = new_escalation != self.escalation
+
+            # Применяем атомарно: сначала всё распарсили, затем "переключили".
+            self.routing = new_routing
+            self.escalation = new_escalation
+            self.eventlog = new_eventlog
+            if escalation_changed:
+                self._rebuild_escalation_manager()
 
-            new_escalation = EscalationConfig(
-                enabled=enabled,
-                after_s=after_s,
-                dest=dest,
-                mention=mention,
-                rules=rules,
-                service_id_field=service_id_field,
-                customer_id_field=customer_id_field,
-                creator_id_field=creator_id_field,
-                creator_company_id_field=creator_company_id_field,
+        old = self.version
+        self.version = new_version
+        self.source = str(get("source") or "web")
+        self._last_raw = data
+        self._last_digest = digest
+        if persist:
+            self._save_to_store(data)
+
+        if self._log.isEnabledFor(logging.INFO):
+            self._log.info(
+                "config updated: version %s -> %s (source=%s)",
+                old,
+                self.version,
+                self.source,
             )
-        except Exception as e:
-            self._log.error("config: escalation parse error: %s", e)
-            return False
+        return True
 
-        # --- eventlog ---
+    def _save_to_store(self, data: dict[str, Any]) -> None:
+        if self._store is None:
+            return
         try:
-            if eventlog_raw is None:
-                new_eventlog = EventlogConfig(
-                    rules=new_routing.rules,
-                    default_dest=new_routing.default_dest,
-                    service_id_field=new_routing.service_id_field,
-                    customer_id_field=new_routing.customer_id_field,
-                    creator_id_field=new_routing.creator_id_field,
-                    creator_company_id_field=new_routing.creator_company_id_field,
-                )
-            else:
-                er = eventlog_raw or {}
-                rules = parse_rules(er.get("rules", []))
-                default_dest = parse_destination(er.get("default_dest"))
-                service_id_field = (er.get("service_id_field") or new_routing.service_id_field).strip() or new_routing.service_id_field
-                customer_id_field = (er.get("customer_id_field") or new_routing.customer_id_field).strip() or new_routing.customer_id_field
-                creator_id_field = (
-                    (er.get("creator_id_field") or new_routing.creator_id_field).strip()
-                    or new_routing.creator_id_field
-                )
-                creator_company_id_field = (
-                    (er.get("creator_company_id_field") or new_routing.creator_company_id_field).strip()
-                    or new_routing.creator_company_id_field
-                )
-                new_eventlog = EventlogConfig(
-                    rules=rules,
-                    default_dest=default_dest,
-                    service_id_field=service_id_field,
-                    customer_id_field=customer_id_field,
-                    creator_id_field=creator_id_field,
-                    creator_company_id_field=creator_company_id_field,
-                )
+            self._store.set_json(self._config_store_key, data)
         except Exception as e:
-            self._log.error("config: eventlog parse error: %s", e)
-            return False
-
-        # Применяем атомарно: сначала всё распарсили, затем "переключили".
-        old = self.version
-        self.version = new_version
-        self.source = str(data.get("source") or "web")
-        self.routing = new_routing
-        self.escalation = new_escalation
-        self.eventlog = new_eventlog
-        self._rebuild_escalation_manager()
-
-        self._log.info(
-            "config updated: version %s -> %s (source=%s)",
-            old,
-            self.version,
-            self.source,
-        )
-        return True
+            self._log.error("config: store write error: %s", e)
 
     def _rebuild_escalation_manager(self) -> None:
-        """Пересоздаём EscalationManager под текущие настройки.
+        """Помечаем EscalationManager на пересоздание под текущие настройки.
 
         Почему пересоздаём:
         - у менеджера после инициализации фиксируются after_s и фильтры;
         - при изменении конфига проще создать новый инстанс.
 
+        Сам инстанс создаётся лениво в _get_escalation_manager: конструктор читает
+        state из store, и процессу, который не получает тикетов, это не нужно.
         State при этом сохраняется (тот же store_key в Redis/Memory).
         """
-        if not self.escalation.enabled:
-            self._esc_manager = None
-            return
-
-        self._esc_manager = EscalationManager(
-            store=self._store,
-            store_key=self._esc_store_key,
-            service_id_field=self.escalation.service_id_field,
-            customer_id_field=self.escalation.customer_id_field,
-            creator_id_field=self.escalation.creator_id_field,
-            creator_company_id_field=self.escalation.creator_company_id_field,
-            rules=self.escalation.rules,
-        )
+        self._esc_manager = None
+        self._esc_manager_dirty = True
+
+    def _get_escalation_manager(self) -> Optional[EscalationManager]:
+        if self._esc_manager_dirty:
+            self._esc_manager_dirty = False
+            if self.escalation.enabled:
+                self._esc_manager = EscalationManager(
+                    store=self._store,
+                    store_key=self._esc_store_key,
+                    service_id_field=self.escalation.service_id_field,
+                    customer_id_field=self.escalation.customer_id_field,
+                    creator_id_field=self.escalation.creator_id_field,
+                    creator_company_id_field=self.escalation.creator_company_id_field,
+                    rules=self.escalation.rules,
+                )
+        return self._esc_manager
 
     # -----------------------------
     # Public helpers
     # -----------------------------
 
     def get_escalations(self, items: list[dict]) -> list[EscalationAction]:
-        if self._esc_manager is None:
+        manager = self._get_escalation_manager()
+        if manager is None:
             return []
 
-        matches: list[EscalationMatch] = self._esc_manager.process(items)
+        matches: list[EscalationMatch] = manager.process(items)
         if not matches:
             return []
 
+        esc_dest = self.escalation.dest
+        esc_mention = self.escalation.mention
         actions: dict[tuple[int, Optional[int], str], EscalationAction] = {}
         for match in matches:
             rule = match.rule
-            dest = rule.dest or self.escalation.dest
+            dest = rule.dest or esc_dest
             if dest is None:
                 continue
 
-            mention = rule.mention or self.escalation.mention
+            mention = rule.mention or esc_mention
             key = (dest.chat_id, dest.thread_id, mention)
             action = actions.get(key)
             if action is None:
-                action = EscalationAction(dest=dest, mention=mention, items=[])
-                actions[key] = action
+                action = actions[key] = EscalationAction(dest=dest, mention=mention, items=[])
             action.items.append(match.item)
 
         return list(actions.values())
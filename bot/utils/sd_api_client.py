@@ -7,16 +7,35 @@ from __future__ import annotations
 import base64
 import json
 import logging
-import random
+import secrets
 import string
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
+from operator import itemgetter
+from typing import Any, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # orjson заметно быстрее stdlib json на больших списках Tasks; если не установлен — stdlib
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as _json_loads
 
 logger = logging.getLogger(__name__)
 
+_ACCEPT_JSON = {"Accept": "application/json"}
+
+# Сколько страниц /api/task тянем одновременно (см. list_tasks_changed_since).
+_PAGE_WORKERS = 4
+
+_USER_FIELDS = ("Id", "Name", "Login")
+_get_user_fields = itemgetter(*_USER_FIELDS)
+
+_PW_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*()-_=+"
+
 
 @dataclass(frozen=True)
 class SdApiConfig:
@@ -26,29 +45,56 @@ class SdApiConfig:
     timeout_s: float = 10.0
 
 
+def _make_session() -> requests.Session:
+    """Общая сессия с keep-alive: без неё каждый вызов SD — новый TCP+TLS handshake.
+
+    Ретраи на 502/503/504 (SD за балансировщиком иногда отдаёт их при деплое) — только
+    для GET. PUT (комментарий к задаче, сброс пароля) после 5xx/таймаута чтения мог уже
+    примениться в SD, поэтому его повторяем лишь при ошибке соединения.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 class SdApiClient:
     def __init__(self, cfg: SdApiConfig) -> None:
         self._cfg = cfg
-
-    def _basic_auth_header(self) -> dict[str, str]:
-        if not self._cfg.login or not self._cfg.password:
+        # Методы вызываются из asyncio.to_thread: пул urllib3 потокобезопасен,
+        # а состояние сессии (headers/cookies) мы не меняем.
+        self._session = _make_session()
+        self._auth: Optional[dict[str, str]] = None
+        if cfg.login and cfg.password:
+            encoded = base64.b64encode(f"{cfg.login}:{cfg.password}".encode()).decode()
+            self._auth = {"Authorization": f"Basic {encoded}"}
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _basic_auth_header(self, extra: Optional[dict[str, str]] = None) -> dict[str, str]:
+        # Заголовок считается один раз в __init__; здесь только копия + доп. заголовки.
+        if self._auth is None:
             raise ValueError("Не заданы учетные данные для авторизации.")
-        credentials = f"{self._cfg.login}:{self._cfg.password}"
-        encoded = base64.b64encode(credentials.encode()).decode()
-        return {"Authorization": f"Basic {encoded}"}
+        return {**self._auth, **extra} if extra else dict(self._auth)
 
     def find_users_by_phone(self, phone_number: str) -> list[dict[str, str]]:
         url = f"{self._cfg.base_url.rstrip('/')}/api/user"
         headers = self._basic_auth_header()
         params = {"fields": "Id,Name,Login,Phone", "Phone": phone_number}
-        response = requests.get(url, headers=headers, params=params, timeout=self._cfg.timeout_s)
+        response = self._session.get(url, headers=headers, params=params, timeout=self._cfg.timeout_s)
 
         if response.status_code == 200:
-            users = response.json().get("Users", [])
-            return [
-                {"Id": str(u.get("Id")), "Name": str(u.get("Name")), "Login": str(u.get("Login"))}
-                for u in users
-            ]
+            users = _json_loads(response.content).get("Users", [])
+            return [_user_row(u) for u in users]
         logger.warning("find_users_by_phone error: %s %s", response.status_code, response.text)
         return []
 
@@ -76,14 +122,13 @@ class SdApiClient:
 
         url = f"{self._cfg.base_url.rstrip('/')}/api/user/{user_id}"
         headers = self._basic_auth_header()
-        headers["Content-Type"] = "application/json"
         payload = {"Password": new_password, "ConfirmPassword": new_password}
 
         try:
-            response = requests.put(
+            response = self._session.put(
                 url,
                 headers=headers,
-                data=json.dumps(payload),
+                json=payload,
                 timeout=self._cfg.timeout_s,
             )
             elapsed_time = round(time.time() - start_time, 2)
@@ -97,7 +142,7 @@ class SdApiClient:
                 result["message"] = f"❌ Ошибка: код {response.status_code}, {response.text}"
 
             try:
-                result["raw_response"] = response.json()
+                result["raw_response"] = _json_loads(response.content)
             except json.JSONDecodeError:
                 result["raw_response"] = response.text
             return result
@@ -111,7 +156,7 @@ class SdApiClient:
         url = f"{self._cfg.base_url.rstrip('/')}/api/user/{user_id}"
         headers = self._basic_auth_header()
         try:
-            response = requests.get(url, headers=headers, timeout=self._cfg.timeout_s)
+            response = self._session.get(url, headers=headers, timeout=self._cfg.timeout_s)
         except requests.exceptions.RequestException as e:
             logger.warning("user_exists request error: %s", e)
             return False
@@ -124,17 +169,16 @@ class SdApiClient:
 
     def get_task(self, task_id: int, *, fields: Optional[str] = None) -> dict[str, object]:
         url = f"{self._cfg.base_url.rstrip('/')}/api/task/{task_id}"
-        headers = self._basic_auth_header()
-        headers["Accept"] = "application/json"
+        headers = self._basic_auth_header(_ACCEPT_JSON)
         params = {}
         if fields:
             params["fields"] = fields
 
-        response = requests.get(url, headers=headers, params=params, timeout=self._cfg.timeout_s)
+        response = self._session.get(url, headers=headers, params=params, timeout=self._cfg.timeout_s)
         if response.status_code >= 400:
             raise RuntimeError(f"ServiceDesk error {response.status_code}: {response.text}")
 
-        data = response.json()
+        data = _json_loads(response.content)
         if isinstance(data, dict):
             task = data.get("Task")
             if isinstance(task, dict):
@@ -157,36 +201,52 @@ class SdApiClient:
         fields: str = "Id,CategoryIds,Categories",
         category_ids: Optional[str] = None,
         pagesize: int = 200,
+        max_pages: int = 20,
     ) -> list[dict[str, object]]:
+        """Задачи, изменённые после changed_more_than (все страницы, но не больше max_pages).
+
+        fields стоит передавать минимально нужным набором: от него зависит
+        объём ответа SD и время разбора JSON.
+        """
         url = f"{self._cfg.base_url.rstrip('/')}/api/task"
-        headers = self._basic_auth_header()
-        headers["Accept"] = "application/json"
-
-        page = 1
-        tasks: list[dict[str, object]] = []
-        while True:
-            params = {
-                "ChangedMoreThan": changed_more_than,
-                "fields": fields,
-                "page": str(page),
-                "pagesize": str(pagesize),
-            }
-            if category_ids:
-                params["CategoryIds"] = category_ids
-
-            response = requests.get(url, headers=headers, params=params, timeout=self._cfg.timeout_s)
+        headers = self._basic_auth_header(_ACCEPT_JSON)
+        base_params = {
+            "ChangedMoreThan": changed_more_than,
+            "fields": fields,
+            "pagesize": str(pagesize),
+        }
+        if category_ids:
+            base_params["CategoryIds"] = category_ids
+
+        def fetch(page: int) -> dict[str, Any]:
+            params = {**base_params, "page": str(page)}
+            response = self._session.get(url, headers=headers, params=params, timeout=self._cfg.timeout_s)
             if response.status_code >= 400:
                 raise RuntimeError(f"ServiceDesk error {response.status_code}: {response.text}")
+            return _json_loads(response.content)
+
+        # Первая страница сообщает PageCount; остальные запрашиваем параллельно
+        # (не больше _PAGE_WORKERS одновременно, чтобы не нагружать SD).
+        first = fetch(1)
+        tasks: list[dict[str, object]] = list(first.get("Tasks") or [])
+        paginator = first.get("Paginator") or {}
+        page_count = int(paginator.get("PageCount", 1))
+        if page_count > max_pages:
+            # Медленный SD или слишком широкий фильтр не должны подвешивать цикл бота.
+            logger.warning(
+                "list_tasks_changed_since: PageCount=%s, fetching only first %s pages",
+                page_count,
+                max_pages,
+            )
+            page_count = max_pages
+        if page_count <= 1:
+            return tasks
 
-            data = response.json()
-            items = data.get("Tasks") or []
-            tasks.extend(items)
-
-            paginator = data.get("Paginator") or {}
-            page_count = int(paginator.get("PageCount", page))
-            if page >= page_count:
-                break
-            page += 1
+        with ThreadPoolExecutor(max_workers=min(_PAGE_WORKERS, page_count - 1)) as pool:
+            # map сохраняет порядок страниц.
+            extend = tasks.extend
+            for data in pool.map(fetch, range(2, page_count + 1)):
+                extend(data.get("Tasks") or [])
 
         return tasks
 
@@ -200,7 +260,6 @@ class SdApiClient:
     ) -> dict[str, object]:
         url = f"{self._cfg.base_url.rstrip('/')}/api/task/{task_id}"
         headers = self._basic_auth_header()
-        headers["Content-Type"] = "application/json"
 
         payload: dict[str, object] = {
             "CategoryIds": category_ids,
@@ -208,16 +267,26 @@ class SdApiClient:
             "IsPrivateComment": bool(is_private),
         }
 
-        response = requests.put(url, headers=headers, data=json.dumps(payload), timeout=self._cfg.timeout_s)
+        response = self._session.put(url, headers=headers, json=payload, timeout=self._cfg.timeout_s)
         if response.status_code >= 400:
             raise RuntimeError(f"ServiceDesk error {response.status_code}: {response.text}")
         try:
-            return response.json()
+            return _json_loads(response.content)
         except json.JSONDecodeError:
             return {"raw_response": response.text}
 
+def _user_row(u: dict[str, Any]) -> dict[str, str]:
+    # SD отдаёт все три поля (мы их запрашиваем в fields) — одна C-выборка через itemgetter;
+    # если какого-то поля нет, как и раньше подставляем "None".
+    try:
+        values = _get_user_fields(u)
+    except KeyError:
+        values = tuple(u.get(k) for k in _USER_FIELDS)
+    return dict(zip(_USER_FIELDS, map(str, values)))
+
+
 def _generate_secure_password(length: int = 12) -> str:
     if length < 8:
         raise ValueError("Длина пароля должна быть не менее 8 символов")
-    characters = string.ascii_letters + string.digits + "!@#$%^&*()-_=+"
-    return "".join(random.choice(characters) for _ in range(length))
+    # secrets, а не random: пароль уходит пользователю и не должен быть предсказуемым.
+    return "".join(secrets.choice(_PW_ALPHABET) for _ in range(length))
@@ -4,45 +4,61 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import os
+import struct
 from typing import Any, Optional
 
 
 def _to_int(value: object) -> Optional[int]:
+    # API почти всегда отдаёт Id/ServiceId уже int — без вызова int() и try.
+    if type(value) is int:
+        return value
     try:
-        return int(value)
-    except Exception:
+        return int(value)  # type: ignore[call-overload]
+    except (TypeError, ValueError, OverflowError):
         return None
 
 
+def _task_url_prefix() -> str:
+    """Общий префикс ссылки на задачу: считаем один раз на пачку, а не на каждую задачу."""
+    return f"{os.getenv('SERVICEDESK_BASE_URL', '').strip()}/task/view/"
+
+
+def _normalize_task(t: dict[str, Any], tid: int, url_prefix: str) -> dict[str, Any]:
+    return {
+        "Id": tid,
+        "Name": str(t.get("Name", "")),
+        "Creator": str(t.get("Creator", "")),
+        "Created": str(t.get("Created", "")),
+        "ServiceId": _to_int(t.get("ServiceId")),
+        "ServiceCode": str(t.get("ServiceCode", "")),
+        "ServiceName": str(t.get("ServiceName", "")),
+        "Url": f"{url_prefix}{tid}",
+    }
+
+
+def _snapshot_hash(ids: list[int]) -> str:
+    # Хэшируем сразу байты id (uint64 little-endian), без промежуточной JSON-строки.
+    # id сюда попадают уже > 0; не влезающие в 64 бита — хэшируем их десятичную запись.
+    try:
+        payload = struct.pack(f"<{len(ids)}Q", *ids)
+    except struct.error:
+        payload = ",".join(map(str, ids)).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
 def normalize_tasks_for_message(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """
     Нормализация для отображения пользователю:
     - берём Id, Name, Creator, Created, ServiceId/ServiceCode/ServiceName и ссылку
     - порядок сохраняем как пришёл от API
     """
-    base_url = (os.getenv("SERVICEDESK_BASE_URL", "").strip())
-    normalized: list[dict[str, Any]] = []
-    for t in items:
-        tid = _to_int(t.get("Id"))
-        if tid is None or tid <= 0:
-            continue
-        service_id = _to_int(t.get("ServiceId"))
-        normalized.append(
-            {
-                "Id": tid,
-                "Name": str(t.get("Name", "")),
-                "Creator": str(t.get("Creator", "")),
-                "Created": str(t.get("Created", "")),
-                "ServiceId": service_id,
-                "ServiceCode": str(t.get("ServiceCode", "")),
-                "ServiceName": str(t.get("ServiceName", "")),
-                "Url": f"{base_url}/task/view/{tid}",
-            }
-        )
-
-    return normalized
+    url_prefix = _task_url_prefix()
+    return [
+        _normalize_task(t, tid, url_prefix)
+        for t in items
+        if (tid := _to_int(t.get("Id"))) is not None and tid > 0
+    ]
 
 
 def make_ids_snapshot_hash(items: list[dict[str, Any]]) -> tuple[str, list[int]]:
@@ -50,7 +66,7 @@ def make_ids_snapshot_hash(items: list[dict[str, Any]]) -> tuple[str, list[int]]
     Снэпшот ТОЛЬКО по составу очереди:
     - берём только Id
     - сортируем
-    - считаем sha256
+    - считаем blake2b (16 байт): хэш только для сравнения, не для безопасности
 
     Возвращаем:
     - hash
@@ -64,6 +80,25 @@ def make_ids_snapshot_hash(items: list[dict[str, Any]]) -> tuple[str, list[int]]
         ids_set.add(tid)
 
     ids = sorted(ids_set)
-    payload = json.dumps(ids, ensure_ascii=False, separators=(",", ":"))
-    h = hashlib.sha256(payload.encode("utf-8")).hexdigest()
-    return h, ids
+    return _snapshot_hash(ids), ids
+
+
+def normalize_and_snapshot(items: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], str, list[int]]:
+    """
+    normalize_tasks_for_message + make_ids_snapshot_hash за один проход по items
+    (Id каждой задачи разбирается один раз).
+
+    Возвращаем (normalized, hash, ids).
+    """
+    url_prefix = _task_url_prefix()
+    normalized: list[dict[str, Any]] = []
+    ids_set: set[int] = set()
+    for t in items:
+        tid = _to_int(t.get("Id"))
+        if tid is None or tid <= 0:
+            continue
+        ids_set.add(tid)
+        normalized.append(_normalize_task(t, tid, url_prefix))
+
+    ids = sorted(ids_set)
+    return normalized, _snapshot_hash(ids), ids
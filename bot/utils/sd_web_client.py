@@ -12,6 +12,11 @@ from typing import Any, Optional
 
 import aiohttp
 
+try:  # orjson заметно быстрее stdlib json на сотнях items; если не установлен — stdlib
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as _json_loads
+
 
 @dataclass(frozen=True)
 class SdOpenResult:
@@ -27,41 +32,56 @@ class SdWebClient:
     def __init__(self, base_url: str, timeout_s: float = 3.0) -> None:
         self._base_url = base_url.rstrip("/")
         self._timeout = aiohttp.ClientTimeout(total=timeout_s)
+        # Сессию создаём лениво: в __init__ event loop может ещё не работать.
+        self._sess: Optional[aiohttp.ClientSession] = None
+
+    def _session(self) -> aiohttp.ClientSession:
+        """Одна сессия на клиент: keep-alive к web вместо нового соединения на каждый poll."""
+        if self._sess is None or self._sess.closed:
+            self._sess = aiohttp.ClientSession(
+                timeout=self._timeout,
+                connector=aiohttp.TCPConnector(limit=8, keepalive_timeout=60),
+            )
+        return self._sess
+
+    async def aclose(self) -> None:
+        if self._sess is not None and not self._sess.closed:
+            await self._sess.close()
+        self._sess = None
 
     async def get_open(self, *, limit: int = 20) -> SdOpenResult:
         url = f"{self._base_url}/sd/open"
         try:
-            async with aiohttp.ClientSession(timeout=self._timeout) as session:
-                async with session.get(url, params={"limit": str(limit)}) as r:
-                    req_id = r.headers.get("X-Request-ID")
-                    # web у тебя возвращает json даже на ошибках (502) — но на всякий случай страхуемся
-                    try:
-                        data = await r.json()
-                    except Exception:
-                        txt = await r.text()
-                        return SdOpenResult(
-                            ok=False, status_id=31, count_returned=0, items=[],
-                            error=f"Bad response (status={r.status}): {txt}",
-                            request_id=req_id,
-                        )
-
-                    if r.status >= 400 or data.get("status") == "error":
-                        return SdOpenResult(
-                            ok=False,
-                            status_id=int(data.get("status_id", 31)),
-                            count_returned=0,
-                            items=[],
-                            error=data.get("error") or str(data),
-                            request_id=req_id,
-                        )
+            async with self._session().get(url, params={"limit": str(limit)}) as r:
+                req_id = r.headers.get("X-Request-ID")
+                # web у тебя возвращает json даже на ошибках (502) — но на всякий случай страхуемся
+                try:
+                    data = _json_loads(await r.read())
+                except Exception:
+                    txt = await r.text()
+                    return SdOpenResult(
+                        ok=False, status_id=31, count_returned=0, items=[],
+                        error=f"Bad response (status={r.status}): {txt}",
+                        request_id=req_id,
+                    )
 
+                if r.status >= 400 or data.get("status") == "error":
                     return SdOpenResult(
-                        ok=True,
+                        ok=False,
                         status_id=int(data.get("status_id", 31)),
-                        count_returned=int(data.get("count_returned", 0)),
-                        items=data.get("items") or [],
+                        count_returned=0,
+                        items=[],
+                        error=data.get("error") or str(data),
                         request_id=req_id,
                     )
+
+                return SdOpenResult(
+                    ok=True,
+                    status_id=int(data.get("status_id", 31)),
+                    count_returned=int(data.get("count_returned", 0)),
+                    items=data.get("items") or [],
+                    request_id=req_id,
+                )
         except Exception as e:
             return SdOpenResult(
                 ok=False,
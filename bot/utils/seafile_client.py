@@ -7,9 +7,14 @@ from __future__ import annotations
 import logging
 import secrets
 import string
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from bot.services.seafile_store import SeafileService
 
@@ -19,9 +24,66 @@ DOWNLOAD_EXPIRE_DAYS = 7
 DOWNLOAD_PASSWORD_LENGTH = 10
 _PASSWORD_ALPHABET = string.ascii_letters + string.digits
 
+# Сессии на модуль: keep-alive к Seafile вместо нового TLS-соединения на каждый
+# запрос (getlink — до 3-4 запросов подряд). Функции вызываются из asyncio.to_thread,
+# пул urllib3 потокобезопасен, состояние сессий мы не меняем.
+def _make_session(retry: Retry) -> requests.Session:
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Идемпотентные запросы (GET и POST /api2/auth-token/): повторяем и на 429/5xx шлюза,
+# Retry-After на 429 urllib3 учитывает сам.
+_SESSION = _make_session(
+    Retry(
+        total=3,
+        connect=2,
+        read=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    )
+)
+# POST, создающие папки и ссылки: повтор после 5xx/таймаута чтения может создать вторую
+# ссылку (или папку «42 (1)»), поэтому повторяем только ошибки соединения —
+# тогда запрос до Seafile не дошёл.
+_CREATE_SESSION = _make_session(
+    Retry(total=2, connect=2, read=0, status=0, other=0, backoff_factor=0.3, allowed_methods=frozenset({"GET"}))
+)
+
+# Для параллельных запросов внутри одного вызова (см. get_download_link).
+_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="seafile")
+
+# Токены, полученные по username/password: (base_url, username) -> (token, expires_at monotonic).
+# Без кэша каждый getlink делал лишний POST /api2/auth-token/.
+AUTH_TOKEN_TTL_S = 3600.0
+_TOKEN_CACHE: dict[tuple[str, str], tuple[str, float]] = {}
+
+
+@lru_cache(maxsize=64)
+def _base(base_url: str) -> str:
+    """base_url без завершающего '/'; сервисов единицы, rstrip не повторяем на каждый запрос."""
+    return base_url.rstrip("/")
+
+
+# 248 = 62 * 4: байты >= 248 отбрасываем, чтобы b % 62 было равномерным.
+_PASSWORD_BYTE_LIMIT = 256 - 256 % len(_PASSWORD_ALPHABET)
+
 
 def _generate_password(length: int = DOWNLOAD_PASSWORD_LENGTH) -> str:
-    return "".join(secrets.choice(_PASSWORD_ALPHABET) for _ in range(length))
+    # Один token_bytes с запасом вместо length вызовов secrets.choice (каждый — чтение urandom).
+    out: list[str] = []
+    while len(out) < length:
+        for b in secrets.token_bytes(length * 2):
+            if b < _PASSWORD_BYTE_LIMIT:
+                out.append(_PASSWORD_ALPHABET[b % len(_PASSWORD_ALPHABET)])
+                if len(out) == length:
+                    break
+    return "".join(out)
 
 
 def _get_auth_token(service: SeafileService) -> Optional[str]:
@@ -29,45 +91,57 @@ def _get_auth_token(service: SeafileService) -> Optional[str]:
     if token:
         return token
     if service.username and service.password:
+        key = (service.base_url, service.username)
+        now = time.monotonic()
+        cached = _TOKEN_CACHE.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
         try:
-            res = requests.post(
-                f"{service.base_url.rstrip('/')}/api2/auth-token/",
+            res = _SESSION.post(
+                f"{_base(service.base_url)}/api2/auth-token/",
                 data={"username": service.username, "password": service.password},
                 timeout=10,
             )
             data = res.json()
             raw = str(data.get("token") or "").strip()
             if raw:
-                return f"Token {raw}"
+                token = f"Token {raw}"
+                _TOKEN_CACHE[key] = (token, now + AUTH_TOKEN_TTL_S)
+                return token
         except Exception as e:
             logger.warning("Seafile auth-token error: %s", e)
     return None
 
 
+def _invalidate_token(service: SeafileService) -> None:
+    """Забыть закэшированный токен (Seafile ответил 401/403) — следующий вызов перелогинится."""
+    _TOKEN_CACHE.pop((service.base_url, service.username), None)
+
+
+def _check_auth(res: requests.Response, service: SeafileService) -> None:
+    if res.status_code in (401, 403):
+        logger.warning("Seafile auth rejected (status=%s), dropping cached token", res.status_code)
+        _invalidate_token(service)
+
+
 def getlink(task_id: str, service: SeafileService) -> str:
     token = _get_auth_token(service)
     if not token:
         return "err"
 
-    if _check_link(task_id, service, token):
+    # Обычно папка уже есть и ссылка создаётся с первого запроса; повторяем
+    # только после mkdir, если Seafile ответил error_msg (папки нет).
+    res = _make_link(task_id, service, token)
+    if not res.get("link") and res.get("error_msg"):
+        if _make_folder(task_id, service, token) != "success":
+            return "err"
         res = _make_link(task_id, service, token)
-        link = res.get("link")
-        if link:
-            return str(f"{task_id}\n{link}")
+    link = res.get("link")
+    if link:
+        return str(f"{task_id}\n{link}")
     return "err"
 
 
-def _check_link(task_id: str, service: SeafileService, token: str) -> bool:
-    result = _make_link(task_id, service, token)
-    try:
-        if result["error_msg"]:
-            res = _make_folder(task_id, service, token)
-            if res == "success":
-                return True
-    except KeyError:
-        return True
-    return False
-
 def _list_share_links(task_id: str, service: SeafileService, token: str) -> Optional[list[dict]]:
     headers = {
         "Authorization": token,
@@ -77,8 +151,8 @@ def _list_share_links(task_id: str, service: SeafileService, token: str) -> Opti
     params = {"repo_id": service.repo_id, "path": path}
 
     try:
-        res = requests.get(
-            f"{service.base_url.rstrip('/')}/api/v2.1/share-links/",
+        res = _SESSION.get(
+            f"{_base(service.base_url)}/api/v2.1/share-links/",
             headers=headers,
             params=params,
             timeout=10,
@@ -112,6 +186,9 @@ def get_download_link(task_id: str, service: SeafileService) -> dict:
     if not token:
         return {"status": "err"}
 
+    # Проверка папки и список share-ссылок независимы — запрашиваем параллельно.
+    # Если папки нет, результат списка просто не нужен.
+    links_future = _POOL.submit(_list_share_links, task_id, service, token)
     exists = _folder_exists(task_id, service, token)
     if exists is None:
         return {"status": "err"}
@@ -119,7 +196,7 @@ def get_download_link(task_id: str, service: SeafileService) -> dict:
         return {"status": "missing"}
 
     # 1) GET existing
-    links = _list_share_links(task_id, service, token)
+    links = links_future.result()
     if links:
         # берём первую (или можно выбрать “самую свежую” по ctime, если поле есть)
         link = (links[0] or {}).get("link")
@@ -162,12 +239,13 @@ def _make_link(task_id: str, service: SeafileService, token: str) -> dict:
     }
     path = "/" + task_id + "/"
     data = {"path": path, "repo_id": service.repo_id}
-    res = requests.post(
-        f"{service.base_url.rstrip('/')}/api/v2.1/upload-links/",
+    res = _CREATE_SESSION.post(
+        f"{_base(service.base_url)}/api/v2.1/upload-links/",
         data=data,
         headers=headers,
         timeout=10,
     )
+    _check_auth(res, service)
     return res.json()
 
 
@@ -189,8 +267,8 @@ def _make_download_link(
         "expire_days": str(DOWNLOAD_EXPIRE_DAYS),
         "password": password,
     }
-    res = requests.post(
-        f"{service.base_url.rstrip('/')}/api/v2.1/share-links/",
+    res = _CREATE_SESSION.post(
+        f"{_base(service.base_url)}/api/v2.1/share-links/",
         data=data,
         headers=headers,
         timeout=10,
@@ -203,13 +281,14 @@ def _folder_exists(task_id: str, service: SeafileService, token: str) -> Optiona
         "Authorization": token,
         "Accept": "application/json;charset=utf-8;indent=4",
     }
-    res = requests.get(
-        f"{service.base_url.rstrip('/')}/api2/repos/{service.repo_id}/dir/?p=/{task_id}",
+    res = _SESSION.get(
+        f"{_base(service.base_url)}/api2/repos/{service.repo_id}/dir/?p=/{task_id}",
         headers=headers,
         timeout=10,
     )
     if res.status_code == 200:
         return True
+    _check_auth(res, service)
     if res.status_code == 404:
         return False
     logger.warning("Seafile folder check unexpected status: %s", res.status_code)
@@ -222,8 +301,8 @@ def _make_folder(task_id: str, service: SeafileService, token: str):
         "Authorization": token,
         "Accept": "application/json;charset=utf-8;indent=4",
     }
-    res = requests.post(
-        f"{service.base_url.rstrip('/')}/api2/repos/{service.repo_id}/dir/?p=/{task_id}",
+    res = _CREATE_SESSION.post(
+        f"{_base(service.base_url)}/api2/repos/{service.repo_id}/dir/?p=/{task_id}",
         data=data,
         headers=headers,
         timeout=10,
@@ -36,13 +36,27 @@ import time
 from dataclasses import asdict, is_dataclass
 from typing import Any, Optional, Protocol
 
-import redis
+try:  # orjson быстрее stdlib json и сразу отдаёт bytes (redis-py пишет их как есть)
+    import orjson
+
+    def _dumps(value: Any) -> bytes | str:
+        # OPT_NON_STR_KEYS — как json.dumps: int-ключи словарей превращаются в строки.
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover
+
+    def _dumps(value: Any) -> bytes | str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    _loads = json.loads
 
 
 class StateStore(Protocol):
     """Минимальный интерфейс, который нужен polling-логике."""
 
-    def get_json(self, name: str) -> Optional[dict[str, Any]]:  # pragma: no cover (protocol)
+    def get_json(self, name: str, *, copy: bool = True) -> Optional[dict[str, Any]]:  # pragma: no cover (protocol)
+        """copy=False: вызывающий обещает не менять результат (memory store отдаст его без копии)."""
         ...
 
     def set_json(self, name: str, value: dict[str, Any], ttl_s: Optional[int] = None) -> None:  # pragma: no cover
@@ -71,16 +85,21 @@ class RedisStateStore:
         socket_timeout_s: float = 1.0,
         socket_connect_timeout_s: float = 1.0,
     ) -> None:
+        # Ленивый импорт: redis-py тянет ssl/hiredis, а процессам без Redis (тесты,
+        # memory-режим) он не нужен.
+        import redis
+
         self._r = redis.Redis.from_url(
             redis_url,
             decode_responses=True,
             socket_timeout=socket_timeout_s,
             socket_connect_timeout=socket_connect_timeout_s,
         )
-        self._prefix = prefix.rstrip(":")
+        self._prefix = prefix.rstrip(":") + ":"
 
-    def _key(self, name: str) -> str:
-        return f"{self._prefix}:{name}"
+    def key(self, name: str) -> str:
+        """Полный ключ (с префиксом) для name — аргумент для get_raw."""
+        return self._prefix + name
 
     def backend(self) -> str:
         return "redis"
@@ -89,15 +108,20 @@ class RedisStateStore:
         """Быстрая проверка доступности Redis."""
         return bool(self._r.ping())
 
-    def get_json(self, name: str) -> Optional[dict[str, Any]]:
-        raw = self._r.get(self._key(name))
+    def get_json(self, name: str, *, copy: bool = True) -> Optional[dict[str, Any]]:
+        # copy не нужен: каждый раз десериализуем новый объект.
+        return self.get_raw(self.key(name))
+
+    def get_raw(self, key: str, *, copy: bool = True) -> Optional[dict[str, Any]]:
+        """Чтение по уже собранному ключу (см. key и ResilientStateStore.get_json)."""
+        raw = self._r.get(key)
         if not raw:
             return None
-        return json.loads(raw)
+        return _loads(raw)
 
     def set_json(self, name: str, value: dict[str, Any], ttl_s: Optional[int] = None) -> None:
-        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
-        key = self._key(name)
+        raw = _dumps(value)
+        key = self.key(name)
         if ttl_s is None:
             self._r.set(key, raw)
         else:
@@ -117,25 +141,41 @@ class MemoryStateStore:
     """
 
     def __init__(self, prefix: str = "testci") -> None:
-        self._prefix = prefix.rstrip(":")
+        self._prefix = prefix.rstrip(":") + ":"
         self._data: dict[str, dict[str, Any]] = {}
 
-    def _key(self, name: str) -> str:
-        return f"{self._prefix}:{name}"
+    def key(self, name: str) -> str:
+        """Полный ключ (с префиксом) для name — аргумент для get_raw."""
+        return self._prefix + name
 
     def backend(self) -> str:
         return "memory"
 
-    def get_json(self, name: str) -> Optional[dict[str, Any]]:
-        # ВАЖНО: возвращаем копию, чтобы вызывающая сторона случайно не модифицировала
-        # внутреннее состояние хранилища.
-        v = self._data.get(self._key(name))
-        return dict(v) if v is not None else None
+    def get_json(self, name: str, *, copy: bool = True) -> Optional[dict[str, Any]]:
+        # ВАЖНО: по умолчанию возвращаем копию, чтобы вызывающая сторона случайно не
+        # модифицировала внутреннее состояние хранилища. copy=False — для тех, кто
+        # только читает (при недоступном Redis это горячий путь).
+        return self.get_raw(self.key(name), copy=copy)
 
-    def set_json(self, name: str, value: dict[str, Any], ttl_s: Optional[int] = None) -> None:
+    def get_raw(self, key: str, *, copy: bool = True) -> Optional[dict[str, Any]]:
+        """Чтение по уже собранному ключу (см. key и ResilientStateStore.get_json)."""
+        v = self._data.get(key)
+        if v is None or not copy:
+            return v
+        return dict(v)
+
+    def set_json(
+        self,
+        name: str,
+        value: dict[str, Any],
+        ttl_s: Optional[int] = None,
+        *,
+        copy: bool = True,
+    ) -> None:
         # TTL в памяти не реализуем — это аварийный режим.
+        # copy=False — вызывающий отдаёт value во владение store и больше его не меняет.
         _ = ttl_s
-        self._data[self._key(name)] = dict(value)
+        self._data[self.key(name)] = dict(value) if copy else value
 
 
 class ResilientStateStore:
@@ -146,20 +186,41 @@ class ResilientStateStore:
     - Если Redis упал/недоступен, не падаем сами, а используем MemoryStateStore.
     - При следующей успешной операции Redis считаем его восстановившимся.
 
+    Circuit breaker: после ошибки Redis не трогаем retry_interval_s секунд
+    (интервал растёт экспоненциально до max_retry_interval_s) — операции сразу идут
+    в память, а не ждут socket_connect_timeout на каждом вызове. ping() всегда
+    проверяет Redis и при успехе закрывает breaker.
+
     Диагностика:
     - last_error: текст последней ошибки Redis
     - last_ok_ts: когда Redis последний раз успешно отработал
     - active_backend: текущий активный backend ("redis" или "memory")
     """
 
-    def __init__(self, primary: RedisStateStore, fallback: MemoryStateStore) -> None:
+    def __init__(
+        self,
+        primary: RedisStateStore,
+        fallback: MemoryStateStore,
+        *,
+        retry_interval_s: float = 5.0,
+        max_retry_interval_s: float = 60.0,
+    ) -> None:
         self._primary = primary
         self._fallback = fallback
+        self._retry_interval_s = retry_interval_s
+        self._max_retry_interval_s = max_retry_interval_s
 
         self.active_backend: str = "redis"
         self.last_error: Optional[str] = None
         self.last_ok_ts: Optional[float] = None
 
+        # breaker: до какого момента (time.monotonic) Redis не трогаем; 0.0 — закрыт
+        self._open_until: float = 0.0
+        self._fail_streak: int = 0
+
+        # При одинаковом префиксе (обычный случай) ключ для get_json собираем один раз на оба store.
+        self._same_prefix = primary.key("") == fallback.key("")
+
     def backend(self) -> str:
         return self.active_backend
 
@@ -167,10 +228,18 @@ class ResilientStateStore:
         self.active_backend = "redis"
         self.last_ok_ts = time.time()
         self.last_error = None
+        self._open_until = 0.0
+        self._fail_streak = 0
 
     def _mark_fail(self, e: Exception) -> None:
         self.active_backend = "memory"
         self.last_error = str(e)
+        delay = min(self._max_retry_interval_s, self._retry_interval_s * (2 ** self._fail_streak))
+        self._fail_streak += 1
+        self._open_until = time.monotonic() + delay
+
+    def _is_open(self) -> bool:
+        return time.monotonic() < self._open_until
 
     def ping(self) -> bool:
         """Пробуем ping'нуть Redis. Если не получилось — включаем memory режим."""
@@ -183,16 +252,22 @@ class ResilientStateStore:
             self._mark_fail(e)
             return False
 
-    def get_json(self, name: str) -> Optional[dict[str, Any]]:
+    def get_json(self, name: str, *, copy: bool = True) -> Optional[dict[str, Any]]:
+        if self._is_open():
+            return self._fallback.get_json(name, copy=copy)
+        key = self._primary.key(name)
         try:
-            v = self._primary.get_json(name)
+            v = self._primary.get_raw(key)
             self._mark_ok()
             return v
         except Exception as e:
             self._mark_fail(e)
-            return self._fallback.get_json(name)
+            return self._fallback.get_raw(key if self._same_prefix else self._fallback.key(name), copy=copy)
 
     def set_json(self, name: str, value: dict[str, Any], ttl_s: Optional[int] = None) -> None:
+        if self._is_open():
+            self._fallback.set_json(name, value, ttl_s=ttl_s)
+            return
         try:
             self._primary.set_json(name, value, ttl_s=ttl_s)
             self._mark_ok()
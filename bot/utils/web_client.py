@@ -14,12 +14,13 @@ import asyncio
 import time
 import uuid
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Tuple
 
 import aiohttp
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WebCheckResult:
     ok: bool
     status: Optional[int]
@@ -28,29 +29,60 @@ class WebCheckResult:
     request_id: str
 
 
+@lru_cache(maxsize=4)
+def _token_headers(header: str, token: str) -> dict[str, str]:
+    """
+    Заголовок с токеном; токены admin/config стабильны, словарь строим один раз.
+    Результат общий — не изменять (aiohttp его только читает).
+    """
+    return {header: token} if token else {}
+
+
 class WebClient:
     def __init__(self, base_url: str, timeout_s: float = 1.5, cache_ttl_s: float = 3.0) -> None:
         self.base_url = base_url.rstrip("/")
+        # URL собираем один раз: base_url после __init__ не меняется.
+        self._probe_urls = {path: self.base_url + path for path in ("/health", "/ready")}
+        self._config_url = self.base_url + "/config"
+        self._diff_url = self.base_url + "/config/diff"
+        self._rollbacks_url = self.base_url + "/config/rollbacks"
         self.timeout_s = timeout_s
         self.cache_ttl_s = cache_ttl_s
 
         # cache: (ts, health_res, ready_res)
         self._cache: Optional[Tuple[float, WebCheckResult, WebCheckResult]] = None
-        self._lock = asyncio.Lock()
+        # текущая пара запросов /health + /ready (single-flight, см. check_health_ready)
+        self._inflight: Optional[asyncio.Future[Tuple[WebCheckResult, WebCheckResult]]] = None
+
+        self._timeout = aiohttp.ClientTimeout(total=timeout_s)
+        # Сессию создаём лениво: в __init__ event loop может ещё не работать.
+        self._sess: Optional[aiohttp.ClientSession] = None
+
+    def _session(self) -> aiohttp.ClientSession:
+        """Одна сессия на клиент: keep-alive к web вместо нового соединения на каждую проверку."""
+        if self._sess is None or self._sess.closed:
+            self._sess = aiohttp.ClientSession(
+                timeout=self._timeout,
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=30),
+            )
+        return self._sess
+
+    async def aclose(self) -> None:
+        if self._sess is not None and not self._sess.closed:
+            await self._sess.close()
+        self._sess = None
 
     async def _get(self, path: str, request_id: str) -> WebCheckResult:
-        url = f"{self.base_url}{path}"
+        url = self._probe_urls.get(path) or self.base_url + path
         t0 = time.perf_counter()
-        timeout = aiohttp.ClientTimeout(total=self.timeout_s)
 
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, headers={"X-Request-ID": request_id}) as r:
-                    # Нам важен сам статус. Тело можно не читать полностью.
-                    await r.read()
-                    ok = 200 <= r.status < 300
-                    dt = int((time.perf_counter() - t0) * 1000)
-                    return WebCheckResult(ok=ok, status=r.status, error=None, duration_ms=dt, request_id=request_id)
+            # Нам важен только статус: HEAD (Flask отвечает на него для любого GET-роута),
+            # тела нет — нечего читать и буферизовать.
+            async with self._session().head(url, headers={"X-Request-ID": request_id}, allow_redirects=False) as r:
+                ok = 200 <= r.status < 300
+                dt = int((time.perf_counter() - t0) * 1000)
+                return WebCheckResult(ok=ok, status=r.status, error=None, duration_ms=dt, request_id=request_id)
         except Exception as e:
             dt = int((time.perf_counter() - t0) * 1000)
             return WebCheckResult(ok=False, status=None, error=str(e), duration_ms=dt, request_id=request_id)
@@ -58,37 +90,48 @@ class WebClient:
     async def check_health_ready(self, force: bool = False) -> Tuple[WebCheckResult, WebCheckResult]:
         """
         Возвращает (health, ready). Использует TTL-кэш.
+
+        Single-flight: параллельные вызовы ждут одну и ту же пару запросов,
+        а не выстраиваются в очередь за lock'ом на время сетевого I/O.
         """
+        if not force and self._cache:
+            ts, health, ready = self._cache
+            if (time.time() - ts) <= self.cache_ttl_s:
+                return health, ready
+
+        inflight = self._inflight
+        if inflight is None:
+            inflight = self._inflight = asyncio.ensure_future(self._probe())
+            inflight.add_done_callback(self._clear_inflight)
+        # shield: отмена одного из ждущих не должна отменять общий запрос.
+        return await asyncio.shield(inflight)
+
+    async def _probe(self) -> Tuple[WebCheckResult, WebCheckResult]:
         now = time.time()
-
-        async with self._lock:
-            if not force and self._cache:
-                ts, health, ready = self._cache
-                if (now - ts) <= self.cache_ttl_s:
-                    return health, ready
-
-            request_id = str(uuid.uuid4())
-            health_task = self._get("/health", request_id=request_id)
-            ready_task = self._get("/ready", request_id=request_id)
-            health, ready = await asyncio.gather(health_task, ready_task)
-
-            self._cache = (now, health, ready)
-            return health, ready
+        request_id = str(uuid.uuid4())
+        health, ready = await asyncio.gather(
+            self._get("/health", request_id=request_id),
+            self._get("/ready", request_id=request_id),
+        )
+        self._cache = (now, health, ready)
+        return health, ready
+
+    def _clear_inflight(self, fut: "asyncio.Future[Tuple[WebCheckResult, WebCheckResult]]") -> None:
+        if self._inflight is fut:
+            self._inflight = None
 
     async def get_rollbacks(self, *, window_s: int, admin_token: str) -> dict[str, object]:
         """
         Возвращает статистику rollback за период.
         """
-        url = f"{self.base_url}/config/rollbacks"
-        timeout = aiohttp.ClientTimeout(total=self.timeout_s)
-        headers = {"X-Admin-Token": admin_token} if admin_token else {}
+        url = self._rollbacks_url
+        headers = _token_headers("X-Admin-Token", admin_token)
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, params={"window_s": str(window_s)}, headers=headers) as r:
-                    data = await r.json()
-                    if r.status >= 400:
-                        return {"ok": False, "error": data.get("error") or str(data)}
-                    return {"ok": True, "data": data}
+            async with self._session().get(url, params={"window_s": str(window_s)}, headers=headers) as r:
+                data = await r.json()
+                if r.status >= 400:
+                    return {"ok": False, "error": data.get("error") or str(data)}
+                return {"ok": True, "data": data}
         except Exception as e:
             return {"ok": False, "error": str(e)}
 
@@ -96,20 +139,18 @@ class WebClient:
         """
         Возвращает diff между версиями конфига.
         """
-        url = f"{self.base_url}/config/diff"
-        timeout = aiohttp.ClientTimeout(total=self.timeout_s)
-        headers = {"X-Admin-Token": admin_token} if admin_token else {}
+        url = self._diff_url
+        headers = _token_headers("X-Admin-Token", admin_token)
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(
-                    url,
-                    params={"from": str(v_from), "to": str(v_to)},
-                    headers=headers,
-                ) as r:
-                    data = await r.json()
-                    if r.status >= 400:
-                        return {"ok": False, "error": data.get("error") or str(data)}
-                    return {"ok": True, "data": data}
+            async with self._session().get(
+                url,
+                params={"from": str(v_from), "to": str(v_to)},
+                headers=headers,
+            ) as r:
+                data = await r.json()
+                if r.status >= 400:
+                    return {"ok": False, "error": data.get("error") or str(data)}
+                return {"ok": True, "data": data}
         except Exception as e:
             return {"ok": False, "error": str(e)}
 
@@ -117,16 +158,14 @@ class WebClient:
         """
         Возвращает текущий /config (read-only).
         """
-        url = f"{self.base_url}/config"
-        timeout = aiohttp.ClientTimeout(total=self.timeout_s)
-        headers = {"X-Config-Token": token} if token else {}
+        url = self._config_url
+        headers = _token_headers("X-Config-Token", token)
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, headers=headers) as r:
-                    data = await r.json()
-                    if r.status >= 400:
-                        return {"ok": False, "status": r.status, "error": data.get("error") or str(data)}
-                    return {"ok": True, "status": r.status, "data": data}
+            async with self._session().get(url, headers=headers) as r:
+                data = await r.json()
+                if r.status >= 400:
+                    return {"ok": False, "status": r.status, "error": data.get("error") or str(data)}
+                return {"ok": True, "status": r.status, "data": data}
         except Exception as e:
             return {"ok": False, "error": str(e)}
 
@@ -134,15 +173,13 @@ class WebClient:
         """
         Обновляет /config (admin only).
         """
-        url = f"{self.base_url}/config"
-        timeout = aiohttp.ClientTimeout(total=self.timeout_s)
-        headers = {"X-Admin-Token": admin_token} if admin_token else {}
+        url = self._config_url
+        headers = _token_headers("X-Admin-Token", admin_token)
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.put(url, json=data, headers=headers) as r:
-                    payload = await r.json()
-                    if r.status >= 400:
-                        return {"ok": False, "status": r.status, "error": payload.get("error") or str(payload)}
-                    return {"ok": True, "status": r.status, "data": payload}
+            async with self._session().put(url, json=data, headers=headers) as r:
+                payload = await r.json()
+                if r.status >= 400:
+                    return {"ok": False, "status": r.status, "error": payload.get("error") or str(payload)}
+                return {"ok": True, "status": r.status, "data": payload}
         except Exception as e:
             return {"ok": False, "error": str(e)}
@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
+import base64
 from dataclasses import dataclass
 from typing import Any, Optional
 
 import aiohttp
 
+try:  # orjson быстрее stdlib json; если не установлен — stdlib
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as _json_loads
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Paginator:
     count: int
     page: int
@@ -17,7 +23,7 @@ class Paginator:
     count_on_page: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TaskShort:
     id: int
     name: str
@@ -43,7 +49,9 @@ class IntraServiceClient:
         timeout_s: float = 10.0,
     ) -> None:
         self._base_url = base_url.rstrip("/")
-        self._auth = aiohttp.BasicAuth(login=login, password=password)
+        # Basic-заголовок считаем один раз: aiohttp с auth=BasicAuth кодирует его на каждый запрос.
+        token = base64.b64encode(f"{login}:{password}".encode()).decode()
+        self._headers = {"Accept": "application/json", "Authorization": f"Basic {token}"}
         self._session = session
         self._timeout = aiohttp.ClientTimeout(total=timeout_s)
 
@@ -70,34 +78,34 @@ class IntraServiceClient:
         async with self._session.get(
             url,
             params=params,
-            auth=self._auth,
             timeout=self._timeout,
-            headers={"Accept": "application/json"},
+            headers=self._headers,
         ) as resp:
-            # Если авторизация/права/URL неверные — тут будет понятная диагностика
-            text = await resp.text()
+            # Если авторизация/права/URL неверные — тут будет понятная диагностика.
+            # Текст тела читаем только на ошибке; в успешном случае разбираем bytes один раз.
             if resp.status >= 400:
+                text = await resp.text()
                 raise RuntimeError(f"IntraService API error {resp.status}: {text}")
 
-            data: dict[str, Any] = await resp.json()
+            data: dict[str, Any] = _json_loads(await resp.read())
 
         tasks_raw = data.get("Tasks") or []
         paginator_raw = data.get("Paginator") or {}
 
-        tasks: list[TaskShort] = []
-        for t in tasks_raw:
-            # IntraService отдаёт поля с такими именами, если ты их запросил через fields.
-            tasks.append(
-                TaskShort(
-                    id=int(t.get("Id")),
-                    name=str(t.get("Name", "")),
-                    created=t.get("Created"),
-                    creator=t.get("Creator"),
-                    service_id=t.get("ServiceId"),
-                    priority_id=t.get("PriorityId"),
-                    status_id=t.get("StatusId"),
-                )
+        # IntraService отдаёт поля с такими именами, если ты их запросил через fields.
+        # Порядок аргументов — как в TaskShort: id, name, created, creator, service_id, priority_id, status_id.
+        tasks = [
+            TaskShort(
+                int(t["Id"]),
+                str(t.get("Name", "")),
+                t.get("Created"),
+                t.get("Creator"),
+                t.get("ServiceId"),
+                t.get("PriorityId"),
+                t.get("StatusId"),
             )
+            for t in tasks_raw
+        ]
 
         paginator = Paginator(
             count=int(paginator_raw.get("Count", 0)),
@@ -11,8 +11,25 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Корень проекта = родительская директория папки tests
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Один Flask test client на весь прогон: app собирается при импорте app.py,
+    а test client без cookie-состояния между тестами не нужен заново.
+
+    Общий app только читают: состояние роутов хранится per-app (app.extensions),
+    поэтому тест, которому нужен другой конфиг/env, собирает своё приложение через
+    web.app.create_app(), а не меняет это.
+    """
+    from app import app
+
+    return app.test_client()
@@ -16,13 +16,14 @@
 # import sys
 # from pathlib import Path
 
-from app import app
+from flask import jsonify, request
+
+from web.json_provider import json_response
 
 # # -----------------------------------------------------------------------------
 
-def test_health_endpoint_returns_ok() -> None:
+def test_health_endpoint_returns_ok(client) -> None:
     """Проверяем, что /health возвращает статус 200 и правильный JSON."""
-    client = app.test_client()
     response = client.get("/health")
 
     assert response.status_code == 200
@@ -32,12 +33,87 @@ def test_health_endpoint_returns_ok() -> None:
     assert data.get("status") == "ok"
 
 
-def test_index_endpoint_returns_text() -> None:
+def test_index_endpoint_returns_text(client) -> None:
     """Проверяем, что / возвращает статус 200 и не пустой текст."""
-    client = app.test_client()
     response = client.get("/")
 
     assert response.status_code == 200
     # content-type может быть text/html; charset=utf-8 — нам важнее содержимое
     text = response.get_data(as_text=True)
     assert "testCI service is running" in text
+
+
+def test_no_static_route(client) -> None:
+    """Статики нет — правило /static не регистрируется."""
+    assert client.get("/static/app.js").status_code == 404
+    assert "static" not in {rule.endpoint for rule in client.application.url_map.iter_rules()}
+
+
+def test_json_provider_roundtrip(client) -> None:
+    """jsonify / get_json работают через orjson-провайдер."""
+    app = client.application
+    assert type(app.json).__name__ == "OrjsonProvider"
+    with app.test_request_context("/", method="PUT", data=b'{"b": [1, 2], "a": "\xd1\x8f"}', content_type="application/json"):
+        assert request.get_json() == {"b": [1, 2], "a": "я"}
+        resp = jsonify({"b": 1, "a": None, 3: "x"})
+        assert resp.get_data() == b'{"3":"x","a":null,"b":1}\n'
+
+
+def test_json_response_matches_jsonify(client) -> None:
+    """json_response отдаёт те же байты, что jsonify, и ставит статус."""
+    obj = {"b": [1, 2], "a": "я", 3: None}
+    with client.application.app_context():
+        resp = json_response(obj, 503)
+        assert resp.status_code == 503
+        assert resp.mimetype == "application/json"
+        assert resp.get_data() == jsonify(obj).get_data()
+
+
+def test_prebuilt_probe_responses(client) -> None:
+    """/health и /status отдают заранее собранные тела, заголовки запроса не протекают."""
+    first = client.get("/health", headers={"X-Request-ID": "a"})
+    second = client.get("/health")
+    assert first.get_data() == second.get_data() == b'{"status":"ok"}\n'
+    assert first.headers["Cache-Control"] == "no-store"
+    assert second.headers["X-Request-ID"] != "a"
+
+    data = client.get("/status").get_json()
+    assert data["status"] == "ok"
+    assert set(data) == {"status", "environment", "git_sha"}
+
+
+def test_json_helpers_encode_non_json_types(client) -> None:
+    """Decimal / UUID / dataclass кодируются как у jsonify, а не падают с TypeError."""
+    import dataclasses
+    import decimal
+    import uuid
+
+    from web.json_provider import json_bytes
+
+    @dataclasses.dataclass
+    class _Point:
+        x: int
+
+    obj = {"d": decimal.Decimal("1.5"), "u": uuid.UUID(int=1), "p": _Point(2)}
+    with client.application.app_context():
+        expected = jsonify(obj).get_data()
+        assert json_response(obj, 201).get_data() == expected
+        assert json_bytes(obj) == expected
+    assert b'"d":"1.5"' in expected
+
+
+def test_json_provider_keeps_flask_datetime_format(client) -> None:
+    """Даты на проводе — HTTP-date, как у стандартного провайдера Flask."""
+    from datetime import date, datetime, timezone
+
+    from flask.json.provider import DefaultJSONProvider
+
+    from web.json_provider import json_bytes
+
+    obj = {"at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), "day": date(2024, 1, 2)}
+    app = client.application
+    with app.app_context():
+        body = jsonify(obj).get_data()
+        assert body == json_bytes(obj)
+        assert app.json.loads(body) == DefaultJSONProvider(app).loads(DefaultJSONProvider(app).dumps(obj))
+    assert b'"at":"Tue, 02 Jan 2024 03:04:05 GMT"' in body
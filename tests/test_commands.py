@@ -0,0 +1,22 @@
+"""
+Unit-тесты текстов команд бота (без Telegram: только сборка сообщений).
+"""
+
+from __future__ import annotations
+
+import logging
+
+from bot.handlers.commands import _config_summary_text
+from bot.utils.runtime_config import RuntimeConfig
+
+_LOG = logging.getLogger("test.commands")
+
+
+def test_config_summary_rules_line_for_disabled_escalation() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    rules = [{"dest": {"chat_id": 1}}]
+    assert rc.apply_from_web_config({"version": 1, "escalation": {"enabled": False, "after_s": 90, "rules": rules}})
+    assert "- escalation.rules: не разбираются, эскалация выключена (after_s=90)" in _config_summary_text(rc)
+
+    assert rc.apply_from_web_config({"version": 2, "escalation": {"enabled": True, "after_s": 90, "rules": rules}})
+    assert "- escalation.rules: 1 (after_s=90)" in _config_summary_text(rc)
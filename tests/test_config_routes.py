@@ -0,0 +1,175 @@
+"""
+Тесты роутов /config без БД (fallback-конфиг и проверка токенов).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from flask.testing import FlaskClient
+from sqlalchemy import create_engine
+
+from web import db
+from web.app import create_app
+from web.db import LazyEngine
+from web.routes import config as config_routes
+
+
+@pytest.fixture()
+def token_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[FlaskClient]:
+    monkeypatch.setenv("CONFIG_TOKEN", "read")
+    monkeypatch.setenv("CONFIG_ADMIN_TOKEN", "admin")
+    yield create_app().test_client()
+
+
+@pytest.fixture()
+def db_client(monkeypatch: pytest.MonkeyPatch) -> FlaskClient:
+    """Своё приложение с SQLite-engine вместо Postgres; /config без токена, admin-токен "admin"."""
+    monkeypatch.delenv("CONFIG_TOKEN", raising=False)
+    monkeypatch.setenv("CONFIG_ADMIN_TOKEN", "admin")
+    app = create_app()
+    engine = create_engine("sqlite://", future=True)
+    app.config["DB_ENGINE"] = LazyEngine(lambda: engine)
+    config_routes.init(app)
+    return app.test_client()
+
+
+def test_config_requires_read_token(token_client: FlaskClient) -> None:
+    assert token_client.get("/config").status_code == 401
+    resp = token_client.get("/config", headers={"X-Config-Token": "read"})
+    assert resp.status_code == 200
+    assert resp.get_json()["source"] == "fallback_no_db"
+
+
+def test_admin_routes_check_token(token_client: FlaskClient) -> None:
+    assert token_client.get("/config/history").status_code == 401
+    assert token_client.get("/config/history", headers={"X-Admin-Token": "nope"}).status_code == 401
+    resp = token_client.get("/config/history", headers={"X-Admin-Token": "admin"})
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "db disabled"}
+
+
+@pytest.mark.parametrize(
+    ("method", "path"),
+    [
+        ("put", "/config"),
+        ("get", "/config/history"),
+        ("post", "/config/rollback"),
+        ("get", "/config/diff?from=1&to=2"),
+        ("get", "/config/rollbacks"),
+    ],
+)
+def test_every_admin_endpoint_requires_token(token_client: FlaskClient, method: str, path: str) -> None:
+    assert getattr(token_client, method)(path, json={}).status_code == 401
+    resp = getattr(token_client, method)(path, json={}, headers={"X-Admin-Token": "admin"})
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "db disabled"}
+
+
+def test_put_config_without_admin_token_configured(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CONFIG_ADMIN_TOKEN", raising=False)
+    resp = create_app().test_client().put("/config", json={})
+    assert resp.status_code == 403
+    assert resp.get_json() == {"error": "admin token not configured"}
+
+
+def test_put_config_token_checks(token_client: FlaskClient) -> None:
+    assert token_client.put("/config", json={}, headers={"X-Admin-Token": "admiN"}).status_code == 401
+    assert token_client.put("/config", json={}, headers={"X-Admin-Token": "админ"}).status_code == 401
+    resp = token_client.put("/config", json={}, headers={"X-Admin-Token": " admin "})
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "db disabled"}
+
+
+def test_static_responses_are_json(token_client: FlaskClient) -> None:
+    resp = token_client.get("/config/diff")
+    assert resp.status_code == 401
+    assert resp.is_json
+    assert resp.get_json() == {"error": "unauthorized"}
+
+    resp = token_client.get("/config", headers={"X-Config-Token": "read"})
+    assert resp.is_json
+    assert resp.get_json()["routing"]["default_dest"] == {"chat_id": None, "thread_id": None}
+
+
+def test_config_etag_roundtrip(db_client: FlaskClient) -> None:
+    client = db_client
+
+    resp = client.get("/config")
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert etag.startswith('"v1-')
+    assert resp.get_json()["version"] == 1
+
+    resp = client.get("/config", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.get_data() == b""
+
+    assert client.get("/config", headers={"If-None-Match": '"v1"'}).status_code == 200
+
+
+def test_config_body_cached_by_revision(db_client: FlaskClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = db_client
+
+    first = client.get("/config")
+
+    def _fail(*_args: object) -> None:
+        raise AssertionError("config must come from the body cache")
+
+    monkeypatch.setattr(config_routes, "read_config", _fail)
+    resp = client.get("/config")
+    assert resp.status_code == 200
+    assert resp.get_data() == first.get_data()
+    assert resp.headers["ETag"] == first.headers["ETag"]
+
+
+def test_config_sees_writes_from_other_workers(db_client: FlaskClient) -> None:
+    client = db_client
+    first = client.get("/config")
+
+    # Запись мимо этого процесса (другой worker) и сброс БД к той же версии 1.
+    engine = client.application.config["DB_ENGINE"].get()
+    with db._session(engine) as s:
+        row = s.get(db.BotConfig, 1)
+        row.config_json = {"routing": {"rules": [1]}}
+        s.commit()
+
+    resp = client.get("/config", headers={"If-None-Match": first.headers["ETag"]})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != first.headers["ETag"]
+    data = resp.get_json()
+    assert data["version"] == 1 and data["routing"] == {"rules": [1]}
+
+
+def test_rollback_rejects_bad_body(db_client: FlaskClient) -> None:
+    client = db_client
+    admin = {"X-Admin-Token": "admin"}
+
+    assert client.post("/config/rollback", data=b"{not json", headers=admin).get_json() == {"error": "invalid payload"}
+    resp = client.put("/config", data=b"[1,", headers=admin)
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "bad_json"
+    resp = client.put("/config", data=b'{"routing": {}}', headers=admin)
+    assert resp.get_json() == {"error": "validation_failed", "detail": "escalation missing"}
+
+
+def test_route_state_is_per_app(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CONFIG_TOKEN", "first")
+    first = create_app().test_client()
+    monkeypatch.setenv("CONFIG_TOKEN", "second")
+    second = create_app().test_client()
+
+    assert first.get("/config", headers={"X-Config-Token": "first"}).status_code == 200
+    assert first.get("/config", headers={"X-Config-Token": "second"}).status_code == 401
+    assert second.get("/config", headers={"X-Config-Token": "second"}).status_code == 200
+
+
+def test_static_bodies_match_jsonify(token_client: FlaskClient) -> None:
+    from flask import jsonify
+
+    resp = token_client.get("/config/history")
+    with token_client.application.app_context():
+        assert resp.get_data() == jsonify({"error": "unauthorized"}).get_data()
+        fallback = token_client.get("/config", headers={"X-Config-Token": "read"})
+        assert fallback.get_data() == jsonify(fallback.get_json()).get_data()
@@ -4,49 +4,70 @@ Unit-тесты валидации конфигурации web.
 
 from __future__ import annotations
 
+from typing import Any, Optional
+
 import pytest
 
 from web.config_validation import ConfigValidationError, validate_config
 
-
-def test_validate_config_ok() -> None:
-    cfg = {
-        "routing": {
-            "rules": [
-                {"dest": {"chat_id": 1, "thread_id": None}, "enabled": True},
-            ],
-            "default_dest": {"chat_id": 2, "thread_id": None},
-        },
-        "escalation": {"enabled": False},
-    }
-    validate_config(cfg)
-
-
-def test_validate_config_missing_fields() -> None:
-    with pytest.raises(ConfigValidationError):
-        validate_config({})
+_OK_ROUTING = {"rules": [], "default_dest": {"chat_id": 2, "thread_id": None}}
 
 
-def test_validate_config_invalid_dest() -> None:
-    cfg = {
-        "routing": {"rules": [{"dest": {"chat_id": "x"}}], "default_dest": {}},
-        "escalation": {"enabled": False},
-    }
-    with pytest.raises(ConfigValidationError):
+@pytest.mark.parametrize(
+    ("cfg", "error"),
+    [
+        pytest.param(
+            {
+                "routing": {
+                    "rules": [
+                        {"dest": {"chat_id": 1, "thread_id": None}, "enabled": True},
+                    ],
+                    "default_dest": {"chat_id": 2, "thread_id": None},
+                },
+                "escalation": {"enabled": False},
+            },
+            None,
+            id="ok",
+        ),
+        pytest.param({}, "routing missing", id="missing_fields"),
+        pytest.param(
+            {
+                "routing": {"rules": [{"dest": {"chat_id": "x"}}], "default_dest": {}},
+                "escalation": {"enabled": False},
+            },
+            "routing.rules[0].dest.chat_id must be int|null",
+            id="invalid_dest",
+        ),
+        pytest.param(
+            {
+                "routing": _OK_ROUTING,
+                "escalation": {
+                    "enabled": True,
+                    "after_s": 300,
+                    "mention": "@duty",
+                    "rules": [
+                        {"dest": {"chat_id": 10, "thread_id": None}, "after_s": 120, "keywords": ["vip"]},
+                        {"dest": {"chat_id": 11, "thread_id": 1}, "service_ids": [101]},
+                    ],
+                },
+            },
+            None,
+            id="escalation_rules",
+        ),
+        pytest.param(
+            {
+                "routing": _OK_ROUTING,
+                "escalation": {"enabled": True, "after_s": 300, "rules": [{"dest": {"thread_id": "1"}}]},
+            },
+            "escalation.rules[0].dest.thread_id must be int|null",
+            id="escalation_rule_dest",
+        ),
+    ],
+)
+def test_validate_config(cfg: dict[str, Any], error: Optional[str]) -> None:
+    if error is None:
         validate_config(cfg)
-
-
-def test_validate_config_escalation_rules() -> None:
-    cfg = {
-        "routing": {"rules": [], "default_dest": {"chat_id": 2, "thread_id": None}},
-        "escalation": {
-            "enabled": True,
-            "after_s": 300,
-            "mention": "@duty",
-            "rules": [
-                {"dest": {"chat_id": 10, "thread_id": None}, "after_s": 120, "keywords": ["vip"]},
-                {"dest": {"chat_id": 11, "thread_id": 1}, "service_ids": [101]},
-            ],
-        },
-    }
-    validate_config(cfg)
+        return
+    with pytest.raises(ConfigValidationError) as exc:
+        validate_config(cfg)
+    assert str(exc.value) == error
@@ -0,0 +1,200 @@
+"""
+Unit-тесты конфига в БД (SQLite in-memory вместо Postgres).
+
+Запись здесь идёт ORM-веткой write_config / rollback_to_version; Postgres-SQL (CTE,
+JSONB, миграции, окно rollback) проверяет test_db_postgres.py на настоящем Postgres.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateTable
+
+from web import db
+
+
+@pytest.fixture()
+def engine() -> Engine:
+    engine = create_engine("sqlite://", future=True)
+    db.init_db(engine)
+    return engine
+
+
+def test_init_db_is_idempotent(engine: Engine) -> None:
+    db.init_db(engine)
+    data, err = db.read_config(engine)
+    assert err is None
+    assert data is not None
+    assert data["version"] == 1
+    assert data["escalation"] == {"enabled": False}
+
+
+def test_count_rollbacks_since(engine: Engine) -> None:
+    now = datetime.utcnow()
+    with db._session(engine) as s:
+        s.add_all(
+            [
+                db.BotConfigHistory(version=2, config_json={}, created_at=now, comment="c2"),
+                db.BotConfigHistory(
+                    version=3, config_json={}, created_at=now - timedelta(seconds=30), comment="rollback", is_rollback=True
+                ),
+                db.BotConfigHistory(
+                    version=4, config_json={}, created_at=now - timedelta(hours=2), comment="rollback", is_rollback=True
+                ),
+            ]
+        )
+        s.commit()
+
+    count, last_at = db.count_rollbacks_since(engine, 600)
+    assert count == 1
+    assert last_at == now - timedelta(seconds=30)
+
+
+def test_database_url_read_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_URL", " sqlite:// ")
+    db._reload_env()
+    assert db.db_enabled() is True
+    assert db._database_url() == "sqlite://"
+
+    monkeypatch.delenv("DATABASE_URL")
+    assert db.db_enabled() is True
+
+    db._reload_env()
+    assert db.db_enabled() is False
+
+    monkeypatch.undo()
+    db._reload_env()
+
+
+def test_read_config_revision(engine: Engine) -> None:
+    revision, err = db.read_config_revision(engine)
+    assert err is None and revision is not None
+    assert revision[0] == 1 and isinstance(revision[1], datetime)
+
+
+def test_read_versions_current_and_history(engine: Engine) -> None:
+    with db._session(engine) as s:
+        s.add(db.BotConfigHistory(version=1, config_json={"old": True}))
+        current = s.get(db.BotConfig, 1)
+        current.version = 2
+        s.add(db.BotConfigHistory(version=2, config_json={"stale": True}))
+        s.commit()
+
+    cfgs = db.read_versions(engine, 1, 2, 7)
+    assert cfgs[1] == {"old": True, "version": 1}
+    assert cfgs[2]["version"] == 2 and "stale" not in cfgs[2]
+    assert 7 not in cfgs
+
+    assert db.get_config_by_version(engine, 7) == (None, "version 7 not found")
+
+
+def test_config_json_is_jsonb_on_postgres() -> None:
+    ddl = str(CreateTable(db.BotConfigHistory.__table__).compile(dialect=postgresql.dialect()))
+    assert "config_json JSONB NOT NULL" in ddl
+
+
+def test_config_revision_changes_on_every_write(engine: Engine) -> None:
+    first, _ = db.read_config_revision(engine)
+    db.write_config(engine, {"routing": {"rules": [1]}})
+    second, _ = db.read_config_revision(engine)
+    assert first is not None and second is not None
+    assert second[0] == 2 and second[1] > first[1]
+
+    # Сброс БД возвращает номер версии к 2, но ревизия уже другая.
+    with db._session(engine) as s:
+        s.execute(db.BotConfig.__table__.delete())
+        s.commit()
+    db.init_db(engine)
+    db.write_config(engine, {"routing": {"rules": [1]}})
+    third, _ = db.read_config_revision(engine)
+    assert third is not None and third[0] == 2 and third != second
+
+
+def test_list_history_newest_first(engine: Engine) -> None:
+    with db._session(engine) as s:
+        s.add(db.BotConfigHistory(version=1, config_json={}, comment="first"))
+        s.add(db.BotConfigHistory(version=2, config_json={}))
+        s.commit()
+
+    history = db.list_history(engine, limit=5)
+    assert [(h["version"], h["comment"]) for h in history] == [(2, None), (1, "first")]
+    assert set(history[0]) == {"version", "created_at", "comment"}
+
+
+def test_rollback_flag_defaults_false(engine: Engine) -> None:
+    with db._session(engine) as s:
+        s.add(db.BotConfigHistory(version=1, config_json={}))
+        s.commit()
+        assert s.execute(select(db.BotConfigHistory.is_rollback)).scalar_one() is False
+
+
+def test_lazy_engine_initializes_once() -> None:
+    calls: list[int] = []
+
+    def factory() -> Engine:
+        calls.append(1)
+        return create_engine("sqlite://", future=True)
+
+    lazy = db.LazyEngine(factory)
+    assert calls == []
+    engine = lazy.get()
+    assert engine is not None and lazy.get() is engine
+    assert calls == [1]
+    assert db.read_config(engine)[0]["version"] == 1
+
+
+def test_lazy_engine_failure_disables_db() -> None:
+    def factory() -> Engine:
+        raise RuntimeError("no db")
+
+    lazy = db.LazyEngine(factory)
+    assert lazy.get() is None
+    assert lazy.get() is None
+
+
+def test_write_and_rollback(engine: Engine) -> None:
+    assert db.write_config(engine, {"routing": {"rules": [1]}}, comment="c1") == 2
+    data, _ = db.read_config(engine)
+    assert data == {"routing": {"rules": [1]}, "version": 2}
+
+    assert db.rollback_to_version(engine, 1) == 3
+    data, _ = db.read_config(engine)
+    assert data is not None and data["version"] == 3 and data["escalation"] == {"enabled": False}
+
+    history = db.list_history(engine)
+    assert [(h["version"], h["comment"]) for h in history] == [(2, "rollback from v2 to v1"), (1, "c1")]
+    with db._session(engine) as s:
+        flags = s.execute(select(db.BotConfigHistory.version, db.BotConfigHistory.is_rollback)).all()
+    assert sorted(flags) == [(1, False), (2, True)]
+
+    with pytest.raises(RuntimeError, match="history version 9 not found"):
+        db.rollback_to_version(engine, 9)
+
+
+def test_failed_schema_upgrade_disables_db(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    def _boom(_engine: Engine) -> None:
+        raise RuntimeError("migration boom")
+
+    monkeypatch.setattr(db, "_migrate_config_json_to_jsonb", _boom)
+    lazy = db.LazyEngine(lambda: create_engine("sqlite://", future=True))
+    with caplog.at_level("ERROR", logger="web.db"):
+        assert lazy.get() is None
+    assert "db init failed: migration boom" in caplog.text
+
+
+def test_failed_index_creation_keeps_db_usable(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    def _boom(_engine: Engine) -> None:
+        raise RuntimeError("index boom")
+
+    monkeypatch.setattr(db, "_create_indexes", _boom)
+    lazy = db.LazyEngine(lambda: create_engine("sqlite://", future=True))
+    with caplog.at_level("ERROR", logger="web.db"):
+        engine = lazy.get()
+    assert engine is not None
+    assert db.read_config(engine)[0]["version"] == 1
+    assert "db index creation failed: index boom" in caplog.text
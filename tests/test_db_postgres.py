@@ -0,0 +1,157 @@
+"""
+Интеграционные тесты web/db.py на настоящем Postgres: CTE записи/rollback, ревизия конфига, JSONB,
+миграции старых таблиц и окно count_rollbacks_since.
+
+Нужен TEST_DATABASE_URL (в CI — сервис postgres); без него тесты пропускаются.
+База очищается: таблицы bot_config* пересоздаются в каждом тесте.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from web import db
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "").strip()
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+def _drop_tables(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS bot_config, bot_config_history CASCADE"))
+
+
+@pytest.fixture()
+def pg_engine() -> Iterator[Engine]:
+    engine = db.create_db_engine(TEST_DATABASE_URL)
+    _drop_tables(engine)
+    yield engine
+    _drop_tables(engine)
+    engine.dispose()
+
+
+def test_write_and_rollback_cte(pg_engine: Engine) -> None:
+    db.init_db(pg_engine)
+    assert db.write_config(pg_engine, {"routing": {"rules": [1]}, "escalation": {}}, comment="c1") == 2
+    data, err = db.read_config(pg_engine)
+    assert err is None
+    assert data == {"routing": {"rules": [1]}, "escalation": {}, "version": 2}
+
+    assert db.rollback_to_version(pg_engine, 1) == 3
+    data, _ = db.read_config(pg_engine)
+    assert data is not None and data["version"] == 3 and data["escalation"] == {"enabled": False}
+
+    history = db.list_history(pg_engine)
+    assert [(h["version"], h["comment"]) for h in history] == [(2, "rollback from v2 to v1"), (1, "c1")]
+    with pg_engine.connect() as conn:
+        flags = conn.execute(text("SELECT version, is_rollback FROM bot_config_history ORDER BY version")).all()
+    assert [tuple(r) for r in flags] == [(1, False), (2, True)]
+
+    with pytest.raises(RuntimeError, match="history version 9 not found"):
+        db.rollback_to_version(pg_engine, 9)
+
+
+def test_cte_writes_bump_revision(pg_engine: Engine) -> None:
+    db.init_db(pg_engine)
+    revisions = [db.read_config_revision(pg_engine)[0]]
+    db.write_config(pg_engine, {"routing": {"rules": [1]}})
+    revisions.append(db.read_config_revision(pg_engine)[0])
+    db.rollback_to_version(pg_engine, 1)
+    revisions.append(db.read_config_revision(pg_engine)[0])
+
+    assert all(r is not None for r in revisions)
+    assert [r[0] for r in revisions] == [1, 2, 3]
+    assert revisions[0][1] < revisions[1][1] < revisions[2][1]
+
+
+def test_config_json_column_is_jsonb(pg_engine: Engine) -> None:
+    db.init_db(pg_engine)
+    with pg_engine.connect() as conn:
+        for table in ("bot_config", "bot_config_history"):
+            params = {"table": table, "column": "config_json"}
+            assert conn.execute(db._COLUMN_TYPE_SQL, params).scalar_one() == "jsonb"
+
+
+def test_text_config_json_migrated_to_jsonb(pg_engine: Engine) -> None:
+    with pg_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE bot_config (id INTEGER PRIMARY KEY, version INTEGER NOT NULL, config_json TEXT NOT NULL)"))
+        conn.execute(text("""INSERT INTO bot_config VALUES (1, 4, '{"routing": {"rules": []}}')"""))
+
+    db.init_db(pg_engine)
+    data, err = db.read_config(pg_engine)
+    assert err is None
+    assert data == {"routing": {"rules": []}, "version": 4}
+    with pg_engine.connect() as conn:
+        assert conn.execute(db._COLUMN_TYPE_SQL, {"table": "bot_config", "column": "config_json"}).scalar_one() == "jsonb"
+    revision, err = db.read_config_revision(pg_engine)
+    assert err is None and revision is not None and revision[0] == 4
+
+
+def test_column_lookup_ignores_other_schemas(pg_engine: Engine) -> None:
+    with pg_engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS testci_other CASCADE"))
+        conn.execute(text("CREATE SCHEMA testci_other"))
+        conn.execute(text("CREATE TABLE testci_other.bot_config (id INTEGER PRIMARY KEY, config_json TEXT)"))
+        conn.execute(text("CREATE TABLE testci_other.bot_config_history (id INTEGER PRIMARY KEY, comment TEXT)"))
+    try:
+        db.init_db(pg_engine)
+        with pg_engine.connect() as conn:
+            params = {"table": "bot_config", "column": "config_json"}
+            assert conn.execute(db._COLUMN_TYPE_SQL, params).scalar_one() == "jsonb"
+            params = {"table": "bot_config_history", "column": "is_rollback"}
+            assert conn.execute(db._COLUMN_TYPE_SQL, params).scalar_one() == "boolean"
+    finally:
+        with pg_engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA testci_other CASCADE"))
+
+
+def test_history_is_rollback_backfilled(pg_engine: Engine) -> None:
+    with pg_engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE bot_config_history (id SERIAL PRIMARY KEY, version INTEGER NOT NULL,"
+                " config_json JSONB NOT NULL, created_at TIMESTAMP NOT NULL, comment TEXT)"
+            )
+        )
+        conn.execute(text("CREATE INDEX ix_history_rollback_time ON bot_config_history (created_at)"))
+        conn.execute(
+            text(
+                "INSERT INTO bot_config_history (version, config_json, created_at, comment) VALUES"
+                " (1, '{}', now() AT TIME ZONE 'utc', 'c1'),"
+                " (2, '{}', now() AT TIME ZONE 'utc', 'rollback from v2 to v1'),"
+                " (3, '{}', now() AT TIME ZONE 'utc', NULL)"
+            )
+        )
+
+    db.init_db(pg_engine)
+    with pg_engine.connect() as conn:
+        flags = conn.execute(text("SELECT version, is_rollback FROM bot_config_history ORDER BY version")).all()
+        indexes = set(conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = 'bot_config_history'")).scalars())
+    assert [tuple(r) for r in flags] == [(1, False), (2, True), (3, False)]
+    assert "ix_history_rollback_time" not in indexes
+    assert "ix_history_rollback_at" in indexes
+    assert db.count_rollbacks_since(pg_engine, 600)[0] == 1
+
+
+def test_count_rollbacks_since_uses_db_clock(pg_engine: Engine) -> None:
+    db.init_db(pg_engine)
+    with pg_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO bot_config_history (version, config_json, created_at, comment, is_rollback) VALUES"
+                " (2, '{}', timezone('utc', now()) - interval '30 seconds', 'rollback from v2 to v1', TRUE),"
+                " (3, '{}', timezone('utc', now()) - interval '2 hours', 'rollback from v3 to v1', TRUE),"
+                " (4, '{}', timezone('utc', now()), 'c4', FALSE)"
+            )
+        )
+
+    count, last_at = db.count_rollbacks_since(pg_engine, 600)
+    assert count == 1
+    assert last_at is not None
+    assert db.count_rollbacks_since(pg_engine, 86400)[0] == 2
@@ -11,6 +11,8 @@ from bot.utils.escalation import (
     match_escalation_filter,
 )
 from bot.utils.notify_router import Destination
+from bot.utils.runtime_config import _parse_escalation_filter
+from bot.utils.state_store import MemoryStateStore
 
 
 def test_match_escalation_filter_creator_fields() -> None:
@@ -40,3 +42,59 @@ def test_escalation_manager_rules_match() -> None:
     items = [{"Id": 123, "Name": "ticket", "ServiceId": 101}]
     out = manager.process(items)
     assert len(out) == 1
+
+
+def test_parse_escalation_filter_ids_and_keywords() -> None:
+    flt = _parse_escalation_filter(
+        {"keywords": [" VIP ", "  ", 5], "service_ids": [101, "102", True, -1, "x", 1.5]}
+    )
+    assert flt.keywords == ("vip",)
+    assert flt.service_ids == (101, 102)
+
+
+def test_escalation_manager_skips_save_when_state_unchanged() -> None:
+    store = MemoryStateStore()
+    writes: list[str] = []
+    orig_set_json = store.set_json
+
+    def _set_json(name, value, ttl_s=None):
+        writes.append(name)
+        orig_set_json(name, value, ttl_s=ttl_s)
+
+    store.set_json = _set_json  # type: ignore[method-assign]
+    manager = EscalationManager(
+        store=store,
+        store_key="esc",
+        service_id_field="ServiceId",
+        customer_id_field="CustomerId",
+        creator_id_field="CreatorId",
+        creator_company_id_field="CreatorCompanyId",
+        rules=[EscalationRule(dest=Destination(chat_id=10), after_s=3600)],
+    )
+    items = [{"Id": 1, "Name": "ticket"}]
+    manager.process(items)
+    manager.process(items)
+    assert writes == ["esc"]
+
+
+def test_escalation_manager_prefilter_keeps_rule_semantics() -> None:
+    rules = [
+        EscalationRule(dest=Destination(chat_id=10), after_s=0, flt=EscalationFilter(keywords=("vip",))),
+        EscalationRule(dest=Destination(chat_id=11), after_s=0, flt=EscalationFilter(customer_ids=(5,))),
+    ]
+    manager = EscalationManager(
+        store=None,
+        store_key="test",
+        service_id_field="ServiceId",
+        customer_id_field="CustomerId",
+        creator_id_field="CreatorId",
+        creator_company_id_field="CreatorCompanyId",
+        rules=rules,
+    )
+    items = [
+        {"Id": 1, "Name": "VIP ticket"},
+        {"Id": 2, "Name": "other", "CustomerId": "5"},
+        {"Id": 3, "Name": "other", "CustomerId": 6},
+    ]
+    out = manager.process(items)
+    assert sorted((m.rule.dest.chat_id, m.item["Id"]) for m in out) == [(10, 1), (11, 2)]
@@ -7,22 +7,44 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 import time
 import urllib.request
 
 import pytest
 
-from app import app
 
+def _wait_for_url(url: str, deadline_s: float = 10.0) -> str:
+    """
+    Ждёт 200 от url и возвращает тело.
+
+    Экспоненциальный backoff (0.05 → 0.5 с) вместо фиксированного sleep(1):
+    поднявшийся сервер замечаем сразу, а не через секунду.
+    """
+    end = time.monotonic() + deadline_s
+    delay = 0.05
+    last_err: Exception | None = None
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as resp:
+                if resp.status == 200:
+                    return resp.read().decode("utf-8")
+                last_err = AssertionError(f"status={resp.status}")
+        except Exception as e:
+            last_err = e
+        if time.monotonic() + delay > end:
+            raise AssertionError(f"{url} is not ready: {last_err}")
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
 
-def test_health_unit_ok() -> None:
+
+def test_health_unit_ok(client) -> None:
     """
     Unit-тест: проверяем /health через Flask test client.
 
     Это должно стабильно работать в CI, потому что не нужен поднятый сервер.
     """
-    client = app.test_client()
     resp = client.get("/health")
     assert resp.status_code == 200
 
@@ -41,18 +63,49 @@ def test_health_integration_ok() -> None:
       WEB_TEST_URL=http://localhost:8000/health pytest -q
     """
     url = os.getenv("WEB_TEST_URL", "").strip()
+    data = json.loads(_wait_for_url(url))
+    assert data.get("status") == "ok"
 
-    last_err = None
-    for _ in range(10):
-        try:
-            with urllib.request.urlopen(url, timeout=2) as resp:
-                assert resp.status == 200
-                body = resp.read().decode("utf-8")
-                data = json.loads(body)
-                assert data.get("status") == "ok"
-                return
-        except Exception as e:
-            last_err = e
-            time.sleep(1)
 
-    raise AssertionError(f"/health is not ready: {last_err}")
+def test_access_log_skips_probes() -> None:
+    from dataclasses import replace
+
+    import web.routes.health as health_routes
+    from web.app import create_app
+
+    lines: list[tuple] = []
+
+    class _Logger:
+        level = logging.INFO
+
+        def isEnabledFor(self, level: int) -> bool:
+            return level >= self.level
+
+        def info(self, msg: str, *args: object) -> None:
+            lines.append(args)
+
+    logger = _Logger()
+    app = create_app()
+    state = app.extensions[health_routes._EXT_KEY]
+    app.extensions[health_routes._EXT_KEY] = replace(state, logger=logger)
+    client = app.test_client()
+
+    assert client.get("/health").headers["X-Request-ID"]
+    assert client.get("/ready", headers={"X-Request-ID": "rid-1"}).headers["X-Request-ID"] == "rid-1"
+    assert lines == []
+
+    client.get("/status")
+    assert [args[1] for args in lines] == ["/status"]
+
+    logger.level = logging.WARNING
+    client.get("/status")
+    assert len(lines) == 1
+
+
+def test_generated_request_ids_are_unique(client) -> None:
+    import web.routes.health as health_routes
+
+    rids = {client.get("/health").headers["X-Request-ID"] for _ in range(3)}
+    assert len(rids) == 3
+    assert all(rid.startswith(health_routes._RID_PREFIX) for rid in rids)
+    assert client.get("/health", headers={"X-Request-ID": " given "}).headers["X-Request-ID"] == "given"
@@ -0,0 +1,33 @@
+"""
+Тесты настройки логирования web.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+from logging.handlers import QueueHandler
+
+import web.logging_setup as logging_setup
+
+
+def test_web_logger_writes_through_queue_listener() -> None:
+    adapter = logging_setup.setup_logging(environment="test", git_sha="abc")
+    logger = logging.getLogger("testci.web")
+    assert [type(h) for h in logger.handlers] == [QueueHandler]
+
+    listener = logging_setup._LISTENER
+    assert listener is not None
+    handler = listener.handlers[0]
+    stream = io.StringIO()
+    old_stream = handler.setStream(stream)
+    try:
+        adapter.info("hello %s", "world")
+        listener.stop()
+        listener.start()
+    finally:
+        handler.setStream(old_stream)
+
+    line = stream.getvalue()
+    assert "level=INFO service=web" in line
+    assert "msg=hello world" in line
@@ -32,6 +32,16 @@ def test_parse_rules_skips_invalid_and_empty_rules() -> None:
     assert rules[0].dest == Destination(chat_id=2, thread_id=None)
 
 
+def test_parse_rules_normalizes_keywords_and_ids() -> None:
+    rules = parse_rules(
+        [{"dest": {"chat_id": 1}, "keywords": [" VIP ", "", "  ", 5], "service_ids": ["10", "x", None, 11], "customer_ids": None}]
+    )
+    assert len(rules) == 1
+    assert rules[0].keywords == ("vip",)
+    assert rules[0].service_ids == (10, 11)
+    assert rules[0].customer_ids == ()
+
+
 def test_match_destinations_keywords_and_ids() -> None:
     rules = parse_rules(
         [
@@ -4,11 +4,8 @@
 
 from __future__ import annotations
 
-from app import app
 
-
-def test_ready_endpoint_has_checks() -> None:
-    client = app.test_client()
+def test_ready_endpoint_has_checks(client) -> None:
     resp = client.get("/ready")
     assert resp.status_code in (200, 503)
 
@@ -21,3 +18,25 @@ def test_ready_endpoint_has_checks() -> None:
     names = {c.get("name") for c in data["checks"] if isinstance(c, dict)}
     assert "env.environment" in names
     assert "config.required_env" in names
+
+
+def test_ready_response_built_once_in_init(monkeypatch) -> None:
+    from web import settings
+    from web.app import create_app
+
+    monkeypatch.setenv("STRICT_READINESS", "1")
+    settings.reset_env_cache()
+    try:
+        app = create_app()
+    finally:
+        monkeypatch.undo()
+        settings.reset_env_cache()
+
+    # Env уже сброшен: ответ собран при create_app и от текущего env не зависит.
+    client = app.test_client()
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    data = resp.get_json()
+    assert data["strict"] is True
+    assert data["ready"] is False
+    assert client.get("/ready").get_data() == resp.get_data()
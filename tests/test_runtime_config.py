@@ -0,0 +1,188 @@
+"""
+Unit-тесты runtime-конфига бота (env fallback + применение web /config).
+"""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from bot.utils.runtime_config import RuntimeConfig
+from bot.utils.state_store import MemoryStateStore
+
+_LOG = logging.getLogger("test.runtime_config")
+
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("ROUTES_RULES", "ROUTES_DEFAULT_CHAT_ID", "ALERT_CHAT_ID", "ESCALATION_ENABLED", "ESCALATION_SERVICE_ID_FIELD"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_env_config_reused_when_env_unchanged(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ROUTES_DEFAULT_CHAT_ID", "100")
+    a = RuntimeConfig(logger=_LOG, store=None)
+    b = RuntimeConfig(logger=_LOG, store=None)
+    assert a.routing is b.routing
+    assert a.routing.default_dest is not None
+    assert a.routing.default_dest.chat_id == 100
+
+    monkeypatch.setenv("ROUTES_DEFAULT_CHAT_ID", "200")
+    c = RuntimeConfig(logger=_LOG, store=None)
+    assert c.routing is not a.routing
+    assert c.routing.default_dest is not None
+    assert c.routing.default_dest.chat_id == 200
+
+
+def test_apply_from_web_config_skips_same_payload_object() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    data = {"version": 3, "routing": {"default_dest": {"chat_id": 1}}, "escalation": {}}
+    assert rc.apply_from_web_config(data) is True
+    assert rc.apply_from_web_config(data) is False
+    assert rc.apply_from_web_config({**data, "version": 4}) is True
+    assert rc.version == 4
+
+
+def test_applied_config_restored_from_store() -> None:
+    store = MemoryStateStore()
+    rc = RuntimeConfig(logger=_LOG, store=store)
+    assert rc.apply_from_web_config({"version": 5, "routing": {"default_dest": {"chat_id": 7}}})
+
+    restored = RuntimeConfig(logger=_LOG, store=store)
+    assert restored.try_load_from_store() is True
+    assert restored.version == 5
+    assert restored.routing.default_dest is not None
+    assert restored.routing.default_dest.chat_id == 7
+
+
+def test_apply_from_web_config_parses_all_blocks() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    data = {
+        "version": 1,
+        "routing": {"rules": [], "default_dest": {"chat_id": 1}, "service_id_field": " SvcId "},
+        "escalation": {
+            "enabled": True,
+            "after_s": 120,
+            "dest": {"chat_id": 2},
+            "rules": [{"service_ids": [101]}, {"dest": {"chat_id": 3}, "after_s": 60, "keywords": ["VIP"]}],
+        },
+        "eventlog": {"default_dest": {"chat_id": 4}},
+    }
+    assert rc.apply_from_web_config(data) is True
+    assert rc.routing.service_id_field == "SvcId"
+    assert rc.escalation.service_id_field == "SvcId"
+    assert rc.escalation.mention == "@duty_engineer"
+    assert [(r.dest.chat_id, r.after_s) for r in rc.escalation.rules] == [(2, 120), (3, 60)]
+    assert rc.eventlog.default_dest is not None
+    assert rc.eventlog.default_dest.chat_id == 4
+    assert rc.eventlog.creator_id_field == "CreatorId"
+
+
+def test_apply_from_web_config_rejects_broken_block() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    assert rc.apply_from_web_config({"version": 1, "escalation": {"after_s": "soon"}}) is False
+    assert rc.version == 0
+
+
+def test_escalation_manager_kept_when_escalation_unchanged() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    esc = {"enabled": True, "dest": {"chat_id": 2}}
+    assert rc.apply_from_web_config({"version": 1, "escalation": esc})
+    manager = rc._get_escalation_manager()
+    assert manager is not None
+
+    assert rc.apply_from_web_config({"version": 2, "routing": {"default_dest": {"chat_id": 9}}, "escalation": esc})
+    assert rc._get_escalation_manager() is manager
+
+    assert rc.apply_from_web_config({"version": 3, "escalation": {**esc, "after_s": 60}})
+    assert rc._get_escalation_manager() is not manager
+
+
+def test_escalation_manager_built_lazily() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    assert rc.apply_from_web_config({"version": 1, "escalation": {"enabled": True, "dest": {"chat_id": 2}}})
+    assert rc._esc_manager is None
+    assert rc.get_escalations([]) == []
+    assert rc._esc_manager is not None
+
+
+def test_disabled_escalation_skips_rules() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    data = {"version": 1, "escalation": {"enabled": False, "after_s": 90, "rules": [{"dest": {"chat_id": 1}}]}}
+    assert rc.apply_from_web_config(data) is True
+    assert rc.escalation.enabled is False
+    assert rc.escalation.rules == []
+    assert rc.escalation.after_s == 90
+    assert rc.get_escalations([{"Id": 1}]) == []
+
+
+def test_disabled_escalation_keeps_id_field_overrides(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ROUTES_CREATOR_ID_FIELD", "RoutesCreator")
+    monkeypatch.setenv("ESCALATION_SERVICE_ID_FIELD", "EscService")
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    assert rc.escalation.enabled is False
+    assert rc.escalation.service_id_field == "EscService"
+    # Как у включённой эскалации из env: creator_id_field не наследуется от routing.
+    assert rc.escalation.creator_id_field == "CreatorId"
+
+    data = {"version": 1, "routing": {"creator_id_field": "Author"}, "escalation": {"customer_id_field": "Client"}}
+    assert rc.apply_from_web_config(data) is True
+    assert rc.escalation.enabled is False
+    assert rc.escalation.customer_id_field == "Client"
+    assert rc.escalation.creator_id_field == "Author"
+
+
+def test_identical_escalation_rules_are_interned() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    esc = {"enabled": True, "rules": [{"dest": {"chat_id": 2}, "keywords": ["vip"]}]}
+    assert rc.apply_from_web_config({"version": 1, "escalation": esc})
+    rule = rc.escalation.rules[0]
+
+    assert rc.apply_from_web_config({"version": 2, "escalation": {**esc, "after_s": 60}})
+    assert rc.escalation.rules[0] is not rule
+
+    assert rc.apply_from_web_config({"version": 3, "escalation": esc})
+    assert rc.escalation.rules[0] is rule
+
+
+def test_non_string_field_names_fall_back_to_default() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    data = {"version": 1, "routing": {"service_id_field": 5, "customer_id_field": "  "}, "escalation": {"mention": None}}
+    assert rc.apply_from_web_config(data) is True
+    assert rc.routing.service_id_field == "ServiceId"
+    assert rc.routing.customer_id_field == "CustomerId"
+    assert rc.escalation.mention == "@duty_engineer"
+
+
+def test_version_bump_with_same_blocks_skips_parsing(monkeypatch: pytest.MonkeyPatch) -> None:
+    import bot.utils.runtime_config as rc_mod
+
+    store = MemoryStateStore()
+    rc = RuntimeConfig(logger=_LOG, store=store)
+    blocks = {"routing": {"default_dest": {"chat_id": 1}}, "escalation": {}}
+    assert rc.apply_from_web_config({"version": 1, **blocks}) is True
+    routing = rc.routing
+
+    def _fail(*_args: object) -> None:
+        raise AssertionError("blocks must not be re-parsed")
+
+    monkeypatch.setattr(rc_mod, "_parse_web_config", _fail)
+    # Блоки те же, но версия новая: применение засчитывается (True) и сохраняется.
+    assert rc.apply_from_web_config({"version": 2, **blocks}) is True
+    assert rc.version == 2
+    assert rc.routing is routing
+    persisted = store.get_json("bot:config")
+    assert persisted is not None and persisted["version"] == 2
+
+    # Повтор той же версии — уже без изменений.
+    assert rc.apply_from_web_config({"version": 2, **blocks}) is False
+
+
+def test_apply_from_web_config_version_field() -> None:
+    rc = RuntimeConfig(logger=_LOG, store=None)
+    assert rc.apply_from_web_config({"version": "x"}) is False
+    assert rc.apply_from_web_config({"version": [1]}) is False
+    assert rc.apply_from_web_config({"version": "2"}) is True
+    assert rc.version == 2
+    assert rc.apply_from_web_config({"version": None}) is False
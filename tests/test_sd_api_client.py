@@ -0,0 +1,82 @@
+"""
+Unit-тесты клиента ServiceDesk API (без сети: сессия подменяется фейком).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any
+
+from bot.utils.sd_api_client import SdApiClient, SdApiConfig, _generate_secure_password, _user_row
+
+
+class _FakeResponse:
+    def __init__(self, data: Any, status_code: int = 200) -> None:
+        self._data = data
+        self.status_code = status_code
+        self.text = str(data)
+        self.content = json.dumps(data).encode()
+
+
+class _FakeSession:
+    def __init__(self, page_count: int) -> None:
+        self.page_count = page_count
+        self.pages: list[int] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, *, headers: dict, params: dict, timeout: float) -> _FakeResponse:
+        page = int(params["page"])
+        with self._lock:
+            self.pages.append(page)
+        return _FakeResponse(
+            {"Tasks": [{"Id": page * 10}, {"Id": page * 10 + 1}], "Paginator": {"PageCount": self.page_count}}
+        )
+
+    def close(self) -> None:
+        pass
+
+
+def _client(session: _FakeSession) -> SdApiClient:
+    client = SdApiClient(SdApiConfig(base_url="https://sd.example/", login="u", password="p"))
+    client._session = session  # type: ignore[assignment]
+    return client
+
+
+def test_list_tasks_changed_since_keeps_page_order() -> None:
+    session = _FakeSession(page_count=5)
+    tasks = _client(session).list_tasks_changed_since("2024-01-01")
+    assert [t["Id"] for t in tasks] == [10, 11, 20, 21, 30, 31, 40, 41, 50, 51]
+    assert sorted(session.pages) == [1, 2, 3, 4, 5]
+
+
+def test_list_tasks_changed_since_single_page() -> None:
+    session = _FakeSession(page_count=1)
+    assert len(_client(session).list_tasks_changed_since("2024-01-01")) == 2
+    assert session.pages == [1]
+
+
+def test_generate_secure_password() -> None:
+    pw = _generate_secure_password(16)
+    assert len(pw) == 16
+    assert pw != _generate_secure_password(16)
+
+
+def test_user_row_stringifies_and_tolerates_missing_fields() -> None:
+    assert _user_row({"Id": 1, "Name": "Ann", "Login": "ann", "Phone": "1"}) == {"Id": "1", "Name": "Ann", "Login": "ann"}
+    assert _user_row({"Id": 2}) == {"Id": "2", "Name": "None", "Login": "None"}
+
+
+def test_list_tasks_changed_since_respects_max_pages() -> None:
+    session = _FakeSession(page_count=50)
+    tasks = _client(session).list_tasks_changed_since("2024-01-01", max_pages=3)
+    assert sorted(session.pages) == [1, 2, 3]
+    assert len(tasks) == 6
+
+
+def test_session_retries_only_get_on_gateway_errors() -> None:
+    client = SdApiClient(SdApiConfig(base_url="https://sd.example", login="", password=""))
+    retry = client._session.get_adapter("https://sd.example").max_retries
+    assert retry.is_retry("GET", 504)
+    assert not retry.is_retry("PUT", 504)
+    assert not retry._is_method_retryable("PUT")
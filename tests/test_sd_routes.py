@@ -0,0 +1,107 @@
+"""
+Тесты /sd/open: пагинация и обогащение заявок данными услуг (IntraService замокан).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import pytest
+
+import web.routes.sd as sd_routes
+from web.intraservice import IntraServiceConfig
+
+
+def _page(page: int, page_count: int, tasks: list[dict[str, Any]], services: list[dict[str, Any]]) -> dict[str, Any]:
+    return {"Tasks": tasks, "Services": services, "Paginator": {"Page": page, "PageCount": page_count}}
+
+
+def test_sd_open_enriches_tasks_with_services(client, monkeypatch: pytest.MonkeyPatch) -> None:
+    pages = {
+        1: _page(1, 2, [{"Id": 3, "ServiceId": 10}, {"Id": 2, "ServiceId": None}], [{"Id": 10, "Code": "C10", "Name": "Mail"}]),
+        2: _page(2, 2, [{"Id": 1, "ServiceId": 10}], []),
+    }
+    seen: list[int] = []
+
+    def fake_list(*, page: int, **_kw: Any) -> dict[str, Any]:
+        seen.append(page)
+        return pages[page]
+
+    monkeypatch.setattr(sd_routes, "list_tasks_by_status", fake_list)
+    resp = client.get("/sd/open?limit=10&pagesize=2")
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert seen == [1, 2]
+    assert body["count_returned"] == 3
+    assert [t.get("ServiceCode") for t in body["items"]] == ["C10", None, "C10"]
+    assert body["items"][2]["ServiceName"] == "Mail"
+
+
+def test_sd_open_upstream_error_returns_502(client, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(**_kw: Any) -> dict[str, Any]:
+        raise RuntimeError("IntraService error 500")
+
+    monkeypatch.setattr(sd_routes, "list_tasks_by_status", fail)
+    resp = client.get("/sd/open")
+    assert resp.status_code == 502
+    assert resp.get_json()["status"] == "error"
+
+
+def test_sd_open_caps_pagesize_and_items_by_limit(client, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[int, int]] = []
+
+    def fake_list(*, page: int, pagesize: int, **_kw: Any) -> dict[str, Any]:
+        calls.append((page, pagesize))
+        tasks = [{"Id": (page - 1) * pagesize + i} for i in range(pagesize)]
+        return _page(page, 10, tasks, [])
+
+    monkeypatch.setattr(sd_routes, "list_tasks_by_status", fake_list)
+
+    body = client.get("/sd/open?limit=3&pagesize=2000").get_json()
+    assert calls == [(1, 3)]
+    assert [t["Id"] for t in body["items"]] == [0, 1, 2]
+
+    calls.clear()
+    body = client.get("/sd/open?limit=3&pagesize=2").get_json()
+    assert calls == [(1, 2), (2, 2)]
+    assert [t["Id"] for t in body["items"]] == [0, 1, 2]
+
+
+def test_sd_open_fetches_remaining_pages_in_parallel_keeping_order(client, monkeypatch: pytest.MonkeyPatch) -> None:
+    threads: dict[int, str] = {}
+
+    def fake_list(*, page: int, pagesize: int, cfg: Any, **_kw: Any) -> dict[str, Any]:
+        assert isinstance(cfg, IntraServiceConfig)
+        threads[page] = threading.current_thread().name
+        time.sleep(0.01 * (5 - page))  # поздние страницы отвечают раньше
+        return _page(page, 9, [{"Id": page * 10 + i} for i in range(pagesize)], [])
+
+    monkeypatch.setattr(sd_routes, "list_tasks_by_status", fake_list)
+    body = client.get("/sd/open?limit=7&pagesize=2").get_json()
+
+    assert sorted(threads) == [1, 2, 3, 4]
+    assert all(threads[p].startswith("sd-pages") for p in (2, 3, 4))
+    assert [t["Id"] for t in body["items"]] == [10, 11, 20, 21, 30, 31, 40]
+
+
+def test_intraservice_config_is_per_app(monkeypatch: pytest.MonkeyPatch) -> None:
+    from web.app import create_app
+
+    seen: list[str] = []
+
+    def fake_list(*, cfg: IntraServiceConfig, **_kw: Any) -> dict[str, Any]:
+        seen.append(cfg.base_url)
+        return _page(1, 1, [], [])
+
+    monkeypatch.setattr(sd_routes, "list_tasks_by_status", fake_list)
+    monkeypatch.setenv("SERVICEDESK_BASE_URL", "https://one.example/")
+    first = create_app().test_client()
+    monkeypatch.setenv("SERVICEDESK_BASE_URL", "https://two.example")
+    second = create_app().test_client()
+
+    first.get("/sd/open")
+    second.get("/sd/open")
+    assert seen == ["https://one.example", "https://two.example"]
@@ -0,0 +1,39 @@
+"""
+Unit-тесты нормализации задач ServiceDesk и снэпшотов очереди.
+"""
+
+from __future__ import annotations
+
+from bot.utils.sd_state import (
+    make_ids_snapshot_hash,
+    normalize_and_snapshot,
+    normalize_tasks_for_message,
+)
+
+
+def test_snapshot_hash_depends_only_on_id_set() -> None:
+    h1, ids1 = make_ids_snapshot_hash([{"Id": 3}, {"Id": "1"}, {"Id": 0}, {"Id": None}, {"Id": 3}])
+    h2, ids2 = make_ids_snapshot_hash([{"Id": 1, "Name": "x"}, {"Id": 3}])
+    assert ids1 == ids2 == [1, 3]
+    assert h1 == h2
+    assert len(h1) == 32
+
+    h3, _ = make_ids_snapshot_hash([{"Id": 1}])
+    assert h3 != h1
+
+
+def test_normalize_and_snapshot_matches_separate_passes() -> None:
+    items = [{"Id": 5, "Name": "a", "ServiceId": "7"}, {"Id": "x"}, {"Id": 2, "Name": "b"}]
+    normalized, h, ids = normalize_and_snapshot(items)
+    assert normalized == normalize_tasks_for_message(items)
+    assert (h, ids) == make_ids_snapshot_hash(items)
+    assert [t["Id"] for t in normalized] == [5, 2]
+    assert normalized[0]["ServiceId"] == 7
+
+
+def test_snapshot_hash_handles_ids_beyond_int64() -> None:
+    big = 2**64 + 5
+    h, ids = make_ids_snapshot_hash([{"Id": 2**63}, {"Id": str(big)}, {"Id": 1}])
+    assert ids == [1, 2**63, big]
+    assert len(h) == 32
+    assert h != make_ids_snapshot_hash([{"Id": 1}, {"Id": 2**63}])[0]
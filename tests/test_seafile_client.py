@@ -0,0 +1,123 @@
+"""
+Unit-тесты клиента Seafile (без сети: HTTP-вызовы подменяются).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from bot.services.seafile_store import SeafileService
+from bot.utils import seafile_client
+
+
+class _FakeResponse:
+    def __init__(self, data: Any, status_code: int = 200) -> None:
+        self._data = data
+        self.status_code = status_code
+        self.text = str(data)
+
+    def json(self) -> Any:
+        return self._data
+
+
+def _service(**kw: Any) -> SeafileService:
+    base = dict(
+        service_id=1,
+        name="sf",
+        base_url="https://sf.example",
+        repo_id="repo",
+        auth_token="",
+        username="user",
+        password="pass",
+        sd_category="",
+        enabled=True,
+    )
+    base.update(kw)
+    return SeafileService(**base)
+
+
+@pytest.fixture(autouse=True)
+def _clean_token_cache() -> None:
+    seafile_client._TOKEN_CACHE.clear()
+
+
+def test_auth_token_cached_between_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    def _post(url: str, **_kw: Any) -> _FakeResponse:
+        calls.append(url)
+        return _FakeResponse({"token": "abc"})
+
+    monkeypatch.setattr(seafile_client._SESSION, "post", _post)
+    svc = _service()
+    assert seafile_client._get_auth_token(svc) == "Token abc"
+    assert seafile_client._get_auth_token(svc) == "Token abc"
+    assert len(calls) == 1
+
+
+def test_static_auth_token_used_as_is(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(seafile_client._SESSION, "post", lambda *a, **kw: pytest.fail("no http expected"))
+    assert seafile_client._get_auth_token(_service(auth_token=" Token xyz ")) == "Token xyz"
+
+
+def test_getlink_single_request_when_folder_exists(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+    monkeypatch.setattr(seafile_client, "_make_link", lambda *a: calls.append("link") or {"link": "https://l"})
+    monkeypatch.setattr(seafile_client, "_make_folder", lambda *a: calls.append("mkdir") or "success")
+    assert seafile_client.getlink("42", _service(auth_token="Token t")) == "42\nhttps://l"
+    assert calls == ["link"]
+
+
+def test_getlink_creates_folder_and_retries(monkeypatch: pytest.MonkeyPatch) -> None:
+    responses = iter([{"error_msg": "Folder not found"}, {"link": "https://l"}])
+    calls: list[str] = []
+    monkeypatch.setattr(seafile_client, "_make_link", lambda *a: calls.append("link") or next(responses))
+    monkeypatch.setattr(seafile_client, "_make_folder", lambda *a: calls.append("mkdir") or "success")
+    assert seafile_client.getlink("42", _service(auth_token="Token t")) == "42\nhttps://l"
+    assert calls == ["link", "mkdir", "link"]
+
+
+def test_token_invalidated_on_auth_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(seafile_client._SESSION, "post", lambda *a, **kw: _FakeResponse({"token": "abc"}))
+    svc = _service()
+    assert seafile_client._get_auth_token(svc) == "Token abc"
+
+    monkeypatch.setattr(seafile_client._SESSION, "get", lambda *a, **kw: _FakeResponse({}, status_code=401))
+    assert seafile_client._folder_exists("42", svc, "Token abc") is None
+    assert seafile_client._TOKEN_CACHE == {}
+
+
+def test_get_download_link_returns_existing_link(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(seafile_client, "_folder_exists", lambda *a: True)
+    monkeypatch.setattr(seafile_client, "_list_share_links", lambda *a: [{"link": "https://d"}])
+    res = seafile_client.get_download_link("42", _service(auth_token="Token t"))
+    assert res["status"] == "ok"
+    assert res["link"] == "https://d"
+    assert res["existing"] is True
+
+
+def test_get_download_link_missing_folder(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(seafile_client, "_folder_exists", lambda *a: False)
+    monkeypatch.setattr(seafile_client, "_list_share_links", lambda *a: None)
+    assert seafile_client.get_download_link("42", _service(auth_token="Token t")) == {"status": "missing"}
+
+
+def test_generate_password_rejects_biased_bytes(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert len(seafile_client._generate_password()) == seafile_client.DOWNLOAD_PASSWORD_LENGTH
+
+    chunks = iter([bytes([255, 248, 0, 61]), bytes([62, 250, 1, 9])])
+    monkeypatch.setattr(seafile_client.secrets, "token_bytes", lambda n: next(chunks))
+    alphabet = seafile_client._PASSWORD_ALPHABET
+    assert seafile_client._generate_password(4) == alphabet[0] + alphabet[61] + alphabet[0] + alphabet[1]
+
+
+def test_link_creating_posts_retry_only_connect_errors() -> None:
+    retry = seafile_client._SESSION.get_adapter("https://sf.example").max_retries
+    assert retry.is_retry("GET", 503) and retry.is_retry("POST", 503)
+
+    create = seafile_client._CREATE_SESSION.get_adapter("https://sf.example").max_retries
+    assert not create.is_retry("POST", 503)
+    assert not create._is_method_retryable("POST")
+    assert create.connect == 2 and create.read == 0
@@ -0,0 +1,51 @@
+"""
+Unit-тесты web/settings.py.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from web import settings
+
+
+def test_env_getters_cached_until_reset(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("STRICT_READINESS", "1")
+    monkeypatch.setenv("SERVICEDESK_TIMEOUT_S", "2.5")
+    settings.reset_env_cache()
+    try:
+        assert settings.is_strict_readiness() is True
+        assert settings.get_servicedesk_timeout_s() == 2.5
+
+        monkeypatch.setenv("STRICT_READINESS", "0")
+        monkeypatch.setenv("SERVICEDESK_TIMEOUT_S", "bad")
+        assert settings.is_strict_readiness() is True
+
+        settings.reset_env_cache()
+        assert settings.is_strict_readiness() is False
+        assert settings.get_servicedesk_timeout_s() == 10.0
+    finally:
+        monkeypatch.undo()
+        settings.reset_env_cache()
+
+
+def test_build_flask_config_normalizes_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CONFIG_ADMIN_TOKEN", " админ ")
+    monkeypatch.setenv("STRICT_READINESS", " 1 ")
+    settings.reset_env_cache()
+    try:
+        cfg = settings.build_flask_config()
+        assert cfg["CONFIG_ADMIN_TOKEN"] == "админ"
+        assert cfg["CONFIG_ADMIN_TOKEN_BYTES"] == "админ".encode()
+        assert cfg["IS_STRICT_READINESS"] is True
+    finally:
+        monkeypatch.undo()
+        settings.reset_env_cache()
+
+
+def test_build_flask_config_lists_missing_required_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    for key in settings.REQUIRED_ENV_VARS:
+        monkeypatch.setenv(key, "x")
+    monkeypatch.setenv("SERVICEDESK_LOGIN", "   ")
+    monkeypatch.delenv("TELEGRAM_BOT_TOKEN")
+    assert settings.build_flask_config()["MISSING_REQUIRED_ENV"] == ("SERVICEDESK_LOGIN", "TELEGRAM_BOT_TOKEN")
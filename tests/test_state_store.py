@@ -0,0 +1,96 @@
+"""
+Unit-тесты state store (Redis подменяется фейком, сеть не нужна).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from bot.utils.state_store import MemoryStateStore, ResilientStateStore, _dumps, _loads
+
+
+class _FlakyRedis:
+    """Фейк RedisStateStore: падает, пока down=True; считает обращения."""
+
+    def __init__(self) -> None:
+        self.down = False
+        self.calls = 0
+        self._data: dict[str, dict[str, Any]] = {}
+
+    def _touch(self) -> None:
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("redis down")
+
+    def ping(self) -> bool:
+        self._touch()
+        return True
+
+    def key(self, name: str) -> str:
+        return "testci:" + name
+
+    def get_json(self, name: str) -> Optional[dict[str, Any]]:
+        return self.get_raw(self.key(name))
+
+    def get_raw(self, key: str, *, copy: bool = True) -> Optional[dict[str, Any]]:
+        self._touch()
+        return self._data.get(key)
+
+    def set_json(self, name: str, value: dict[str, Any], ttl_s: Optional[int] = None) -> None:
+        self._touch()
+        self._data[self.key(name)] = dict(value)
+
+
+def test_resilient_store_breaker_skips_redis_while_open() -> None:
+    redis = _FlakyRedis()
+    store = ResilientStateStore(redis, MemoryStateStore(), retry_interval_s=60)  # type: ignore[arg-type]
+
+    redis.down = True
+    store.set_json("k", {"a": 1})
+    assert store.backend() == "memory"
+    assert redis.calls == 1
+
+    # breaker открыт: Redis не трогаем, данные — из памяти
+    assert store.get_json("k") == {"a": 1}
+    store.set_json("k", {"a": 2})
+    assert redis.calls == 1
+
+    # ping всегда идёт в Redis и закрывает breaker при успехе
+    redis.down = False
+    assert store.ping() is True
+    assert store.backend() == "redis"
+    store.set_json("k", {"a": 3})
+    assert store.get_json("k") == {"a": 3}
+    assert redis.calls == 4
+
+
+def test_get_json_falls_back_on_redis_error() -> None:
+    redis = _FlakyRedis()
+    memory = MemoryStateStore()
+    memory.set_json("k", {"a": 1})
+    store = ResilientStateStore(redis, memory, retry_interval_s=60)  # type: ignore[arg-type]
+
+    redis.down = True
+    v = store.get_json("k", copy=False)
+    assert v == {"a": 1}
+    assert v is memory.get_json("k", copy=False)
+    assert store.backend() == "memory"
+
+    other = ResilientStateStore(redis, MemoryStateStore(prefix="other"), retry_interval_s=60)  # type: ignore[arg-type]
+    assert other.get_json("k") is None
+
+
+def test_json_codec_roundtrip_keeps_int_keys_as_strings() -> None:
+    raw = _dumps({"ids": [1, 2], 5: "x", "name": "тест"})
+    assert _loads(raw) == {"ids": [1, 2], "5": "x", "name": "тест"}
+
+
+def test_memory_store_copy_flag() -> None:
+    store = MemoryStateStore()
+    value = {"a": 1}
+    store.set_json("k", value)
+    assert store.get_json("k") is not store.get_json("k")
+    assert store.get_json("k", copy=False) is store.get_json("k", copy=False)
+
+    store.set_json("k", value, copy=False)
+    assert store.get_json("k", copy=False) is value
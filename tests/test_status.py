@@ -4,11 +4,8 @@
 
 from __future__ import annotations
 
-from app import app
 
-
-def test_status_has_environment_and_git_sha() -> None:
-    client = app.test_client()
+def test_status_has_environment_and_git_sha(client) -> None:
     resp = client.get("/status")
     assert resp.status_code == 200
 
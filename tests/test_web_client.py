@@ -0,0 +1,34 @@
+"""
+Unit-тесты WebClient бота (без сети: HTTP-проверки подменяются).
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from bot.utils.web_client import WebCheckResult, WebClient
+
+
+def test_check_health_ready_single_flight() -> None:
+    client = WebClient("http://web", cache_ttl_s=60)
+    calls: list[str] = []
+
+    async def _fake_get(path: str, request_id: str) -> WebCheckResult:
+        calls.append(path)
+        await asyncio.sleep(0.01)
+        return WebCheckResult(ok=True, status=200, error=None, duration_ms=10, request_id=request_id)
+
+    client._get = _fake_get  # type: ignore[method-assign]
+
+    async def _run() -> None:
+        results = await asyncio.gather(*(client.check_health_ready() for _ in range(10)))
+        assert all(h.ok and r.ok for h, r in results)
+        assert sorted(calls) == ["/health", "/ready"]
+
+        # из кэша — без новых запросов; force — новая пара
+        await client.check_health_ready()
+        assert len(calls) == 2
+        await client.check_health_ready(force=True)
+        assert len(calls) == 4
+
+    asyncio.run(_run())
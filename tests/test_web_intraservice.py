@@ -0,0 +1,66 @@
+"""
+Unit-тесты web-клиента IntraService (без сети).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from flask import Flask
+
+import web.intraservice as intraservice
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, content: bytes) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+
+
+@pytest.fixture()
+def app() -> Flask:
+    app = Flask(__name__)
+    app.config.update(
+        SERVICEDESK_BASE_URL="https://sd.example/",
+        SERVICEDESK_LOGIN="user",
+        SERVICEDESK_PASSWORD="secret",
+    )
+    return app
+
+
+def test_list_tasks_by_status_decodes_raw_body(app: Flask, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[dict[str, Any]] = []
+
+    def fake_get(url: str, **kwargs: Any) -> _FakeResponse:
+        calls.append({"url": url, **kwargs})
+        return _FakeResponse(200, '{"Tasks": [{"Id": 1, "Name": "я"}], "Paginator": {"PageCount": 1}}'.encode())
+
+    monkeypatch.setattr(intraservice._SESSION, "get", fake_get)
+    with app.app_context():
+        data = intraservice.list_tasks_by_status(status_id=31, page=1, pagesize=50, fields="Id,Name", request_id="r1")
+
+    assert data == {"Tasks": [{"Id": 1, "Name": "я"}], "Paginator": {"PageCount": 1}}
+    assert calls[0]["url"] == "https://sd.example/api/task"
+    assert calls[0]["params"]["StatusIds"] == "31"
+    assert calls[0]["headers"]["X-Request-ID"] == "r1"
+
+
+def test_list_tasks_by_status_raises_on_http_error(app: Flask, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(intraservice._SESSION, "get", lambda url, **kw: _FakeResponse(500, b'{"Message": "boom"}'))
+    with app.app_context(), pytest.raises(RuntimeError, match="IntraService error 500"):
+        intraservice.list_tasks_by_status(status_id=31, page=1, pagesize=50, fields="Id")
+
+
+def test_list_tasks_by_status_with_explicit_cfg_needs_no_app(monkeypatch: pytest.MonkeyPatch) -> None:
+    seen: list[str] = []
+
+    def fake_get(url: str, **kwargs: Any) -> _FakeResponse:
+        seen.append(url)
+        return _FakeResponse(200, b'{"Tasks": []}')
+
+    monkeypatch.setattr(intraservice._SESSION, "get", fake_get)
+    cfg = intraservice.IntraServiceConfig(base_url="https://sd.example", login="u", password="p")
+    assert intraservice.list_tasks_by_status(status_id=31, page=2, pagesize=10, fields="Id", cfg=cfg) == {"Tasks": []}
+    assert seen == ["https://sd.example/api/task"]
@@ -12,7 +12,8 @@ from __future__ import annotations
 
 from flask import Flask
 
-from web.db import create_db_engine, db_enabled, init_db
+from web.db import LazyEngine, create_db_engine, db_enabled
+from web.json_provider import install_json_provider
 from web.logging_setup import setup_logging
 from web.routes import config as config_routes
 from web.routes import health as health_routes
@@ -24,7 +25,9 @@ def create_app() -> Flask:
     """
     Создаёт и конфигурирует Flask-приложение.
     """
-    app = Flask(__name__)
+    # Статики у сервиса нет: без static_folder Flask не добавляет правило /static/<filename>.
+    app = Flask(__name__, static_folder=None)
+    install_json_provider(app)
 
     # 1) Загружаем конфиг из env.
     cfg = build_flask_config()
@@ -37,25 +40,19 @@ def create_app() -> Flask:
     )
     app.config["APP_LOGGER"] = logger
 
-    # 3) Инициализируем БД (если включена).
+    # 3) БД (если включена): engine и init_db — лениво, при первом запросе к /config*.
     db_engine = None
     if db_enabled():
-        try:
-            db_engine = create_db_engine()
-            init_db(db_engine)
-            logger.info("db init ok (DATABASE_URL задан)")
-        except Exception as e:
-            # Важно: web НЕ должен падать из-за БД на первом этапе.
-            db_engine = None
-            logger.error("db init failed: %s", e)
+        db_engine = LazyEngine(create_db_engine, logger)
     else:
         logger.info("db disabled: DATABASE_URL not set")
 
     app.config["DB_ENGINE"] = db_engine
 
     # 4) Регистрируем роуты.
-    app.register_blueprint(health_routes.bp)
-    app.register_blueprint(sd_routes.bp)
-    app.register_blueprint(config_routes.bp)
+    # init(app) собирает нужные на каждом запросе значения app.config в app.extensions.
+    for routes in (health_routes, sd_routes, config_routes):
+        routes.init(app)
+        app.register_blueprint(routes.bp)
 
     return app
@@ -4,80 +4,98 @@
 Цель:
 - не дать записать в БД заведомо кривой JSON,
 - не усложнять (без pydantic / jsonschema).
+
+Проверки написаны как `if not ...: raise`: текст ошибки (f-строка) собирается
+только при ошибке, на успешном пути — ни форматирования, ни лишних вызовов.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+_INT_OR_NONE = (int, type(None))
 
 
 class ConfigValidationError(ValueError):
     pass
 
 
-def _require(cond: bool, msg: str):
-    if not cond:
-        raise ConfigValidationError(msg)
+def _dest_problem(dest: Any) -> Optional[str]:
+    """Текст ошибки dest без контекста (или None) — контекст добавляет вызывающий."""
+    if not isinstance(dest, dict):
+        return "dest must be object"
+    if not isinstance(dest.get("chat_id"), _INT_OR_NONE):
+        return "dest.chat_id must be int|null"
+    if not isinstance(dest.get("thread_id"), _INT_OR_NONE):
+        return "dest.thread_id must be int|null"
+    return None
 
 
 def validate_dest(dest: Dict[str, Any], ctx: str):
-    _require(isinstance(dest, dict), f"{ctx}.dest must be object")
+    problem = _dest_problem(dest)
+    if problem:
+        raise ConfigValidationError(f"{ctx}.{problem}")
 
-    chat_id = dest.get("chat_id")
-    thread_id = dest.get("thread_id")
 
-    _require(chat_id is None or isinstance(chat_id, int), f"{ctx}.dest.chat_id must be int|null")
-    _require(thread_id is None or isinstance(thread_id, int), f"{ctx}.dest.thread_id must be int|null")
+def _validate_rules_with_dest(rules: Any, section: str):
+    """Общая часть routing / eventlog: массив правил {enabled?, dest}."""
+    if not isinstance(rules, list):
+        raise ConfigValidationError(f"{section}.rules must be array")
+    for i, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ConfigValidationError(f"{section}.rules[{i}] must be object")
+        if not isinstance(rule.get("enabled", True), bool):
+            raise ConfigValidationError(f"{section}.rules[{i}].enabled must be bool")
+        problem = _dest_problem(rule.get("dest", {}))
+        if problem:
+            raise ConfigValidationError(f"{section}.rules[{i}].{problem}")
 
 
 def validate_routing(routing: Dict[str, Any]):
-    _require(isinstance(routing, dict), "routing must be object")
-
-    rules = routing.get("rules", [])
-    _require(isinstance(rules, list), "routing.rules must be array")
-
-    for i, rule in enumerate(rules):
-        _require(isinstance(rule, dict), f"routing.rules[{i}] must be object")
-        _require(isinstance(rule.get("enabled", True), bool), f"routing.rules[{i}].enabled must be bool")
-        validate_dest(rule.get("dest", {}), f"routing.rules[{i}]")
-
+    if not isinstance(routing, dict):
+        raise ConfigValidationError("routing must be object")
+    _validate_rules_with_dest(routing.get("rules", []), "routing")
     validate_dest(routing.get("default_dest", {}), "routing.default_dest")
 
 
 def validate_escalation(escalation: Dict[str, Any]):
-    _require(isinstance(escalation, dict), "escalation must be object")
-    _require(isinstance(escalation.get("enabled", False), bool), "escalation.enabled must be bool")
+    if not isinstance(escalation, dict):
+        raise ConfigValidationError("escalation must be object")
+    if not isinstance(escalation.get("enabled", False), bool):
+        raise ConfigValidationError("escalation.enabled must be bool")
 
     if escalation.get("enabled"):
-        _require(isinstance(escalation.get("after_s"), int), "escalation.after_s must be int")
+        if not isinstance(escalation.get("after_s"), int):
+            raise ConfigValidationError("escalation.after_s must be int")
         if "rules" in escalation:
-            rules = escalation.get("rules", [])
-            _require(isinstance(rules, list), "escalation.rules must be array")
+            rules = escalation["rules"]
+            if not isinstance(rules, list):
+                raise ConfigValidationError("escalation.rules must be array")
             for i, rule in enumerate(rules):
-                _require(isinstance(rule, dict), f"escalation.rules[{i}] must be object")
-                if "after_s" in rule:
-                    _require(isinstance(rule.get("after_s"), int), f"escalation.rules[{i}].after_s must be int")
+                if not isinstance(rule, dict):
+                    raise ConfigValidationError(f"escalation.rules[{i}] must be object")
+                if "after_s" in rule and not isinstance(rule["after_s"], int):
+                    raise ConfigValidationError(f"escalation.rules[{i}].after_s must be int")
                 if "dest" in rule:
-                    validate_dest(rule.get("dest", {}), f"escalation.rules[{i}]")
+                    problem = _dest_problem(rule["dest"])
+                    if problem:
+                        raise ConfigValidationError(f"escalation.rules[{i}].{problem}")
         else:
             validate_dest(escalation.get("dest", {}), "escalation.dest")
 
 
 def validate_eventlog(eventlog: Dict[str, Any]):
-    _require(isinstance(eventlog, dict), "eventlog must be object")
-
-    rules = eventlog.get("rules", [])
-    _require(isinstance(rules, list), "eventlog.rules must be array")
-    for i, rule in enumerate(rules):
-        _require(isinstance(rule, dict), f"eventlog.rules[{i}] must be object")
-        _require(isinstance(rule.get("enabled", True), bool), f"eventlog.rules[{i}].enabled must be bool")
-        validate_dest(rule.get("dest", {}), f"eventlog.rules[{i}]")
-
+    if not isinstance(eventlog, dict):
+        raise ConfigValidationError("eventlog must be object")
+    _validate_rules_with_dest(eventlog.get("rules", []), "eventlog")
     validate_dest(eventlog.get("default_dest", {}), "eventlog.default_dest")
 
 
 def validate_config(cfg: Dict[str, Any]):
-    _require(isinstance(cfg, dict), "config must be object")
-    _require("routing" in cfg, "routing missing")
-    _require("escalation" in cfg, "escalation missing")
+    if not isinstance(cfg, dict):
+        raise ConfigValidationError("config must be object")
+    if "routing" not in cfg:
+        raise ConfigValidationError("routing missing")
+    if "escalation" not in cfg:
+        raise ConfigValidationError("escalation missing")
 
     validate_routing(cfg["routing"])
     validate_escalation(cfg["escalation"])
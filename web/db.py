@@ -4,24 +4,64 @@
 
 from __future__ import annotations
 
-import json
+import logging
 import os
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from typing import Any, Optional, Tuple
-
-from sqlalchemy import Column, DateTime, Integer, Text, create_engine
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    Text,
+    create_engine,
+    false,
+    func,
+    literal,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+try:  # orjson в разы быстрее stdlib json; SQLAlchemy ждёт от сериализатора str
+    import orjson
+
+    def _dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover
+    import json
+
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    _loads = json.loads
 
 Base = declarative_base()
 
+# Конфиг хранится как JSONB: Postgres разбирает документ при записи, драйвер отдаёт dict.
+# Вне Postgres (тесты на SQLite) — обычный JSON.
+_JSON_DOC = JSON().with_variant(JSONB(), "postgresql")
+
 
 class BotConfig(Base):
     __tablename__ = "bot_config"
 
     id = Column(Integer, primary_key=True)
     version = Column(Integer, nullable=False)
-    config_json = Column(Text, nullable=False)
+    config_json = Column(_JSON_DOC, nullable=False)
+    # Время последней записи/rollback (UTC без tz). Вместе с version — ревизия для ETag и
+    # кэша тела /config: после сброса БД версии начинаются заново, а updated_at — нет.
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class BotConfigHistory(Base):
@@ -29,108 +69,325 @@ class BotConfigHistory(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     version = Column(Integer, nullable=False)
-    config_json = Column(Text, nullable=False)
+    config_json = Column(_JSON_DOC, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     comment = Column(Text, nullable=True)
+    # Запись создана rollback_to_version. Флаг вместо разбора comment LIKE 'rollback%'.
+    is_rollback = Column(Boolean, nullable=False, server_default=false())
 
+    __table_args__ = (
+        # Частичный индекс под count_rollbacks_since: только rollback-записи, по времени.
+        Index("ix_history_rollback_at", "created_at", postgresql_where=text("is_rollback")),
+    )
 
-def _database_url() -> str:
+
+# sessionmaker на каждый запрос — лишняя фабрика классов; держим одну на engine.
+_SESSION_FACTORIES: WeakKeyDictionary[Engine, sessionmaker[Session]] = WeakKeyDictionary()
+
+
+def _session(engine: Engine) -> Session:
+    factory = _SESSION_FACTORIES.get(engine)
+    if factory is None:
+        factory = _SESSION_FACTORIES[engine] = sessionmaker(bind=engine, future=True)
+    return factory()
+
+
+# Запись конфига: снять текущую версию в history и обновить bot_config — один statement.
+# created_at пишем в UTC без tz, как default=datetime.utcnow у ORM-модели.
+_WRITE_CONFIG_SQL = text(
+    """
+    WITH old AS (
+        SELECT version, config_json FROM bot_config WHERE id = 1 FOR UPDATE
+    ), ins AS (
+        INSERT INTO bot_config_history (version, config_json, created_at, comment)
+        SELECT version, config_json, now() AT TIME ZONE 'utc', :comment FROM old
+    )
+    UPDATE bot_config
+    SET version = old.version + 1, config_json = CAST(:cfg AS jsonb), updated_at = now() AT TIME ZONE 'utc'
+    FROM old
+    WHERE bot_config.id = 1
+    RETURNING bot_config.version
+    """
+)
+
+_ROLLBACK_SQL = text(
+    """
+    WITH src AS (
+        SELECT config_json FROM bot_config_history WHERE version = :version ORDER BY id DESC LIMIT 1
+    ), old AS (
+        SELECT version, config_json FROM bot_config WHERE id = 1 FOR UPDATE
+    ), ins AS (
+        INSERT INTO bot_config_history (version, config_json, created_at, comment, is_rollback)
+        SELECT old.version, old.config_json, now() AT TIME ZONE 'utc', 'rollback from v' || old.version || :suffix, TRUE
+        FROM old, src
+    )
+    UPDATE bot_config
+    SET version = old.version + 1, config_json = src.config_json, updated_at = now() AT TIME ZONE 'utc'
+    FROM old, src
+    WHERE bot_config.id = 1
+    RETURNING bot_config.version
+    """
+)
+
+# Только текущая схема (search_path): одноимённые таблицы в других схемах не мешают.
+_COLUMN_TYPE_SQL = text(
+    "SELECT data_type FROM information_schema.columns"
+    " WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+)
+
+_HISTORY_EXISTS_SQL = text("SELECT 1 FROM bot_config_history WHERE version = :version LIMIT 1")
+
+
+def _read_database_url() -> str:
     return os.getenv("DATABASE_URL", "").strip()
 
 
-def db_enabled() -> bool:
-    return bool(_database_url())
+# DATABASE_URL в процессе не меняется: читаем env один раз при импорте.
+_DATABASE_URL = _read_database_url()
+
 
+def _reload_env() -> None:
+    """Перечитать DATABASE_URL из env (для тестов, меняющих окружение)."""
+    global _DATABASE_URL
+    _DATABASE_URL = _read_database_url()
 
-def create_db_engine() -> Engine:
-    return create_engine(_database_url(), pool_pre_ping=True, future=True)
+
+def _database_url() -> str:
+    return _DATABASE_URL
 
 
-def init_db(engine: Engine) -> None:
+def db_enabled() -> bool:
+    return bool(_DATABASE_URL)
+
+
+def create_db_engine(url: Optional[str] = None) -> Engine:
+    # json_serializer/json_deserializer — колонки JSONB кодируются через orjson.
+    return create_engine(
+        url or _database_url(),
+        pool_pre_ping=True,
+        future=True,
+        json_serializer=_dumps,
+        json_deserializer=_loads,
+    )
+
+
+def _migrate_config_json_to_jsonb(engine: Engine) -> None:
+    """Таблицы, созданные до перехода на JSONB, держат config_json в TEXT — конвертируем один раз."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in ("bot_config", "bot_config_history"):
+            data_type = conn.execute(_COLUMN_TYPE_SQL, {"table": table, "column": "config_json"}).scalar_one_or_none()
+            if data_type == "text":
+                conn.execute(
+                    text(f"ALTER TABLE {table} ALTER COLUMN config_json TYPE jsonb USING CAST(config_json AS jsonb)")
+                )
+
+
+def _migrate_history_is_rollback(engine: Engine) -> None:
+    """
+    Добавляет is_rollback в старую bot_config_history и размечает прежние rollback-записи
+    по comment; индекс по comment LIKE больше не нужен.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        params = {"table": "bot_config_history", "column": "is_rollback"}
+        if conn.execute(_COLUMN_TYPE_SQL, params).scalar_one_or_none() is not None:
+            return
+        conn.execute(text("ALTER TABLE bot_config_history ADD COLUMN is_rollback BOOLEAN NOT NULL DEFAULT FALSE"))
+        conn.execute(text("UPDATE bot_config_history SET is_rollback = TRUE WHERE comment LIKE 'rollback%'"))
+        conn.execute(text("DROP INDEX IF EXISTS ix_history_rollback_time"))
+
+
+def _migrate_config_updated_at(engine: Engine) -> None:
+    """Добавляет updated_at в старую bot_config; текущей строке — время миграции."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        params = {"table": "bot_config", "column": "updated_at"}
+        if conn.execute(_COLUMN_TYPE_SQL, params).scalar_one_or_none() is not None:
+            return
+        conn.execute(text("ALTER TABLE bot_config ADD COLUMN updated_at TIMESTAMP"))
+        conn.execute(text("UPDATE bot_config SET updated_at = now() AT TIME ZONE 'utc'"))
+        conn.execute(text("ALTER TABLE bot_config ALTER COLUMN updated_at SET NOT NULL"))
+
+
+def _upgrade_schema(engine: Engine) -> None:
+    """Миграции таблиц, созданных старыми версиями; на актуальной схеме — только проверки."""
+    _migrate_config_json_to_jsonb(engine)
+    _migrate_config_updated_at(engine)
+    _migrate_history_is_rollback(engine)
+
+
+def _create_indexes(engine: Engine) -> None:
+    # create_all не добавляет индексы в уже существующие таблицы.
+    for index in BotConfigHistory.__table__.indexes:
+        index.create(engine, checkfirst=True)
+
+
+def init_db(engine: Engine, logger: logging.Logger | logging.LoggerAdapter | None = None) -> None:
+    """
+    Создаёт/мигрирует схему и строку конфига.
+
+    Ошибка миграции пробрасывается: ORM-модели требуют мигрированных колонок, и
+    LazyEngine в этом случае выключает БД до рестарта. Индексы — только ускорение,
+    их неудачное создание лишь логируется (повторится при следующем старте).
+    """
     Base.metadata.create_all(engine)
+    _upgrade_schema(engine)
+    try:
+        _create_indexes(engine)
+    except Exception as e:
+        (logger or logging.getLogger(__name__)).error("db index creation failed: %s", e)
 
-    Session = sessionmaker(bind=engine, future=True)
-    with Session() as s:
+    with _session(engine) as s:
         row = s.get(BotConfig, 1)
         if row is None:
             s.add(
                     BotConfig(
                         id=1,
                         version=1,
-                        config_json=json.dumps(
-                            {
-                                "routing": {"rules": [], "default_dest": {}},
-                                "eventlog": {"rules": [], "default_dest": {}},
-                                "escalation": {"enabled": False},
-                            },
-                            ensure_ascii=False,
-                        ),
+                        config_json={
+                            "routing": {"rules": [], "default_dest": {}},
+                            "eventlog": {"rules": [], "default_dest": {}},
+                            "escalation": {"enabled": False},
+                        },
                     )
             )
             s.commit()
 
 
+class LazyEngine:
+    """
+    Engine, который создаётся (вместе с init_db) при первом обращении, а не в create_app:
+    процессы и тесты, не трогающие БД, не платят за подключение и create_all.
+
+    Как и раньше при старте: если инициализация не удалась, БД считается выключенной
+    до рестарта (get() возвращает None), ошибка пишется в лог один раз.
+    """
+
+    def __init__(self, factory=create_db_engine, logger: logging.Logger | logging.LoggerAdapter | None = None) -> None:
+        self._factory = factory
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._failed = False
+
+    def get(self) -> Optional[Engine]:
+        if self._engine is not None or self._failed:
+            return self._engine
+        with self._lock:
+            if self._engine is None and not self._failed:
+                try:
+                    engine = self._factory()
+                    init_db(engine, self._logger)
+                    self._engine = engine
+                    self._logger.info("db init ok (DATABASE_URL задан)")
+                except Exception as e:
+                    # Важно: web НЕ должен падать из-за БД.
+                    self._failed = True
+                    self._logger.error("db init failed: %s", e)
+        return self._engine
+
+
 def read_config(engine: Engine) -> Tuple[Optional[dict[str, Any]], Optional[str]]:
+    """
+    Текущий конфиг (с ключом version).
+
+    Кэша здесь нет: готовое тело GET /config кэширует сам маршрут по ревизии
+    (см. read_config_revision).
+    """
     try:
-        Session = sessionmaker(bind=engine, future=True)
-        with Session() as s:
+        with _session(engine) as s:
             row = s.get(BotConfig, 1)
             if not row:
                 return None, "config not found"
 
-            data = json.loads(row.config_json)
+            data = dict(row.config_json)
             data["version"] = row.version
             return data, None
     except Exception as e:
         return None, str(e)
 
 
+def read_config_revision(engine: Engine) -> Tuple[Optional[tuple[int, datetime]], Optional[str]]:
+    """
+    Ревизия текущего конфига — (version, updated_at), без чтения и разбора config_json.
+
+    Меняется при каждой записи и rollback, в том числе после сброса БД с тем же номером
+    версии. Читается из БД на каждый запрос, поэтому запись в одном worker'е видна всем.
+    """
+    try:
+        with _session(engine) as s:
+            row = s.execute(select(BotConfig.version, BotConfig.updated_at).where(BotConfig.id == 1)).first()
+            return (tuple(row) if row is not None else None), None
+    except Exception as e:
+        return None, str(e)
+
+
 def write_config(engine: Engine, cfg: dict[str, Any], comment: str | None = None) -> int:
     """
     Сохраняет новый конфиг:
     - старую версию кладёт в history
     - увеличивает version
-    """
-    Session = sessionmaker(bind=engine, future=True)
-    with Session() as s:
-        current = s.get(BotConfig, 1)
-        if not current:
-            raise RuntimeError("config row missing")
-
-        # сохранить текущую версию в history
-        s.add(
-            BotConfigHistory(
-                version=current.version,
-                config_json=current.config_json,
-                comment=comment,
-            )
-        )
-
-        # обновить текущую
-        current.version += 1
-        current.config_json = json.dumps(cfg, ensure_ascii=False)
 
+    На Postgres — одним SQL-запросом (см. _WRITE_CONFIG_SQL): один round trip, строка
+    bot_config блокируется FOR UPDATE, параллельные записи не теряют версию.
+    На остальных диалектах (тесты на SQLite) — то же через ORM с with_for_update.
+    """
+    with _session(engine) as s:
+        if engine.dialect.name == "postgresql":
+            new_version = s.execute(_WRITE_CONFIG_SQL, {"cfg": _dumps(cfg), "comment": comment}).scalar_one_or_none()
+            if new_version is None:
+                raise RuntimeError("config row missing")
+        else:
+            current = s.get(BotConfig, 1, with_for_update=True)
+            if current is None:
+                raise RuntimeError("config row missing")
+            s.add(BotConfigHistory(version=current.version, config_json=current.config_json, comment=comment))
+            current.version += 1
+            current.config_json = cfg
+            new_version = current.version
         s.commit()
-        return current.version
+        return new_version
 
 
 def list_history(engine: Engine, limit: int = 20) -> list[dict[str, Any]]:
-    Session = sessionmaker(bind=engine, future=True)
-    with Session() as s:
-        rows = (
-            s.query(BotConfigHistory)
-            .order_by(BotConfigHistory.version.desc())
-            .limit(limit)
-            .all()
-        )
-        return [
-            {
-                "version": r.version,
-                "created_at": r.created_at.isoformat(),
-                "comment": r.comment,
-            }
-            for r in rows
-        ]
+    # Только нужные колонки: config_json (весь документ) в ответ не входит — не тянем его из БД.
+    stmt = (
+        select(BotConfigHistory.version, BotConfigHistory.created_at, BotConfigHistory.comment)
+        .order_by(BotConfigHistory.version.desc())
+        .limit(limit)
+    )
+    with _session(engine) as s:
+        rows = s.execute(stmt).all()
+    return [{"version": v, "created_at": c.isoformat(), "comment": m} for v, c, m in rows]
+
+
+def read_versions(engine: Engine, *versions: int) -> dict[int, dict[str, Any]]:
+    """
+    Конфиги нескольких версий одним запросом (bot_config UNION ALL bot_config_history).
+
+    Текущая версия берётся из bot_config, старые — из истории. Ненайденных версий
+    в результате нет.
+    """
+    wanted = set(versions)
+    stmt = union_all(
+        select(BotConfig.version, BotConfig.config_json, literal(True).label("is_current")).where(
+            BotConfig.version.in_(wanted)
+        ),
+        select(BotConfigHistory.version, BotConfigHistory.config_json, literal(False)).where(
+            BotConfigHistory.version.in_(wanted)
+        ),
+    )
+    result: dict[int, dict[str, Any]] = {}
+    with _session(engine) as s:
+        for version, config_json, is_current in s.execute(stmt):
+            # при совпадении версии приоритет у текущей строки bot_config
+            if is_current or version not in result:
+                result[version] = {**config_json, "version": version}
+    return result
 
 
 def get_config_by_version(engine: Engine, version: int) -> tuple[Optional[dict[str, Any]], Optional[str]]:
@@ -141,43 +398,33 @@ def get_config_by_version(engine: Engine, version: int) -> tuple[Optional[dict[s
     - текущий config (bot_config) если версия совпадает;
     - история (bot_config_history) для старых версий.
     """
-    Session = sessionmaker(bind=engine, future=True)
-    with Session() as s:
-        current = s.get(BotConfig, 1)
-        if current and current.version == version:
-            data = json.loads(current.config_json)
-            data["version"] = current.version
-            return data, None
-
-        hist = (
-            s.query(BotConfigHistory)
-            .filter(BotConfigHistory.version == version)
-            .one_or_none()
-        )
-        if not hist:
-            return None, f"version {version} not found"
-
-        data = json.loads(hist.config_json)
-        data["version"] = hist.version
-        return data, None
-
-
-def count_rollbacks_since(engine: Engine, since_dt: datetime) -> tuple[int, Optional[datetime]]:
+    data = read_versions(engine, version).get(version)
+    if data is None:
+        return None, f"version {version} not found"
+    return data, None
+
+
+def _rollbacks_stmt(window_s: int, dialect: str = "postgresql"):
+    if dialect == "postgresql":
+        # Граница окна считается часами БД: created_at — UTC без tz, поэтому now() переводим в UTC.
+        since = func.timezone("utc", func.now()) - func.make_interval(0, 0, 0, 0, 0, 0, window_s)
+    else:
+        # Остальные диалекты этих функций не знают — граница по часам процесса, тоже UTC без tz.
+        since = datetime.utcnow() - timedelta(seconds=window_s)
+    return (
+        select(func.count(), func.max(BotConfigHistory.created_at))
+        .where(BotConfigHistory.created_at >= since)
+        .where(BotConfigHistory.is_rollback)
+    )
+
+
+def count_rollbacks_since(engine: Engine, window_s: int) -> tuple[int, Optional[datetime]]:
     """
-    Возвращает количество rollback за период и время последнего rollback.
+    Возвращает количество rollback за последние window_s секунд и время последнего rollback.
     """
-    Session = sessionmaker(bind=engine, future=True)
-    with Session() as s:
-        rows = (
-            s.query(BotConfigHistory)
-            .filter(BotConfigHistory.created_at >= since_dt)
-            .filter(BotConfigHistory.comment.like("rollback%"))
-            .order_by(BotConfigHistory.created_at.desc())
-            .all()
-        )
-        if not rows:
-            return 0, None
-        return len(rows), rows[0].created_at
+    with _session(engine) as s:
+        count, last_at = s.execute(_rollbacks_stmt(window_s, engine.dialect.name)).one()
+        return count, last_at
 
 
 def rollback_to_version(engine: Engine, version: int) -> int:
@@ -185,32 +432,40 @@ def rollback_to_version(engine: Engine, version: int) -> int:
     Делает rollback:
     - берёт config_json из history
     - записывает его как новую текущую версию
+
+    Как и write_config: на Postgres — одним SQL-запросом (см. _ROLLBACK_SQL), иначе — ORM.
     """
-    Session = sessionmaker(bind=engine, future=True)
-    with Session() as s:
-        hist = (
-            s.query(BotConfigHistory)
-            .filter(BotConfigHistory.version == version)
-            .one_or_none()
-        )
-        if not hist:
-            raise RuntimeError(f"history version {version} not found")
-
-        current = s.get(BotConfig, 1)
-        if not current:
-            raise RuntimeError("config row missing")
-
-        # сохранить текущую в history
-        s.add(
-            BotConfigHistory(
-                version=current.version,
-                config_json=current.config_json,
-                comment=f"rollback from v{current.version} to v{version}",
+    with _session(engine) as s:
+        if engine.dialect.name == "postgresql":
+            new_version = s.execute(
+                _ROLLBACK_SQL, {"version": version, "suffix": f" to v{version}"}
+            ).scalar_one_or_none()
+            if new_version is None:
+                # Ошибочная ветка: уточняем причину отдельным запросом.
+                found = s.execute(_HISTORY_EXISTS_SQL, {"version": version}).first()
+                raise RuntimeError(f"history version {version} not found" if found is None else "config row missing")
+        else:
+            src = s.execute(
+                select(BotConfigHistory.config_json)
+                .where(BotConfigHistory.version == version)
+                .order_by(BotConfigHistory.id.desc())
+                .limit(1)
+            ).scalar_one_or_none()
+            if src is None:
+                raise RuntimeError(f"history version {version} not found")
+            current = s.get(BotConfig, 1, with_for_update=True)
+            if current is None:
+                raise RuntimeError("config row missing")
+            s.add(
+                BotConfigHistory(
+                    version=current.version,
+                    config_json=current.config_json,
+                    comment=f"rollback from v{current.version} to v{version}",
+                    is_rollback=True,
+                )
             )
-        )
-
-        current.version += 1
-        current.config_json = hist.config_json
-
+            current.version += 1
+            current.config_json = src
+            new_version = current.version
         s.commit()
-        return current.version
+        return new_version
@@ -11,10 +11,36 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Mapping, Optional
 
 import requests
 from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # ответ /api/task с большим pagesize — тысячи задач; orjson разбирает его в разы быстрее
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover
+    import json
+
+    _loads = json.loads
+
+
+def _make_session() -> requests.Session:
+    # Одна Session на процесс: TCP/TLS-соединения к IntraService переиспользуются
+    # между страницами (в т.ч. из пула sd_open) и между запросами.
+    # pool_maxsize >= воркеров пула страниц sd_open, чтобы соединения не отбрасывались.
+    retry = Retry(total=2, backoff_factor=0.1)
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION = _make_session()
 
 
 @dataclass(frozen=True)
@@ -25,12 +51,14 @@ class IntraServiceConfig:
     timeout_s: float = 10.0
 
 
-def _cfg_from_env() -> IntraServiceConfig:
-    # Используем существующую идеологию проекта: конфиг через ENV.
-    base_url = current_app.config["SERVICEDESK_BASE_URL"].rstrip("/")
-    login = current_app.config["SERVICEDESK_LOGIN"]
-    password = current_app.config["SERVICEDESK_PASSWORD"]
-    timeout_s = float(current_app.config.get("SERVICEDESK_TIMEOUT_S", 10.0))
+def config_from_app(config: Optional[Mapping[str, Any]] = None) -> IntraServiceConfig:
+    # Используем существующую идеологию проекта: конфиг через ENV (app.config).
+    if config is None:
+        config = current_app.config
+    base_url = config["SERVICEDESK_BASE_URL"].rstrip("/")
+    login = config["SERVICEDESK_LOGIN"]
+    password = config["SERVICEDESK_PASSWORD"]
+    timeout_s = float(config.get("SERVICEDESK_TIMEOUT_S", 10.0))
     return IntraServiceConfig(base_url=base_url, login=login, password=password, timeout_s=timeout_s)
 
 
@@ -43,13 +71,18 @@ def list_tasks_by_status(
     include: Optional[str] = None,
     sort: Optional[str] = None,
     request_id: Optional[str] = None,
+    cfg: Optional[IntraServiceConfig] = None,
 ) -> dict[str, Any]:
     """
     Возвращает сырой JSON IntraService для /api/task.
 
     Фильтрация по полям выполняется через query-параметры (в документации это {filterFields}). :contentReference[oaicite:6]{index=6}
+
+    cfg передают при вызове вне контекста приложения (из потоков пула); иначе он
+    читается из current_app.config.
     """
-    cfg = _cfg_from_env()
+    if cfg is None:
+        cfg = config_from_app()
 
     url = f"{cfg.base_url}/api/task"
     params = {
@@ -67,7 +100,7 @@ def list_tasks_by_status(
     if request_id:
         headers["X-Request-ID"] = request_id
 
-    r = requests.get(
+    r = _SESSION.get(
         url,
         params=params,
         auth=(cfg.login, cfg.password),  # Basic Auth :contentReference[oaicite:7]{index=7}
@@ -79,4 +112,5 @@ def list_tasks_by_status(
     if r.status_code >= 400:
         raise RuntimeError(f"IntraService error {r.status_code}: {r.text}")
 
-    return r.json()
+    # Разбираем сырые bytes: r.json() идёт через stdlib json и угадывание кодировки.
+    return _loads(r.content)
@@ -0,0 +1,86 @@
+"""
+JSON-провайдер Flask на orjson.
+
+jsonify / request.get_json идут через app.json. orjson сериализует в разы
+быстрее stdlib json и сразу отдаёт bytes — тело ответа не перекодируется.
+Если orjson не установлен, остаётся стандартный провайдер Flask.
+
+Роуты отвечают через json_response(obj, status) — это app.json.response() со
+статусом, без разбора аргументов jsonify и кортежа (body, status) во Flask.
+Тела запросов — json_loads(request.get_data(cache=False)).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from flask import Flask, Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    import json
+
+    orjson = None
+
+if orjson is not None:
+    # Те же опции, что у OrjsonProvider с sort_keys=True (по умолчанию во Flask):
+    # json_bytes байт-в-байт совпадает с jsonify.
+    # datetime/date/time orjson сам пишет в ISO-8601, а Flask — HTTP-date через default();
+    # OPT_PASSTHROUGH_DATETIME отдаёт их default(), чтобы формат на проводе не менялся.
+    _BASE_OPTION = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _RESPONSE_OPTION = _BASE_OPTION | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider с orjson: default() Flask остаётся для типов,
+    которые orjson не знает (Decimal и т.п.) и для дат (HTTP-date, как у Flask),
+    sort_keys учитывается.
+    """
+
+    def _option(self) -> int:
+        return _BASE_OPTION | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._option() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app: Flask) -> None:
+    """Подключает OrjsonProvider, если orjson доступен."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+def json_loads(data: bytes) -> Any:
+    """Разбор сырого тела запроса (request.get_data) без обёрток get_json."""
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def json_bytes(obj: Any) -> bytes:
+    """
+    Тело JSON-ответа в том же виде, что у json_response — для ответов, собираемых
+    заранее (вне контекста приложения). Типы вне JSON (Decimal, UUID, dataclass, date)
+    кодируются тем же default, что у провайдера Flask.
+    """
+    if orjson is None:
+        return json.dumps(obj, default=DefaultJSONProvider.default, sort_keys=True, separators=(",", ":")).encode() + b"\n"
+    return orjson.dumps(obj, default=DefaultJSONProvider.default, option=_RESPONSE_OPTION)
+
+
+def json_response(obj: Any, status: int = 200) -> Response:
+    """JSON-ответ со статусом через провайдер приложения (те же байты и default, что у jsonify)."""
+    resp = current_app.json.response(obj)
+    resp.status_code = status
+    return resp
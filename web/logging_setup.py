@@ -2,12 +2,22 @@
 Настройка логирования web-сервиса.
 
 Используем ключ-значение формат, чтобы логи легко читались и парсились.
+
+Запись в stream вынесена из потока запроса: логгер пишет через QueueHandler в
+очередь, а QueueListener в фоновом потоке отдаёт записи настоящему handler'у.
+Поток запроса только кладёт LogRecord в очередь — без write() и блокировки stream.
 """
 
 from __future__ import annotations
 
+import atexit
 import logging
-from typing import Any
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+# Фоновый поток записи логов; останавливается (с дописыванием очереди) при выходе.
+_LISTENER: Optional[QueueListener] = None
 
 
 class ContextAdapter(logging.LoggerAdapter):
@@ -31,6 +41,8 @@ def setup_logging(*, environment: str, git_sha: str) -> ContextAdapter:
     if logger.handlers:
         return ContextAdapter(logger, {"environment": environment, "git_sha": git_sha})
 
+    global _LISTENER
+
     logger.setLevel(logging.INFO)
     handler = logging.StreamHandler()
 
@@ -42,7 +54,13 @@ def setup_logging(*, environment: str, git_sha: str) -> ContextAdapter:
         )
     )
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _LISTENER = QueueListener(log_queue, handler)
+    _LISTENER.start()
+    atexit.register(_LISTENER.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
     logger.propagate = False
 
     return ContextAdapter(logger, {"environment": environment, "git_sha": git_sha})
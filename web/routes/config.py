@@ -4,27 +4,119 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any
+import hmac
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
 
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, request
+from sqlalchemy.engine import Engine
 
 from web.config_validation import ConfigValidationError, validate_config
 from web.db import (
+    LazyEngine,
     count_rollbacks_since,
-    get_config_by_version,
     list_history,
     read_config,
+    read_config_revision,
+    read_versions,
     rollback_to_version,
     write_config,
 )
+from web.json_provider import json_bytes, json_loads, json_response
 from web.utils.diff import diff_dicts
 
 bp = Blueprint("config", __name__)
 
+# Значения из app.config, нужные на каждом запросе. Собираются в init(app) и лежат
+# в app.extensions — у каждого приложения свои (тесты, несколько create_app()).
+_EXT_KEY = "testci.config_routes"
 
-def _get_db_engine():
-    return current_app.config.get("DB_ENGINE")
+
+@dataclass(frozen=True)
+class ConfigRoutesState:
+    db_engine: Optional[LazyEngine]
+    # Токены — уже в bytes (см. build_flask_config): сравниваются через compare_digest.
+    config_token: bytes
+    admin_token: bytes
+
+
+def init(app: Flask) -> None:
+    app.extensions[_EXT_KEY] = ConfigRoutesState(
+        db_engine=app.config.get("DB_ENGINE"),
+        config_token=app.config.get("CONFIG_TOKEN_BYTES", b""),
+        admin_token=app.config.get("CONFIG_ADMIN_TOKEN_BYTES", b""),
+    )
+
+
+def _state() -> ConfigRoutesState:
+    return current_app.extensions[_EXT_KEY]
+
+
+# Неизменные ответы сериализуем один раз при импорте (json_bytes — те же байты, что у jsonify).
+_UNAUTHORIZED_BODY = json_bytes({"error": "unauthorized"})
+_FALLBACK_CONFIG_BODY = json_bytes(
+    {
+        "version": 0,
+        "routing": {"rules": [], "default_dest": {"chat_id": None, "thread_id": None}},
+        "eventlog": {"rules": [], "default_dest": {"chat_id": None, "thread_id": None}},
+        "escalation": {"enabled": False},
+        "source": "fallback_no_db",
+    }
+)
+
+
+def _unauthorized() -> Response:
+    return Response(_UNAUTHORIZED_BODY, status=401, mimetype="application/json")
+
+
+def _engine() -> Optional[Engine]:
+    """Engine БД или None (БД выключена или не инициализировалась)."""
+    db_engine = _state().db_engine
+    return db_engine.get() if db_engine is not None else None
+
+
+def _token_ok(got: str, token: bytes) -> bool:
+    # compare_digest — сравнение за постоянное время; bytes, т.к. str допускает только ASCII.
+    return hmac.compare_digest(got.strip().encode(), token)
+
+
+def _check_admin() -> bool:
+    token = _state().admin_token
+    return bool(token) and _token_ok(request.headers.get("X-Admin-Token", ""), token)
+
+
+# Готовое тело GET /config: (engine, etag, bytes). etag строится из ревизии (version,
+# updated_at), которую каждый запрос читает из БД: запись в другом worker'е или сброс БД
+# меняют ревизию, так что отдельная инвалидация не нужна.
+_CONFIG_BODY: Optional[tuple[Engine, str, bytes]] = None
+
+# Эндпоинты, требующие X-Admin-Token; проверка одна — в _require_admin (before_request).
+_ADMIN_ENDPOINTS = frozenset(
+    {
+        "config.put_config",
+        "config.get_config_history",
+        "config.rollback_config",
+        "config.config_diff",
+        "config.config_rollbacks",
+    }
+)
+
+
+@bp.before_request
+def _require_admin() -> Optional[Response]:
+    if request.endpoint not in _ADMIN_ENDPOINTS:
+        return None
+    if not _state().admin_token and request.endpoint == "config.put_config":
+        return json_response({"error": "admin token not configured"}, 403)
+    if not _check_admin():
+        return _unauthorized()
+    return None
+
+
+def _revision_etag(revision: tuple[int, datetime]) -> str:
+    version, updated_at = revision
+    return f"v{version}-{updated_at:%Y%m%d%H%M%S%f}"
 
 
 @bp.get("/config")
@@ -36,33 +128,46 @@ def get_config() -> Any:
     - если подключена БД — читаем из Postgres
     - иначе — отдаём "пустой" конфиг (fallback)
     """
-    token = current_app.config.get("CONFIG_TOKEN", "")
-    if token:
-        got = request.headers.get("X-Config-Token", "").strip()
-        if got != token:
-            return jsonify({"error": "unauthorized"}), 401
+    global _CONFIG_BODY
+    token = _state().config_token
+    if token and not _token_ok(request.headers.get("X-Config-Token", ""), token):
+        return _unauthorized()
 
-    engine = _get_db_engine()
+    engine = _engine()
     if engine is None:
-        return jsonify(
-            {
-                "version": 0,
-                "routing": {"rules": [], "default_dest": {"chat_id": None, "thread_id": None}},
-                "eventlog": {"rules": [], "default_dest": {"chat_id": None, "thread_id": None}},
-                "escalation": {"enabled": False},
-                "source": "fallback_no_db",
-            }
-        )
-
-    data, err = read_config(engine)
-    if err:
-        return jsonify({"error": "config_read_failed", "detail": err}), 500
-
-    if "eventlog" not in data:
-        data["eventlog"] = {"rules": [], "default_dest": {"chat_id": None, "thread_id": None}}
-
-    data["source"] = "postgres"
-    return jsonify(data)
+        return Response(_FALLBACK_CONFIG_BODY, mimetype="application/json")
+
+    # ETag = ревизия: бот, приславший If-None-Match с текущей ревизией, получает 304
+    # без чтения config_json и сериализации.
+    revision, err = read_config_revision(engine)
+    if err or revision is None:
+        return json_response({"error": "config_read_failed", "detail": err or "config not found"}, 500)
+    etag = _revision_etag(revision)
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        return resp
+
+    cached = _CONFIG_BODY
+    if cached is not None and cached[0] is engine and cached[1] == etag:
+        body = cached[2]
+    else:
+        data, err = read_config(engine)
+        if err:
+            return json_response({"error": "config_read_failed", "detail": err}, 500)
+
+        if "eventlog" not in data:
+            data["eventlog"] = {"rules": [], "default_dest": {"chat_id": None, "thread_id": None}}
+
+        data["source"] = "postgres"
+        body = json_bytes(data)
+        # Ревизия прочитана до документа: при гонке с записью тело может быть новее etag,
+        # но не старее; такая запись кэша больше не совпадёт и перестроится.
+        _CONFIG_BODY = (engine, etag, body)
+
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    return resp
 
 
 @bp.put("/config")
@@ -70,71 +175,53 @@ def put_config():
     """
     Обновление конфига (admin only).
     """
-    admin_token = current_app.config.get("CONFIG_ADMIN_TOKEN", "")
-    if not admin_token:
-        return jsonify({"error": "admin token not configured"}), 403
-
-    got = request.headers.get("X-Admin-Token", "").strip()
-    if got != admin_token:
-        return jsonify({"error": "unauthorized"}), 401
-
-    engine = _get_db_engine()
+    engine = _engine()
     if engine is None:
-        return jsonify({"error": "db disabled"}), 500
+        return json_response({"error": "db disabled"}, 500)
 
     try:
-        data = request.get_json(force=True)
+        data = json_loads(request.get_data(cache=False))
         validate_config(data)
     except ConfigValidationError as e:
-        return jsonify({"error": "validation_failed", "detail": str(e)}), 400
+        return json_response({"error": "validation_failed", "detail": str(e)}, 400)
     except Exception as e:
-        return jsonify({"error": "bad_json", "detail": str(e)}), 400
+        return json_response({"error": "bad_json", "detail": str(e)}, 400)
 
     try:
         new_version = write_config(engine, data)
     except Exception as e:
-        return jsonify({"error": "db_write_failed", "detail": str(e)}), 500
+        return json_response({"error": "db_write_failed", "detail": str(e)}, 500)
 
-    return jsonify({"ok": True, "version": new_version})
+    return json_response({"ok": True, "version": new_version})
 
 
 @bp.get("/config/history")
 def get_config_history():
-    admin_token = current_app.config.get("CONFIG_ADMIN_TOKEN", "")
-    got = request.headers.get("X-Admin-Token", "").strip()
-    if not admin_token or got != admin_token:
-        return jsonify({"error": "unauthorized"}), 401
-
-    engine = _get_db_engine()
+    engine = _engine()
     if engine is None:
-        return jsonify({"error": "db disabled"}), 500
+        return json_response({"error": "db disabled"}, 500)
 
-    return jsonify(list_history(engine))
+    return json_response(list_history(engine))
 
 
 @bp.post("/config/rollback")
 def rollback_config():
-    admin_token = current_app.config.get("CONFIG_ADMIN_TOKEN", "")
-    got = request.headers.get("X-Admin-Token", "").strip()
-    if not admin_token or got != admin_token:
-        return jsonify({"error": "unauthorized"}), 401
-
-    engine = _get_db_engine()
+    engine = _engine()
     if engine is None:
-        return jsonify({"error": "db disabled"}), 500
+        return json_response({"error": "db disabled"}, 500)
 
     try:
-        data = request.get_json(force=True)
+        data = json_loads(request.get_data(cache=False))
         version = int(data.get("version"))
     except Exception:
-        return jsonify({"error": "invalid payload"}), 400
+        return json_response({"error": "invalid payload"}, 400)
 
     try:
         new_version = rollback_to_version(engine, version)
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
+        return json_response({"error": str(e)}, 400)
 
-    return jsonify({"ok": True, "version": new_version})
+    return json_response({"ok": True, "version": new_version})
 
 
 @bp.get("/config/diff")
@@ -145,30 +232,24 @@ def config_diff():
     - from: версия
     - to: версия
     """
-    admin_token = current_app.config.get("CONFIG_ADMIN_TOKEN", "")
-    got = request.headers.get("X-Admin-Token", "").strip()
-    if not admin_token or got != admin_token:
-        return jsonify({"error": "unauthorized"}), 401
-
-    engine = _get_db_engine()
+    engine = _engine()
     if engine is None:
-        return jsonify({"error": "db disabled"}), 500
+        return json_response({"error": "db disabled"}, 500)
 
     try:
         v_from = int(request.args.get("from"))
         v_to = int(request.args.get("to"))
     except Exception:
-        return jsonify({"error": "invalid params"}), 400
+        return json_response({"error": "invalid params"}, 400)
 
-    cfg_from, err_from = get_config_by_version(engine, v_from)
-    if err_from:
-        return jsonify({"error": "from_version_not_found", "detail": err_from}), 404
-    cfg_to, err_to = get_config_by_version(engine, v_to)
-    if err_to:
-        return jsonify({"error": "to_version_not_found", "detail": err_to}), 404
+    cfgs = read_versions(engine, v_from, v_to)
+    if v_from not in cfgs:
+        return json_response({"error": "from_version_not_found", "detail": f"version {v_from} not found"}, 404)
+    if v_to not in cfgs:
+        return json_response({"error": "to_version_not_found", "detail": f"version {v_to} not found"}, 404)
 
-    changes = diff_dicts(cfg_from, cfg_to)
-    return jsonify({"from": v_from, "to": v_to, "changes": changes})
+    changes = diff_dicts(cfgs[v_from], cfgs[v_to])
+    return json_response({"from": v_from, "to": v_to, "changes": changes})
 
 
 @bp.get("/config/rollbacks")
@@ -178,14 +259,9 @@ def config_rollbacks():
     query params:
     - window_s: окно в секундах (по умолчанию 3600)
     """
-    admin_token = current_app.config.get("CONFIG_ADMIN_TOKEN", "")
-    got = request.headers.get("X-Admin-Token", "").strip()
-    if not admin_token or got != admin_token:
-        return jsonify({"error": "unauthorized"}), 401
-
-    engine = _get_db_engine()
+    engine = _engine()
     if engine is None:
-        return jsonify({"error": "db disabled"}), 500
+        return json_response({"error": "db disabled"}, 500)
 
     try:
         window_s = int(request.args.get("window_s", "3600"))
@@ -193,10 +269,9 @@ def config_rollbacks():
         window_s = 3600
     window_s = max(60, min(window_s, 86400))
 
-    since_dt = datetime.utcnow() - timedelta(seconds=window_s)
-    count, last_at = count_rollbacks_since(engine, since_dt)
+    count, last_at = count_rollbacks_since(engine, window_s)
 
-    return jsonify(
+    return json_response(
         {
             "window_s": window_s,
             "count": count,
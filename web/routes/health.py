@@ -4,23 +4,62 @@ Health/ready endpoints.
 
 from __future__ import annotations
 
+import itertools
+import logging
+import os
 import time
-import uuid
 from dataclasses import asdict, dataclass
-from typing import Any
+from typing import Any, Mapping
 
-from flask import Blueprint, current_app, g, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, g, request
 
+from web.json_provider import json_bytes
 from web.settings import (
     ALLOWED_ENVIRONMENTS,
-    REQUIRED_ENV_VARS,
     get_environment,
     get_git_sha,
-    is_strict_readiness,
 )
 
 bp = Blueprint("health", __name__)
 
+# Собирается в init(app) и лежит в app.extensions — у каждого приложения своё.
+_EXT_KEY = "testci.health_routes"
+
+
+@dataclass(frozen=True)
+class HealthRoutesState:
+    # Логгер приложения (app.config["APP_LOGGER"]).
+    logger: Any
+    # Тело и статус /ready. Входы проверок (env и app.config) после старта не меняются,
+    # поэтому ответ собирается один раз в init(app), а не на каждый запрос пробы.
+    ready_body: bytes
+    ready_status: int
+    # Тело /status (env и git sha тоже неизменны).
+    status_body: bytes
+
+
+# Неизменные тела / и /health. Response на каждый запрос новый: after_request
+# дописывает в него X-Request-ID, общий объект делить между запросами нельзя.
+_INDEX_BODY = "testCI service is running".encode()
+_HEALTH_BODY = json_bytes({"status": "ok"})
+_NO_STORE = {"Cache-Control": "no-store"}
+
+_ALLOWED_ENVIRONMENTS_TEXT = ", ".join(sorted(ALLOWED_ENVIRONMENTS))
+
+
+def init(app: Flask) -> None:
+    ready_body, ready_status = _readiness_response(app.config)
+    app.extensions[_EXT_KEY] = HealthRoutesState(
+        logger=app.config.get("APP_LOGGER"),
+        ready_body=ready_body,
+        ready_status=ready_status,
+        status_body=json_bytes({"status": "ok", "environment": get_environment(), "git_sha": get_git_sha()}),
+    )
+
+
+def _state() -> HealthRoutesState:
+    return current_app.extensions[_EXT_KEY]
+
 
 @dataclass(frozen=True)
 class ReadyCheck:
@@ -29,11 +68,29 @@ class ReadyCheck:
     detail: str
 
 
+# request_id без заголовка: случайный префикс процесса + счётчик. Уникален в процессе
+# (счётчик) и между процессами (префикс), без os.urandom на каждый запрос, как у uuid4.
+_RID_PREFIX = os.urandom(4).hex()
+_RID_COUNTER = itertools.count(1)
+
+
 def _get_request_id() -> str:
     rid = request.headers.get("X-Request-ID")
     if rid and rid.strip():
         return rid.strip()
-    return uuid.uuid4().hex
+    return f"{_RID_PREFIX}{next(_RID_COUNTER):x}"
+
+
+# Пробы liveness/readiness дёргают эти пути постоянно — в access log их не пишем.
+_PROBE_PATHS = frozenset({"/health", "/ready"})
+
+
+def _access_logger() -> Any:
+    """Логгер для строки access log или None, если запрос не логируется (проба / уровень выше INFO)."""
+    if request.path in _PROBE_PATHS:
+        return None
+    logger = _state().logger or current_app.logger
+    return logger if logger.isEnabledFor(logging.INFO) else None
 
 
 @bp.before_app_request
@@ -41,10 +98,11 @@ def before_request() -> None:
     """
     Перед запросом:
     - генерим request_id
-    - запоминаем start_time
+    - запоминаем start_time (только если запрос попадёт в access log)
     """
     g.request_id = _get_request_id()
-    g.start_time = time.perf_counter()
+    if _access_logger() is not None:
+        g.start_time = time.perf_counter()
 
 
 @bp.after_app_request
@@ -52,16 +110,19 @@ def after_request(response: Any) -> Any:
     """
     После запроса:
     - добавляем X-Request-ID
-    - пишем одну строку access log
+    - пишем одну строку access log (кроме проб и выключенного INFO)
     """
+    response.headers["X-Request-ID"] = getattr(g, "request_id", "unknown")
+
+    logger = _access_logger()
+    if logger is None:
+        return response
+
     try:
         duration_ms = int((time.perf_counter() - g.start_time) * 1000)
     except Exception:
         duration_ms = -1
 
-    response.headers["X-Request-ID"] = getattr(g, "request_id", "unknown")
-
-    logger = current_app.config.get("APP_LOGGER", current_app.logger)
     logger.info(
         "request method=%s path=%s status=%s duration_ms=%s request_id=%s remote=%s",
         request.method,
@@ -74,22 +135,13 @@ def after_request(response: Any) -> Any:
     return response
 
 
-def _missing_required_env() -> list[str]:
-    missing: list[str] = []
-    for key in REQUIRED_ENV_VARS:
-        value = current_app.config.get(key) or ""
-        if not str(value).strip():
-            missing.append(key)
-    return missing
-
-
 def _check_environment(strict: bool) -> ReadyCheck:
     env = get_environment()
 
     if strict:
         ok = env in ALLOWED_ENVIRONMENTS
         detail = (
-            f"ENVIRONMENT={env} (ожидается одно из: {', '.join(sorted(ALLOWED_ENVIRONMENTS))})"
+            f"ENVIRONMENT={env} (ожидается одно из: {_ALLOWED_ENVIRONMENTS_TEXT})"
             if not ok
             else f"ENVIRONMENT={env}"
         )
@@ -101,14 +153,14 @@ def _check_environment(strict: bool) -> ReadyCheck:
             ok=True,
             detail=(
                 f"ENVIRONMENT={env} (предупреждение: рекомендуется одно из "
-                f"{', '.join(sorted(ALLOWED_ENVIRONMENTS))}; строгий режим включается STRICT_READINESS=1)"
+                f"{_ALLOWED_ENVIRONMENTS_TEXT}; строгий режим включается STRICT_READINESS=1)"
             ),
         )
     return ReadyCheck(name="env.environment", ok=True, detail=f"ENVIRONMENT={env}")
 
 
-def _check_required_env(strict: bool) -> ReadyCheck:
-    missing = _missing_required_env()
+def _check_required_env(config: Mapping[str, Any], strict: bool) -> ReadyCheck:
+    missing = config["MISSING_REQUIRED_ENV"]
 
     if strict:
         ok = len(missing) == 0
@@ -127,43 +179,43 @@ def _check_required_env(strict: bool) -> ReadyCheck:
     return ReadyCheck(name="config.required_env", ok=True, detail="Все обязательные переменные заданы")
 
 
-def _build_readiness_checks() -> list[ReadyCheck]:
-    strict = is_strict_readiness()
+def _build_readiness_checks(config: Mapping[str, Any]) -> list[ReadyCheck]:
+    strict = bool(config.get("IS_STRICT_READINESS"))
     return [
         _check_environment(strict),
-        _check_required_env(strict),
+        _check_required_env(config, strict),
     ]
 
 
-@bp.get("/")
-def index() -> tuple[str, int]:
-    return "testCI service is running", 200
-
-
-@bp.get("/health")
-def health() -> tuple[Any, int]:
-    return jsonify({"status": "ok"}), 200
-
-
-@bp.get("/ready")
-def ready() -> tuple[Any, int]:
-    checks = _build_readiness_checks()
+def _readiness_response(config: Mapping[str, Any]) -> tuple[bytes, int]:
+    checks = _build_readiness_checks(config)
     all_ok = all(c.ok for c in checks)
 
     payload = {
         "status": "ok" if all_ok else "not_ready",
         "ready": all_ok,
-        "strict": is_strict_readiness(),
+        "strict": bool(config.get("IS_STRICT_READINESS")),
         "checks": [asdict(c) for c in checks],
     }
-    return jsonify(payload), 200 if all_ok else 503
+    return json_bytes(payload), 200 if all_ok else 503
+
+
+@bp.get("/")
+def index() -> Response:
+    return Response(_INDEX_BODY, mimetype="text/html")
+
+
+@bp.get("/health")
+def health() -> Response:
+    return Response(_HEALTH_BODY, mimetype="application/json", headers=_NO_STORE)
+
+
+@bp.get("/ready")
+def ready() -> Response:
+    state = _state()
+    return Response(state.ready_body, status=state.ready_status, mimetype="application/json")
 
 
 @bp.get("/status")
-def status() -> tuple[Any, int]:
-    payload = {
-        "status": "ok",
-        "environment": get_environment(),
-        "git_sha": get_git_sha(),
-    }
-    return jsonify(payload), 200
+def status() -> Response:
+    return Response(_state().status_body, mimetype="application/json")
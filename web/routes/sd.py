@@ -4,17 +4,46 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
-from flask import Blueprint, current_app, g, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, g, request
 
-from web.intraservice import list_tasks_by_status
+from web.intraservice import IntraServiceConfig, config_from_app, list_tasks_by_status
+from web.json_provider import json_response
 
 bp = Blueprint("sd", __name__, url_prefix="/sd")
 
+# Пул для параллельной загрузки страниц IntraService; ограничен, чтобы не заваливать API.
+_PAGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sd-pages")
+
+# Логгер приложения и конфиг IntraService из app.config: собираются в init(app), чтобы
+# sd_open не разбирал app.config на каждом запросе; лежат в app.extensions — у каждого
+# приложения свои.
+_EXT_KEY = "testci.sd_routes"
+
+
+@dataclass(frozen=True)
+class SdRoutesState:
+    logger: Any
+    intraservice_cfg: IntraServiceConfig
+
+
+def init(app: Flask) -> None:
+    app.extensions[_EXT_KEY] = SdRoutesState(
+        logger=app.config.get("APP_LOGGER"),
+        intraservice_cfg=config_from_app(app.config),
+    )
+
+
+def _state() -> SdRoutesState:
+    return current_app.extensions[_EXT_KEY]
+
 
 @bp.get("/open")
-def sd_open() -> tuple[Any, int]:
+def sd_open() -> Response:
     """
     Возвращает заявки IntraService в статусе "Открыта" (StatusId=31).
 
@@ -36,7 +65,9 @@ def sd_open() -> tuple[Any, int]:
         pagesize = int(request.args.get("pagesize", "50"))
     except Exception:
         pagesize = 50
-    pagesize = max(1, min(pagesize, 2000))
+    # Страница больше limit — лишние задачи по сети, которые всё равно отрежем.
+    # Размер фиксируем на весь обход: номера страниц IntraService считаются от pagesize.
+    pagesize = max(1, min(pagesize, 2000, limit))
 
     fields = (
         request.args.get("fields")
@@ -47,67 +78,63 @@ def sd_open() -> tuple[Any, int]:
 
     items: list[dict[str, Any]] = []
     services_map: dict[int, dict[str, Any]] = {}
-    page = 1
-    paginator: dict[str, Any] | None = None
+    paginator: dict[str, Any] = {}
+
+    # request_id и конфиг передаём явно: в потоках пула нет контекста приложения/запроса.
+    fetch = partial(
+        list_tasks_by_status,
+        status_id=status_id,
+        pagesize=pagesize,
+        fields=fields,
+        include=include or None,
+        sort=sort or None,
+        request_id=getattr(g, "request_id", None),
+        cfg=_state().intraservice_cfg,
+    )
+
+    def collect(data: dict[str, Any]) -> None:
+        nonlocal paginator
+        # Берём не больше, чем осталось до limit: лишнее не обогащаем и не копим.
+        tasks = (data.get("Tasks") or [])[: limit - len(items)]
+        paginator = data.get("Paginator") or {}
+
+        # Id / ServiceId IntraService отдаёт числами — без int() и try/except на каждый элемент.
+        services_map.update({s["Id"]: s for s in data.get("Services") or () if "Id" in s})
+
+        for t in tasks:
+            svc = services_map.get(t.get("ServiceId"))
+            if svc:
+                t["ServiceCode"] = svc.get("Code")
+                t["ServiceName"] = svc.get("Name")
+
+        items.extend(tasks)
 
     try:
-        while len(items) < limit:
-            data = list_tasks_by_status(
-                status_id=status_id,
-                page=page,
-                pagesize=pagesize,
-                fields=fields,
-                include=include or None,
-                sort=sort or None,
-                request_id=getattr(g, "request_id", None),
-            )
-
-            tasks = data.get("Tasks") or []
-            paginator = data.get("Paginator") or {}
-
-            services = data.get("Services") or []
-            for s in services:
-                try:
-                    services_map[int(s.get("Id"))] = s
-                except Exception:
-                    continue
-
-            for t in tasks:
-                sid = t.get("ServiceId")
-                try:
-                    svc = services_map.get(int(sid)) if sid is not None else None
-                except Exception:
-                    svc = None
-                if svc:
-                    t["ServiceCode"] = svc.get("Code")
-                    t["ServiceName"] = svc.get("Name")
-
-            items.extend(tasks)
-
-            # Если страницы кончились — выходим
-            page_count = int(paginator.get("PageCount", page))
-            if page >= page_count:
-                break
-            page += 1
-
-        items = items[:limit]
-
-        return jsonify(
+        # Первая страница даёт PageCount; остальные нужные страницы независимы —
+        # забираем их параллельно и разбираем в исходном порядке.
+        collect(fetch(page=1))
+        page_count = int(paginator.get("PageCount", 1))
+        pages_needed = min(page_count, -(-limit // pagesize))
+        for data in _PAGE_POOL.map(lambda p: fetch(page=p), range(2, pages_needed + 1)):
+            collect(data)
+
+        return json_response(
             {
                 "status_id": status_id,
                 "count_returned": len(items),
                 "items": items,
                 "paginator": paginator,
             }
-        ), 200
+        )
 
     except Exception as e:
-        logger = current_app.config.get("APP_LOGGER", current_app.logger)
+        logger = _state().logger or current_app.logger
         logger.exception("sd_open failed request_id=%s err=%s", getattr(g, "request_id", "unknown"), str(e))
-        return jsonify(
+        return json_response(
             {
                 "status": "error",
                 "error": str(e),
                 "request_id": getattr(g, "request_id", "unknown"),
-            }
-        ), 502
+            },
+            502,
+        )
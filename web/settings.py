@@ -5,21 +5,26 @@
 - единая точка чтения env;
 - дефолты и валидация;
 - общие списки для readiness.
+
+Env процесса после старта не меняется, поэтому getter'ы кешируются (functools.cache):
+/ready и /status не ходят в os.environ на каждый запрос. Тестам, меняющим env,
+нужен reset_env_cache().
 """
 
 from __future__ import annotations
 
 import os
+from functools import cache
 
-ALLOWED_ENVIRONMENTS = {"staging", "prod", "local"}
+ALLOWED_ENVIRONMENTS = frozenset({"staging", "prod", "local"})
 
 # Обязательные переменные для readiness.
-REQUIRED_ENV_VARS = [
+REQUIRED_ENV_VARS = (
     "SERVICEDESK_BASE_URL",
     "SERVICEDESK_LOGIN",
     "SERVICEDESK_PASSWORD",
     "TELEGRAM_BOT_TOKEN",
-]
+)
 
 
 def get_env(name: str, default: str | None = None) -> str:
@@ -30,18 +35,22 @@ def get_env(name: str, default: str | None = None) -> str:
     return value if value is not None else ""
 
 
+@cache
 def get_environment() -> str:
     return get_env("ENVIRONMENT", "unknown")
 
 
+@cache
 def get_git_sha() -> str:
     return get_env("GIT_SHA", "unknown")
 
 
+@cache
 def is_strict_readiness() -> bool:
     return get_env("STRICT_READINESS", "0").strip() == "1"
 
 
+@cache
 def get_servicedesk_timeout_s() -> float:
     raw = get_env("SERVICEDESK_TIMEOUT_S", "10").strip()
     try:
@@ -50,11 +59,19 @@ def get_servicedesk_timeout_s() -> float:
         return 10.0
 
 
+def reset_env_cache() -> None:
+    """Сбрасывает кеш getter'ов env (для тестов, меняющих переменные окружения)."""
+    for getter in (get_environment, get_git_sha, is_strict_readiness, get_servicedesk_timeout_s):
+        getter.cache_clear()
+
+
 def build_flask_config() -> dict[str, object]:
     """
     Собирает словарь для app.config.
     """
-    return {
+    config_token = get_env("CONFIG_TOKEN", "").strip()
+    admin_token = get_env("CONFIG_ADMIN_TOKEN", "").strip()
+    cfg: dict[str, object] = {
         "ENVIRONMENT": get_environment(),
         "GIT_SHA": get_git_sha(),
         "TELEGRAM_BOT_TOKEN": get_env("TELEGRAM_BOT_TOKEN", "").strip(),
@@ -62,6 +79,13 @@ def build_flask_config() -> dict[str, object]:
         "SERVICEDESK_LOGIN": get_env("SERVICEDESK_LOGIN", "").strip(),
         "SERVICEDESK_PASSWORD": get_env("SERVICEDESK_PASSWORD", "").strip(),
         "SERVICEDESK_TIMEOUT_S": get_servicedesk_timeout_s(),
-        "CONFIG_TOKEN": get_env("CONFIG_TOKEN", "").strip(),
-        "CONFIG_ADMIN_TOKEN": get_env("CONFIG_ADMIN_TOKEN", "").strip(),
+        "CONFIG_TOKEN": config_token,
+        "CONFIG_ADMIN_TOKEN": admin_token,
+        # Формы для сравнения в роутах (hmac.compare_digest по bytes) — кодируем один раз.
+        "CONFIG_TOKEN_BYTES": config_token.encode(),
+        "CONFIG_ADMIN_TOKEN_BYTES": admin_token.encode(),
+        "IS_STRICT_READINESS": is_strict_readiness(),
     }
+    # Значения выше уже strip()-нуты: для readiness достаточно проверить на пустоту.
+    cfg["MISSING_REQUIRED_ENV"] = tuple(key for key in REQUIRED_ENV_VARS if not cfg[key])
+    return cfg